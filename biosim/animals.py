@@ -8,7 +8,10 @@ to the Herbivore and Carnivore.
 Purpose of this function is to give detailed information about the animals
 and their behaviors in the Island.
 
-To use this script the user has to have installed the math and random
+The fitness of an animal is cached, and is only calculated again when the age, weight or
+the parameters have changed.
+
+To use this script the user has to have installed the math, random and numpy
 package to the Python environment.
 """
 
@@ -17,6 +20,87 @@ __email__ = "Majorann.thevarajah@nmbu.no & Anish.thangalingam@nmbu.no"
 
 import math
 import random
+import numpy as np
+
+
+def random_number(rng=None):
+    """
+    A uniform random number between 0 and 1
+
+    :param: rng: numpy Generator, the random module is used if it is None
+    :return: the random number
+    """
+    if rng is None:
+        return random.random()
+    return rng.random()
+
+
+class RandomNumbers:
+    """
+    Random numbers from a numpy Generator, drawn in batches. It has the methods random and normal like a Generator,
+    so it can be given as rng to the methods of the animals, but the numbers are taken from lists that are drawn
+    with one Generator.random(n) or Generator.standard_normal(n) call. Before a phase, reserve draws all the
+    numbers the phase needs at once. The numbers are always drawn in the same order, so the result is the same
+    for the same seed.
+    """
+
+    def __init__(self, rng, batch_size=256):
+        """
+        :param: rng: numpy Generator the numbers are drawn from
+        :param: batch_size: number of numbers that are drawn when more are needed than reserved
+        """
+        self.rng = rng
+        self.batch_size = batch_size
+        self._uniforms = []
+        self._normals = []
+
+    def reserve(self, uniforms=0, normals=0):
+        """
+        Make sure that at least the given number of random numbers are drawn, with one call for each kind.
+        The numbers that are left from before are used first.
+
+        :param: uniforms: number of uniform random numbers
+        :param: normals: number of normal random numbers
+        """
+        if uniforms > len(self._uniforms):
+            self._uniforms = self.rng.random(uniforms - len(self._uniforms)).tolist()[::-1] + self._uniforms
+        if normals > len(self._normals):
+            self._normals = self.rng.standard_normal(normals - len(self._normals)).tolist()[::-1] + self._normals
+
+    def random(self):
+        """
+        :return: a uniform random number between 0 and 1
+        """
+        if not self._uniforms:
+            self.reserve(uniforms=self.batch_size)
+        return self._uniforms.pop()
+
+    def normal(self, loc, scale):
+        """
+        :param: loc: the mean
+        :param: scale: the standard deviation
+        :return: a normal random number
+        """
+        if not self._normals:
+            self.reserve(normals=self.batch_size)
+        return loc + scale * self._normals.pop()
+
+    def buffered(self):
+        """
+        :return: two arrays with the uniform and normal numbers that are drawn but not used yet, in the order
+                 they will be used
+        """
+        return np.array(self._uniforms[::-1], dtype=float), np.array(self._normals[::-1], dtype=float)
+
+    def set_buffered(self, uniforms, normals):
+        """
+        Set the numbers that are drawn but not used yet, e.g. from a checkpoint
+
+        :param: uniforms: the uniform numbers, in the order they will be used
+        :param: normals: the normal numbers, in the order they will be used
+        """
+        self._uniforms = np.asarray(uniforms, dtype=float).tolist()[::-1]
+        self._normals = np.asarray(normals, dtype=float).tolist()[::-1]
 
 
 class Animal:
@@ -25,6 +109,7 @@ class Animal:
     """
 
     parameters = {}
+    _parameters_version = 0
 
     @classmethod
     def parameter_set(cls, new_parameters):
@@ -42,14 +127,16 @@ class Animal:
                 if new_parameters[param_name] < 0:
                     raise ValueError("Parameter must be non-negative")
         cls.parameters.update(new_parameters)
+        cls._parameters_version += 1
 
-    def __init__(self, age=None, weight=None):
+    def __init__(self, age=None, weight=None, rng=None):
         """
         Initializing the animal class
 
         :params: age: age of the new animal
         :params: weight: weight of the new animal. If weight is None, it will be
                          calculated by gaussian distribution.
+        :params: rng: numpy Generator for the weight, the random module is used if it is None
         """
         if age is None:
             self._age = 0
@@ -59,20 +146,26 @@ class Animal:
             self._age = age
 
         if weight is None:
-            self._weight = self.calculated_weight()
+            self._weight = self.calculated_weight(rng)
         elif weight < 0:
             raise ValueError('The weight must be non-negative')
         else:
             self._weight = weight
 
+        self._fitness = None
+        self._fitness_version = None
+
     @classmethod
-    def calculated_weight(cls):
+    def calculated_weight(cls, rng=None):
         """
         Calculate birth weight of the animal from gaussian distribution
 
+        :param: rng: numpy Generator for the random number, the random module is used if it is None
         :return: weight of the new animal
         """
-        return random.gauss(cls.parameters['w_birth'], cls.parameters['sigma_birth'])
+        if rng is None:
+            return random.gauss(cls.parameters['w_birth'], cls.parameters['sigma_birth'])
+        return rng.normal(cls.parameters['w_birth'], cls.parameters['sigma_birth'])
 
     @property
     def age(self):
@@ -84,9 +177,10 @@ class Animal:
     @age.setter
     def age(self, new_age):
         """
-        New age setter
+        New age setter, the cached fitness must be calculated again
         """
         self._age = new_age
+        self._fitness = None
 
     @property
     def weight(self):
@@ -98,15 +192,17 @@ class Animal:
     @weight.setter
     def weight(self, new_weight):
         """
-        New weight setter
+        New weight setter, the cached fitness must be calculated again
         """
         self._weight = new_weight
+        self._fitness = None
 
     def grows_in_age(self):
         """
         Animals are growing up in age every year.
         """
         self._age += 1
+        self._fitness = None
 
     def weight_lose(self):
         """
@@ -118,13 +214,25 @@ class Animal:
     @property
     def fitness(self):
         """
-        Find the fitness of the animals
+        Find the fitness of the animals. The fitness is cached, and calculated again only when
+        age, weight or the parameters of the species have changed.
 
         If the weight is is more than 0, the fitness will be calculated by this formula:
         q^(+) * q^(-), where
         q^(+) = 1/(1+exp(phi age*(age-a_half)) and
         q^(-) = 1/(1+exp(phi weight*(weight-w_half))
         """
+        if self._fitness is None or self._fitness_version != self._parameters_version:
+            self._fitness = self.calculate_fitness()
+            self._fitness_version = self._parameters_version
+        return self._fitness
+
+    def calculate_fitness(self):
+        """
+        Calculate the fitness of the animal without using the cache
+
+        :return: the fitness
+        """
         q_plus = 1 / (1 + math.exp(
             self.parameters["phi_age"] * (self.age - self.parameters["a_half"])
         ))
@@ -137,22 +245,40 @@ class Animal:
         else:
             return q_plus * q_minus
 
-    def baby(self, number_of_animal):
+    @classmethod
+    def fitness_of_population(cls, ages, weights):
+        """
+        Calculate the fitness for a whole population in one numpy call, with the same formula
+        as the fitness property.
+
+        :param: ages: array with the ages of the animals
+        :param: weights: array with the weights of the animals
+        :return: array with the fitness, 0 where the weight is 0 or less
+        """
+        ages = np.asarray(ages, dtype=float)
+        weights = np.asarray(weights, dtype=float)
+        with np.errstate(over="ignore"):
+            q_plus = 1 / (1 + np.exp(cls.parameters["phi_age"] * (ages - cls.parameters["a_half"])))
+            q_minus = 1 / (1 + np.exp(-cls.parameters["phi_weight"] * (weights - cls.parameters["w_half"])))
+        return np.where(weights <= 0, 0.0, q_plus * q_minus)
+
+    def baby(self, number_of_animal, rng=None):
         """
         A function where it check each animals probability to give birth in a year.
         The function has also the ability to update the weight.
 
         :param: number_of_animal: the number of animal
+        :param: rng: numpy Generator for the random numbers, the random module is used if it is None
         :return: None if it is not birth
                  New born if the birth occurs
         """
         probability = min(1, self.parameters["gamma"] * self.fitness * (number_of_animal - 1))
-        random_number_check = random.random()
+        random_number_check = random_number(rng)
 
         if self.weight < self.parameters["zeta"] * (self.parameters["w_birth"] + self.parameters["sigma_birth"]):
             return None
         elif random_number_check < probability:
-            new_baby = type(self)()
+            new_baby = type(self)(rng=rng)
             if new_baby.weight * self.parameters["xi"] < self.weight:
                 self.weight -= self.parameters["xi"] * new_baby.weight
                 return new_baby
@@ -161,13 +287,14 @@ class Animal:
         else:
             return None
 
-    def death(self):
+    def death(self, rng=None):
         """
         If the weight is 0 than the animal is dead.
         If the weight is greater than 0 than we have to compare
         the death probability against a random number and will return
         the result, either False or True
 
+        :param: rng: numpy Generator for the random number, the random module is used if it is None
         :return: True or False
         """
 
@@ -175,16 +302,17 @@ class Animal:
         if self.weight == 0:
             return True
         else:
-            return random.random() < death_probability
+            return random_number(rng) < death_probability
 
-    def possible_for_moving(self):
+    def possible_for_moving(self, rng=None):
         """
         Chek the possible for an animal to move to an another cell or not
 
+        :param: rng: numpy Generator for the random number, the random module is used if it is None
         :return: True or False
         """
         probability = self.parameters["mu"] * self.fitness
-        return random.random() < probability
+        return random_number(rng) < probability
 
 
 class Herbivore(Animal):
@@ -210,15 +338,16 @@ class Herbivore(Animal):
         "DeltaPhiMax": None,
     }
 
-    def __init__(self, age=None, weight=None):
+    def __init__(self, age=None, weight=None, rng=None):
         """
         Initializing the Herbivore class
 
         :params: age: age of the new herbivore
         :params: weight: weight of the new herbivore. If weight is None, it will be
                          calculated by gaussian distribution.
+        :params: rng: numpy Generator for the weight, the random module is used if it is None
         """
-        super().__init__(age, weight)
+        super().__init__(age, weight, rng)
 
     def eat(self, amount_of_food):
         """
@@ -228,6 +357,7 @@ class Herbivore(Animal):
         :para: amount_of_food: amount of food eaten
         """
         self._weight += self.parameters["beta"] * amount_of_food
+        self._fitness = None
 
 
 class Carnivore(Animal):
@@ -251,22 +381,24 @@ class Carnivore(Animal):
         "DeltaPhiMax": 10.0,
     }
 
-    def __init__(self, age=None, weight=None):
+    def __init__(self, age=None, weight=None, rng=None):
         """
         Initializing the Carnivore class
 
         :params: age: age of the new carnivore
         :params: weight: weight of the new carnivore. If weight is None, it will be
                          calculated by gaussian distribution.
+        :params: rng: numpy Generator for the weight, the random module is used if it is None
         """
-        super().__init__(age, weight)
+        super().__init__(age, weight, rng)
         self.kill_probability = None
 
-    def probability_to_kill(self, herbivore):
+    def probability_to_kill(self, herbivore, rng=None):
         """
         Chek the possible for an carnivore to eat/kill a herbivore
 
         :param: herbivore: a herbivore
+        :param: rng: numpy Generator for the random number, the random module is used if it is None
         :return: True or False
                  True if herbivore is killed and False if not killed
         """
@@ -277,35 +409,48 @@ class Carnivore(Animal):
         else:
             self.kill_probability = 1
 
-        return random.random() < self.kill_probability
+        return random_number(rng) < self.kill_probability
 
-    def carnivore_eat(self, herbivore_least_fit):
+    def kill_herbivores(self, herbivore_least_fit, herbivore_fitness, alive, rng=None):
         """
-        Find out how many herbivores are killed by carnivores.
-        The function did also update the amount of food and the weight
+        The carnivore tries to kill the herbivores in the given order, and stops when it has eaten F or
+        when the next living herbivore is at least as fit as the carnivore. The killed herbivores are
+        marked in alive, so the list does not have to be rebuilt for every carnivore.
+        The function does also update the weight of the carnivore.
 
         :params: herbivore_least_fit: A list with herbivore sorted by fitness
-        :return: updated_herbivore: a list without killed herbivores
+        :params: herbivore_fitness: The fitness of the herbivores, in the same order
+        :params: alive: A list with True for the herbivores that are alive, killed herbivores are set to False
+        :params: rng: numpy Generator for the random numbers, the random module is used if it is None
         """
         amount_of_food = 0
-        updated_herbivore = []
-        killed_herbivore = []
         appetite = self.parameters["F"]
 
-        for herbivore in herbivore_least_fit:
-            if herbivore.fitness >= self.fitness:
+        for index, herbivore in enumerate(herbivore_least_fit):
+            if not alive[index]:
+                continue
+            if herbivore_fitness[index] >= self.fitness:
                 break
             if amount_of_food >= appetite:
                 break
-            if self.probability_to_kill(herbivore) is True:
-                killed_herbivore.append(herbivore)
+            if self.probability_to_kill(herbivore, rng) is True:
+                alive[index] = False
                 if herbivore.weight + amount_of_food < appetite:
                     amount_of_food += herbivore.weight
                     self.weight += self.parameters["beta"] * herbivore.weight
                 else:
                     self.weight += (self.parameters["F"] - amount_of_food) * self.parameters["beta"]
                     amount_of_food += self.parameters["F"] - amount_of_food
-        for herb in herbivore_least_fit:
-            if herb not in killed_herbivore:
-                updated_herbivore.append(herb)
-        return updated_herbivore
+
+    def carnivore_eat(self, herbivore_least_fit):
+        """
+        Find out how many herbivores are killed by carnivores.
+        The function did also update the amount of food and the weight
+
+        :params: herbivore_least_fit: A list with herbivore sorted by fitness
+        :return: updated_herbivore: a list without killed herbivores
+        """
+        herbivore_fitness = [herbivore.fitness for herbivore in herbivore_least_fit]
+        alive = [True] * len(herbivore_least_fit)
+        self.kill_herbivores(herbivore_least_fit, herbivore_fitness, alive)
+        return [herbivore for herbivore, is_alive in zip(herbivore_least_fit, alive) if is_alive]
@@ -0,0 +1,131 @@
+# -*- encoding: utf-8 -*-
+"""
+This script contains a function called burn_in, which runs the first years of a simulation once and writes them
+to a checkpoint, and a class called Branches, which continues many runs from that checkpoint in parallel.
+
+Every branch starts from the same state of the island, but the random generators are started again from the
+seed of the branch, so the branches are independent. A branch can also have its own parameters, named as in
+sweep.py, e.g. "Herbivore.zeta" or "L.f_max", and a population that is added when it starts, e.g. the carnivores
+that are added after a burn-in with only herbivores.
+
+The checkpoint is read once in the main process. Where the worker processes are started with fork, the arrays
+of the checkpoint are shared copy-on-write with all the workers, and are not sent to them or read again. Else
+every worker gets one copy when it starts.
+
+To use this script the user has to have installed the numpy package to the Python environment.
+"""
+
+__author__ = "Anish Thangalingam & Majorann Thevarajah"
+__email__ = "anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no"
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import numpy as np
+
+from .checkpoint import read_checkpoint
+from .ensemble import EnsembleStatistics, isolated_parameters
+from .simulation import BioSim
+from .sweep import split_point
+
+_burn_in = None
+
+
+def burn_in(island_map, ini_pop, seed, num_years, filename, engine="object"):
+    """
+    Run the first years of a simulation headless, and write them to a checkpoint
+
+    :param: island_map: Multi-line string specifying island geography
+    :param: ini_pop: List of dictionaries specifying initial population
+    :param: seed: seed of the burn-in
+    :param: num_years: the number of years of the burn-in
+    :param: filename: name of the checkpoint file, e.g. ’burn_in.npz’
+    :param: engine: the engine, see BioSim
+    :return: the name of the checkpoint file
+    """
+    sim = BioSim(island_map, ini_pop, seed, engine=engine, headless=True)
+    sim.simulate(num_years)
+    sim.save_checkpoint(filename)
+    return filename
+
+
+def set_burn_in(checkpoint):
+    """
+    Set the checkpoint the branches start from in this process
+
+    :param: checkpoint: the metadata and the arrays from read_checkpoint
+    """
+    global _burn_in
+    _burn_in = checkpoint
+
+
+def run_branch(job):
+    """
+    One branch, continued from the checkpoint set with set_burn_in. This function runs in the worker processes.
+
+    :param: job: tuple with the seed, the point with the parameters, the population to add and num_years
+    :return: array with the number of each species for every year, with shape (num_years, 2)
+    """
+    seed, point, population, num_years = job
+    metadata, arrays = _burn_in
+    with isolated_parameters():
+        sim = BioSim.from_checkpoint(metadata, arrays, seed, headless=True)
+        with isolated_parameters(*split_point(point)):
+            sim.add_population(population)
+            sim.simulate(num_years, record=["num_animals_per_species"])
+    return np.array([[counts[species] for species in EnsembleStatistics.species_names]
+                     for counts in sim.records["num_animals_per_species"]], dtype=int).reshape(num_years, -1)
+
+
+class Branches:
+    """
+    Many runs that are continued from the same checkpoint, each with its own seed
+    """
+
+    def __init__(self, filename, seeds, points=None, population=None):
+        """
+        :param: filename: name of the checkpoint file, e.g. from burn_in
+        :param: seeds: the seeds of the branches, one branch per seed
+        :param: points: list with one dictionary of parameters per branch, see split_point, or None to keep the
+                        parameters of the checkpoint in all the branches
+        :param: population: List of dictionaries specifying a population that is added to every branch
+        """
+        self.seeds = list(seeds)
+        self.points = [{} for _ in self.seeds] if points is None else [dict(point) for point in points]
+        if len(self.points) != len(self.seeds):
+            raise ValueError("There must be one point for every seed")
+        self.population = population or []
+        self.checkpoint = read_checkpoint(filename)
+
+        # Check the parameter names here, so a wrong name is found before the runs start
+        for point in self.points:
+            with isolated_parameters(*split_point(point)):
+                pass
+
+    def jobs(self, num_years):
+        """
+        The jobs for the worker processes, one per branch
+
+        :param: num_years: number of years to simulate
+        """
+        for seed, point in zip(self.seeds, self.points):
+            yield seed, point, self.population, num_years
+
+    def run(self, num_years, workers=None):
+        """
+        Run all the branches in a process pool
+
+        :param: num_years: number of years to simulate after the checkpoint
+        :param: workers: number of worker processes, the number of processors if it is None
+        :return: list with the number of each species for every year, with shape (num_years, 2), for every branch
+        """
+        if "fork" in multiprocessing.get_all_start_methods():
+            set_burn_in(self.checkpoint)
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"))
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=set_burn_in,
+                                           initargs=(self.checkpoint,))
+        try:
+            with executor:
+                return list(executor.map(run_branch, self.jobs(num_years)))
+        finally:
+            set_burn_in(None)
@@ -0,0 +1,169 @@
+# -*- encoding: utf-8 -*-
+"""
+This script contains the functions that write and read checkpoints of a simulation, so a long run can be
+continued later, also in another process.
+
+A checkpoint is one uncompressed .npz file. The island map, the engine, the seed, the year, the image counter
+and the parameters of the animals and landscapes are stored as JSON in the array "metadata". Everything else is
+stored as numpy arrays, see Island.get_state: the amount of food and the random generator of every cell, and the
+cell, age and weight of every animal of each species as three columns. No animal objects are pickled, so the file
+is small and fast to write and read.
+
+The state of a numpy Generator (PCG64) is stored as six unsigned 64 bit integers, see pack_generator_state.
+The random numbers a cell has drawn but not used yet are stored too, see RandomNumbers.buffered. The states of
+the random module and of np.random are also stored, since they are used when the simulation has no seed.
+
+The file is first written with another name and then renamed, so a run that stops while writing never leaves
+a broken checkpoint.
+
+To use this script the user has to have installed the numpy package to the Python environment.
+"""
+
+__author__ = "Anish Thangalingam & Majorann Thevarajah"
+__email__ = "anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no"
+
+import json
+import os
+import random
+import numpy as np
+
+CHECKPOINT_VERSION = 1
+_LOW_BITS = (1 << 64) - 1
+random_state_arrays = ("rng_state", "uniforms", "uniform_counts", "normals", "normal_counts", "island_rng_state",
+                       "random_state", "random_gauss", "np_random_keys", "np_random_position", "np_random_gauss")
+
+
+def pack_generator_state(rng):
+    """
+    The state of a numpy Generator as six numbers
+
+    :param: rng: numpy Generator with a PCG64 bit generator, e.g. from np.random.default_rng
+    :return: array with the high and low bits of the state and the increment, has_uint32 and uinteger
+    """
+    state = rng.bit_generator.state
+    if state["bit_generator"] != "PCG64":
+        raise ValueError("Only the state of a PCG64 generator can be stored")
+    value, increment = state["state"]["state"], state["state"]["inc"]
+    return np.array([value >> 64, value & _LOW_BITS, increment >> 64, increment & _LOW_BITS,
+                     state["has_uint32"], state["uinteger"]], dtype=np.uint64)
+
+
+def unpack_generator_state(rng, packed):
+    """
+    Set the state of a numpy Generator from pack_generator_state
+
+    :param: rng: numpy Generator with a PCG64 bit generator
+    :param: packed: array with six numbers from pack_generator_state
+    """
+    packed = [int(number) for number in packed]
+    rng.bit_generator.state = {"bit_generator": "PCG64",
+                               "state": {"state": (packed[0] << 64) | packed[1], "inc": (packed[2] << 64) | packed[3]},
+                               "has_uint32": packed[4], "uinteger": packed[5]}
+
+
+def generator_arrays(generators):
+    """
+    The states of the random generators of some cells as arrays
+
+    :param: generators: list with the RandomNumbers of every cell, or None for a cell without a generator
+    :return: dictionary with the packed states, and the numbers that are drawn but not used yet with the count
+             for every cell
+    """
+    states = np.zeros((len(generators), 6), dtype=np.uint64)
+    uniforms = [np.zeros(0)]
+    normals = [np.zeros(0)]
+    uniform_counts = np.zeros(len(generators), dtype=int)
+    normal_counts = np.zeros(len(generators), dtype=int)
+    for row, random_numbers in enumerate(generators):
+        if random_numbers is None:
+            continue
+        states[row] = pack_generator_state(random_numbers.rng)
+        cell_uniforms, cell_normals = random_numbers.buffered()
+        uniforms.append(cell_uniforms)
+        normals.append(cell_normals)
+        uniform_counts[row] = len(cell_uniforms)
+        normal_counts[row] = len(cell_normals)
+    return {"rng_state": states, "uniforms": np.concatenate(uniforms), "uniform_counts": uniform_counts,
+            "normals": np.concatenate(normals), "normal_counts": normal_counts}
+
+
+def generator_rows(arrays):
+    """
+    Split the arrays from generator_arrays into one state per cell
+
+    :param: arrays: dictionary from generator_arrays
+    :return: list with the packed state, the unused uniform numbers and the unused normal numbers of every cell
+    """
+    uniforms = np.split(arrays["uniforms"], np.cumsum(arrays["uniform_counts"])[:-1])
+    normals = np.split(arrays["normals"], np.cumsum(arrays["normal_counts"])[:-1])
+    return list(zip(arrays["rng_state"], uniforms, normals))
+
+
+def global_random_state():
+    """
+    The states of the random module and of np.random as arrays
+
+    :return: dictionary with the arrays
+    """
+    version, internal_state, gauss_next = random.getstate()
+    _, keys, position, has_gauss, cached_gaussian = np.random.get_state()
+    return {"random_state": np.array((version,) + internal_state, dtype=np.uint64),
+            "random_gauss": np.array([np.nan if gauss_next is None else gauss_next]),
+            "np_random_keys": np.asarray(keys, dtype=np.uint32),
+            "np_random_position": np.array([position, has_gauss], dtype=int),
+            "np_random_gauss": np.array([cached_gaussian])}
+
+
+def restore_global_random_state(arrays):
+    """
+    Set the states of the random module and of np.random from global_random_state
+
+    :param: arrays: dictionary with the arrays from global_random_state
+    """
+    version, *internal_state = (int(number) for number in arrays["random_state"])
+    gauss_next = float(arrays["random_gauss"][0])
+    random.setstate((version, tuple(internal_state), None if np.isnan(gauss_next) else gauss_next))
+    position, has_gauss = (int(number) for number in arrays["np_random_position"])
+    np.random.set_state(("MT19937", arrays["np_random_keys"], position, has_gauss,
+                         float(arrays["np_random_gauss"][0])))
+
+
+def without_random_state(arrays):
+    """
+    The arrays of a checkpoint without the states of the random generators, e.g. to start a run from the
+    checkpoint with another seed
+
+    :param: arrays: dictionary with the arrays of a checkpoint
+    :return: dictionary with the other arrays
+    """
+    return {name: array for name, array in arrays.items() if name not in random_state_arrays}
+
+
+def write_checkpoint(filename, metadata, arrays):
+    """
+    Write a checkpoint file. It is written to another file first, and then renamed.
+
+    :param: filename: name of the file, e.g. ’sim.npz’
+    :param: metadata: dictionary that can be written as JSON
+    :param: arrays: dictionary with the name as key and a numpy array as value
+    """
+    metadata = dict(metadata, version=CHECKPOINT_VERSION)
+    with open(filename + ".tmp", "wb") as checkpoint_file:
+        np.savez(checkpoint_file, metadata=np.array(json.dumps(metadata)), **arrays)
+    os.replace(filename + ".tmp", filename)
+
+
+def read_checkpoint(filename):
+    """
+    Read a checkpoint file
+
+    :param: filename: name of the file
+    :return: the metadata as a dictionary, and a dictionary with all the arrays
+    """
+    with np.load(filename, allow_pickle=False) as checkpoint:
+        arrays = {name: checkpoint[name] for name in checkpoint.files}
+    metadata = json.loads(str(arrays.pop("metadata")))
+    if metadata.get("version") != CHECKPOINT_VERSION:
+        raise ValueError("The checkpoint has version {}, can only read version {}".format(
+            metadata.get("version"), CHECKPOINT_VERSION))
+    return metadata, arrays
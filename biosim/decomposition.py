@@ -0,0 +1,365 @@
+# -*- encoding: utf-8 -*-
+"""
+This script contains a class called DecomposedIsland, which splits the rows of the island map into strips,
+and lets one worker process do the annual cycle for each strip. It also contains the class StripIsland,
+which is the part of the island a worker owns, and the function strip_worker, which is run in the workers.
+
+Every year the workers first do the phases before the migration in their own cells, and put the migrating
+animals in outbound buffers. The animals that move to a cell in another strip are sent to the main process,
+which sends them on to the worker that owns the cell. This is the halo exchange: a strip also knows the row
+above and the row below it, so the migrants can choose a neighbour cell there. Then the workers add the
+arrivals and do the phases after the migration, and send the number of animals in their cells back.
+
+Every cell uses the random generator with its own number in the whole map, and the arrivals are added in the
+order of the cells they come from, so the result is the same as for Island with the same seed.
+
+The worker processes run until close is called, so the island, or BioSim with the engine "decomposed", should be
+used in a with block. If a worker raises an error, all the workers are stopped and the error is raised in the
+main process.
+
+To use this script the user has to have installed the numpy package to the Python environment.
+"""
+
+__author__ = "Anish Thangalingam & Majorann Thevarajah"
+__email__ = "anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no"
+
+import multiprocessing
+import os
+import traceback
+import numpy as np
+
+from .island import Island
+from .parameters import current_parameters, restore_parameters
+
+
+class StripIsland(Island):
+    """
+    The rows of the island that one worker owns, with the row above and below as halo
+    """
+
+    def __init__(self, island_map, first_row, last_row, backend="object", seed=None):
+        """
+        :param island_map: the map of the whole island
+        :param first_row: the first row the strip owns, counted from 1
+        :param last_row: the last row the strip owns
+        :param backend: how the population in each cell is stored, "object" or "array"
+        :param seed: master seed for the random numbers of the whole island
+        """
+        self.first_row = first_row
+        self.last_row = last_row
+        super().__init__(island_map, [], backend, seed)
+
+    def owns(self, loc_pos):
+        """
+        :param: loc_pos, the locations position of a cell
+        :return: True if the cell is in the rows of the strip
+        """
+        return self.first_row <= loc_pos[0] <= self.last_row
+
+    def map_creating(self):
+        """
+        This function creates the cells of the strip and of the halo rows. Only the passable cells of the strip
+        get a random generator, with the same number as in the whole map, since the halo cells are never handled
+        here.
+        The map is checked by DecomposedIsland.
+
+        return: map, it returns the created map
+        """
+        number_of_columns = len(self.line_island[0])
+        for y_coord in range(max(self.first_row - 1, 1), min(self.last_row + 1, len(self.line_island)) + 1):
+            for x_coord, cell_type in enumerate(self.line_island[y_coord - 1], start=1):
+                loc_pos = (y_coord, x_coord)
+                cell_rng = (self.random_generator((y_coord - 1) * number_of_columns + x_coord - 1)
+                            if self.owns(loc_pos) and self.landscapes[cell_type].flag else None)
+                self.map[loc_pos] = self.landscapes[cell_type](self.backend, cell_rng)
+        self.rng = None
+        self.adjacency_creating()
+        self.counters_creating()
+        self.owned_cells = slice(self.cell_index[(self.first_row, 1)],
+                                 self.cell_index[(self.last_row, number_of_columns)] + 1)
+        return self.map
+
+    def state_locations(self):
+        """
+        :return: list with the locations of the cells the strip owns, the halo cells are left out
+        """
+        return self.locations[self.owned_cells]
+
+    def owned_counts(self):
+        """
+        :return: array with the number of each species in every cell of the strip, with shape (2, cells)
+        """
+        return self.animal_counts[:, self.owned_cells].copy()
+
+
+def strip_command(strip, command, payload, staying):
+    """
+    Do one command from the main process in a worker
+
+    :param strip: the StripIsland of the worker
+    :param command: the name of the command
+    :param payload: the data of the command
+    :param staying: list with the migrants of this year that stay in the strip, changed by "before_migration"
+    :return: the reply to the main process
+    """
+    if command == "population":
+        strip.population_in_cell(payload)
+        return strip.owned_counts()
+    elif command == "before_migration":
+        restore_parameters(payload)
+        strip.feeding_and_births()
+        staying.clear()
+        leaving = []
+        for departure in strip.island_emigration():
+            (staying if strip.owns(departure[1]) else leaving).append(departure)
+        return leaving
+    elif command == "after_migration":
+        arrivals = sorted(staying + payload, key=lambda departure: departure[0])
+        strip.immigration([departure[1:] for departure in arrivals])
+        strip.aging_and_death()
+        return strip.owned_counts()
+    elif command == "columns":
+        return strip.get_population_columns(payload)
+    elif command == "get_state":
+        return strip.get_state()
+    elif command == "set_state":
+        strip.set_state(payload)
+        return strip.owned_counts()
+    elif command == "population_state":
+        strip.set_population_state(payload)
+        return strip.owned_counts()
+    raise ValueError("Unknown command {}".format(command))
+
+
+def strip_worker(connection, island_map, first_row, last_row, backend, seed):
+    """
+    The main function of a worker process. It makes the StripIsland, and does what the main process asks for
+    until it gets "close". Every reply is ("ok", result), or ("error", exception, traceback) if the command
+    raised an error, so the main process can raise the error. The worker goes on after an error.
+
+    :param connection: the end of the pipe to the main process
+    :param island_map: the map of the whole island
+    :param first_row: the first row the worker owns
+    :param last_row: the last row the worker owns
+    :param backend: how the population in each cell is stored
+    :param seed: master seed for the random numbers
+    """
+    strip = StripIsland(island_map, first_row, last_row, backend, seed)
+    staying = []
+    while True:
+        command, payload = connection.recv()
+        if command == "close":
+            connection.close()
+            return
+        try:
+            reply = ("ok", strip_command(strip, command, payload, staying))
+        except Exception as err:
+            reply = ("error", err, traceback.format_exc())
+        try:
+            connection.send(reply)
+        except Exception:
+            # The error or the result could not be pickled, so only the traceback is sent
+            connection.send(("error", RuntimeError("The reply of the worker could not be sent"),
+                             traceback.format_exc()))
+
+
+class DecomposedIsland(Island):
+    """
+    Island where the rows are split into strips, and each strip is handled by a worker process
+    """
+
+    def __init__(self, island_map, initial_population=None, backend="array", seed=None, workers=None):
+        """
+        :param island_map: the map of Rossumøya
+        :param initial_population: The population in the island
+        :param backend: how the population in each cell is stored in the workers, "object" or "array"
+        :param seed: master seed for the random numbers, see Island.random_generator
+        :param workers: the number of worker processes, the number of processors if it is None. There are
+                        never more workers than rows.
+        """
+        self.workers = os.cpu_count() if workers is None else workers
+        self._connections = []
+        self._processes = []
+        super().__init__(island_map, initial_population or [], backend, seed)
+
+    def map_creating(self):
+        """
+        This function checks the map, numbers the cells, splits the rows into strips and starts one worker for
+        every strip. The cells are only created in the workers.
+
+        return: map, the map of the main process, which has no cells
+        """
+        self.check_boundary_and_invalid_landscape()
+        self.check_map_lines()
+        number_of_columns = len(self.line_island[0])
+        self.locations = [(y_coord, x_coord) for y_coord in range(1, len(self.line_island) + 1)
+                          for x_coord in range(1, number_of_columns + 1)]
+        self.cell_index = {loc_pos: index for index, loc_pos in enumerate(self.locations)}
+        self.rng = None
+        self.counters_creating()
+
+        strips = [rows for rows in np.array_split(np.arange(1, len(self.line_island) + 1), self.workers)
+                  if len(rows)]
+        self.strip_rows = [(int(rows[0]), int(rows[-1])) for rows in strips]
+        self.strip_cells = [slice(self.cell_index[(first_row, 1)],
+                                  self.cell_index[(last_row, number_of_columns)] + 1)
+                            for first_row, last_row in self.strip_rows]
+
+        context = multiprocessing.get_context()
+        for first_row, last_row in self.strip_rows:
+            connection, worker_connection = context.Pipe()
+            process = context.Process(target=strip_worker, daemon=True,
+                                      args=(worker_connection, self.geo, first_row, last_row, self.backend, self.seed))
+            process.start()
+            self._connections.append(connection)
+            self._processes.append(process)
+        return self.map
+
+    def exchange(self, messages):
+        """
+        This function sends one message to every worker, and waits for all the replies. If a worker gives an
+        error, or has stopped, all the workers are stopped and the first error is raised here.
+
+        :param: messages: list with one (command, payload) per worker
+        :return: list with the reply of every worker
+        """
+        if not self._connections:
+            raise RuntimeError("The worker processes are stopped")
+        replies = []
+        errors = []
+        sent = []
+        for connection, message in zip(self._connections, messages):
+            try:
+                connection.send(message)
+                sent.append(True)
+            except (BrokenPipeError, ConnectionError, OSError):
+                errors.append((RuntimeError("A worker process has stopped"), ""))
+                sent.append(False)
+        for connection, was_sent in zip(self._connections, sent):
+            if not was_sent:
+                continue
+            try:
+                status, *reply = connection.recv()
+            except (EOFError, ConnectionError, OSError):
+                errors.append((RuntimeError("A worker process has stopped"), ""))
+                continue
+            if status == "error":
+                errors.append(tuple(reply))
+            else:
+                replies.append(reply[0])
+
+        if errors:
+            self.close()
+            error, worker_traceback = errors[0]
+            if worker_traceback:
+                raise error from RuntimeError("The error in the worker process:\n" + worker_traceback)
+            raise error
+        return replies
+
+    def strip_of_row(self, row):
+        """
+        :param: row: a row of the map
+        :return: the number of the strip that owns the row
+        """
+        return next(strip for strip, (first_row, last_row) in enumerate(self.strip_rows)
+                    if first_row <= row <= last_row)
+
+    def gather_counts(self, counts_of_strips):
+        """
+        This function puts the numbers of animals from the workers in the running counters of the island
+
+        :param: counts_of_strips: list with the counts from every worker, see StripIsland.owned_counts
+        """
+        for cells, counts in zip(self.strip_cells, counts_of_strips):
+            self.animal_counts[:, cells] = counts
+        for species_index, name in enumerate(self.species_names):
+            self.number_of_animals[name] = int(self.animal_counts[species_index].sum())
+
+    def population_in_cell(self, population):
+        """
+        This function sends the population of every cell to the worker that owns the cell
+
+        :param: population, list with the location and the population of the cells
+        """
+        population_of_strips = [[] for _ in self.strip_rows]
+        for animal in population:
+            if animal["loc"] not in self.cell_index:
+                raise KeyError("The location {} is not on the island".format(animal["loc"]))
+            population_of_strips[self.strip_of_row(animal["loc"][0])].append(animal)
+
+        self.gather_counts(self.exchange([("population", strip_population)
+                                          for strip_population in population_of_strips]))
+
+    def island_season_cycle(self):
+        """
+        This function gives us the cycle for a year. All the workers do the phases before the migration, the
+        migrants that cross into another strip are sent to the workers that own their new cells, and then all the
+        workers add the arrivals and do the phases after the migration.
+        """
+        parameters = current_parameters()
+        incoming = [[] for _ in self.strip_rows]
+        for leaving in self.exchange([("before_migration", parameters)] * len(self._connections)):
+            for departure in leaving:
+                incoming[self.strip_of_row(departure[1][0])].append(departure)
+
+        self.gather_counts(self.exchange([("after_migration", arrivals) for arrivals in incoming]))
+
+    def get_population_columns(self, species):
+        """
+        This function gives us the age, weight and fitness of all the animals of a species on the island, from
+        all the workers
+
+        :param: species: "Herbivore" or "Carnivore"
+        :return: three arrays with the ages, weights and fitness
+        """
+        columns = self.exchange([("columns", species)] * len(self._connections))
+        return tuple(np.concatenate([strip_columns[column] for strip_columns in columns]) for column in range(3))
+
+    def get_state(self):
+        """
+        This function gives the state of the island as numpy arrays, see Island.get_state. Every worker gives the
+        state of its own cells, and the arrays are put together in the order of the strips.
+
+        :return: dictionary with the name of the array as key
+        """
+        states = self.exchange([("get_state", None)] * len(self._connections))
+        return {name: np.concatenate([state[name] for state in states]) for name in states[0]}
+
+    def set_state(self, state):
+        """
+        This function sends the state from get_state to all the workers, and every worker sets the state of its
+        own cells, see Island.set_state
+
+        :param: state: dictionary with the arrays from get_state
+        """
+        self.gather_counts(self.exchange([("set_state", state)] * len(self._connections)))
+
+    def set_population_state(self, state):
+        """
+        This function sends the animals in columns to all the workers, and every worker adds the animals in its
+        own cells, see Island.set_population_state
+
+        :param: state: dictionary with the columns of the animals, see Island.population_state
+        """
+        self.gather_counts(self.exchange([("population_state", state)] * len(self._connections)))
+
+    def close(self):
+        """
+        Stop the worker processes
+        """
+        for connection, process in zip(self._connections, self._processes):
+            if process.is_alive():
+                try:
+                    connection.send(("close", None))
+                except (BrokenPipeError, ConnectionError, OSError):
+                    process.terminate()
+                process.join()
+            connection.close()
+        self._connections = []
+        self._processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
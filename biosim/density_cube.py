@@ -0,0 +1,169 @@
+# -*- encoding: utf-8 -*-
+"""
+This script contains a class called DensityCube, which writes the number of animals of each species in every
+cell for every year to a memory-mapped array on disk, with shape (years, rows, cols, species).
+
+The cube is a normal .npy file, so it can be opened with np.load(filename, mmap_mode="r"), and a range of years
+or a part of the map can be read without reading the whole file. The file is made larger by chunk_years years
+at a time, and only the years that are written are in the shape in the header of the file. So the history of a
+big map over many years never has to be in memory.
+
+The header of the file always has the same size, see npy_header, so the shape can be written again when the
+file grows, without moving the data.
+
+To use this script the user has to have installed the numpy package to the Python environment.
+"""
+
+__author__ = "Anish Thangalingam & Majorann Thevarajah"
+__email__ = "anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no"
+
+import os
+import struct
+import numpy as np
+
+HEADER_SIZE = 128
+
+
+def npy_header(shape, dtype):
+    """
+    The header of a .npy file, version 1.0, with the size HEADER_SIZE
+
+    :param: shape: the shape of the array
+    :param: dtype: the dtype of the array
+    :return: the header as bytes
+    """
+    description = repr({"descr": np.lib.format.dtype_to_descr(np.dtype(dtype)), "fortran_order": False,
+                        "shape": tuple(shape)})
+    text_size = HEADER_SIZE - len(np.lib.format.magic(1, 0)) - 2
+    if len(description) + 1 > text_size:
+        raise ValueError("The shape is too large for the header")
+    return np.lib.format.magic(1, 0) + struct.pack("<H", text_size) + (description.ljust(text_size - 1) +
+                                                                          "\n").encode("latin1")
+
+
+def read_npy_shape(filename):
+    """
+    The shape and dtype of a .npy file written by DensityCube
+
+    :param: filename: name of the file
+    :return: the shape and the dtype
+    """
+    with open(filename, "rb") as cube_file:
+        version = np.lib.format.read_magic(cube_file)
+        if version != (1, 0):
+            raise ValueError("The file {} is not a density cube".format(filename))
+        shape, _, dtype = np.lib.format.read_array_header_1_0(cube_file)
+        if cube_file.tell() != HEADER_SIZE:
+            raise ValueError("The file {} is not a density cube".format(filename))
+    return shape, dtype
+
+
+class DensityCube:
+    """
+    The number of animals of each species in every cell for every year, in a memory-mapped file
+    """
+
+    species_names = ("Herbivore", "Carnivore")
+
+    def __init__(self, filename, chunk_years=100, dtype=np.int32, append=False):
+        """
+        :param: filename: name of the file, e.g. ’density.npy’
+        :param: chunk_years: the number of years the file grows by at a time
+        :param: dtype: the dtype of the numbers in the file
+        :param: append: if True and the file exists, the years are added after the years in the file, else a
+                        new file is written. The size of the map is found from the first year that is recorded.
+        """
+        if chunk_years < 1:
+            raise ValueError("A chunk must have at least one year")
+        self.filename = filename
+        self.chunk_years = chunk_years
+        self.dtype = np.dtype(dtype)
+        self.years = 0
+        self.grid_shape = None
+        self._capacity = 0
+        self._memmap = None
+
+        if append and os.path.exists(filename):
+            shape, self.dtype = read_npy_shape(filename)
+            self.years = shape[0]
+            self.grid_shape = shape[1:3]
+            self._capacity = self.years
+        elif os.path.exists(filename):
+            os.remove(filename)
+
+    @property
+    def year_size(self):
+        """
+        The number of bytes of one year in the file
+        """
+        return self.grid_shape[0] * self.grid_shape[1] * len(self.species_names) * self.dtype.itemsize
+
+    def grow(self):
+        """
+        Make the file chunk_years years larger, and map it to memory again
+        """
+        self._memmap = None
+        self._capacity += self.chunk_years
+        mode = "r+b" if os.path.exists(self.filename) else "w+b"
+        with open(self.filename, mode) as cube_file:
+            cube_file.write(npy_header((self.years,) + tuple(self.grid_shape) + (len(self.species_names),),
+                                       self.dtype))
+            cube_file.truncate(HEADER_SIZE + self._capacity * self.year_size)
+        self._memmap = np.memmap(self.filename, dtype=self.dtype, mode="r+", offset=HEADER_SIZE,
+                                 shape=(self._capacity,) + tuple(self.grid_shape) + (len(self.species_names),))
+
+    def record(self, island, year=None):
+        """
+        Write the number of animals in every cell for one more year
+
+        :param: island: the island, Island, VectorizedIsland or DecomposedIsland
+        :param: year: the year, only used so the cube can be given to BioSim.simulate as a recorder
+        """
+        grids = [island.get_density_grid(species) for species in self.species_names]
+        if self.grid_shape is None:
+            self.grid_shape = grids[0].shape
+        elif tuple(grids[0].shape) != tuple(self.grid_shape):
+            raise ValueError("All the years must have the same map size")
+        if self.years >= self._capacity or self._memmap is None:
+            self.grow()
+        for species_index, grid in enumerate(grids):
+            self._memmap[self.years, :, :, species_index] = grid
+        self.years += 1
+
+    def flush(self):
+        """
+        Write the years in memory to the file, and write the number of years to the header
+        """
+        if self._memmap is None:
+            return
+        self._memmap.flush()
+        with open(self.filename, "r+b") as cube_file:
+            cube_file.write(npy_header((self.years,) + tuple(self.grid_shape) + (len(self.species_names),),
+                                       self.dtype))
+
+    def close(self):
+        """
+        Write the years in memory to the file, and remove the years that are not used from the end of the file
+        """
+        self.flush()
+        self._memmap = None
+        if self.grid_shape is not None:
+            with open(self.filename, "r+b") as cube_file:
+                cube_file.truncate(HEADER_SIZE + self.years * self.year_size)
+            self._capacity = self.years
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def load(filename):
+        """
+        Open the cube in a file without reading it into memory
+
+        :param: filename: name of the file
+        :return: read-only memory-mapped array with shape (years, rows, cols, species)
+        """
+        return np.load(filename, mmap_mode="r")
@@ -0,0 +1,250 @@
+# -*- encoding: utf-8 -*-
+"""
+This script contains a class called Ensemble, which runs the same island with many seeds, and a class
+called EnsembleStatistics, which collects the number of animals of all the runs.
+
+The runs are done headless in a process pool, see BioSim. Every run sends the number of animals of each
+species for every year back to the main process, where the numbers are added to the statistics and then
+thrown away. So the memory does not grow with the number of runs. The statistics gives the mean, the
+standard deviation, quantiles and the probability that a species has died out, for every year.
+
+The parameters of the animals and landscapes are stored in the classes, so a run that changes them would
+change them for all the other runs in the same process. Every run therefore sets the parameters it is given,
+and sets the old parameters back when it is done, see isolated_parameters.
+
+To use this script the user has to have installed the numpy package to the Python environment.
+"""
+
+__author__ = "Anish Thangalingam & Majorann Thevarajah"
+__email__ = "anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no"
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+import itertools
+import os
+import numpy as np
+
+from .parameters import current_parameters, restore_parameters
+from .simulation import BioSim
+
+
+@contextmanager
+def isolated_parameters(animal_parameters=None, landscape_parameters=None, base=None):
+    """
+    Set parameters of the animals and landscapes with BioSim.set_animal_parameters and
+    BioSim.set_landscape_parameters, and set the old parameters back afterwards, also if there is an error.
+
+    :param: animal_parameters: dictionary with the species as key and the new parameters as value
+    :param: landscape_parameters: dictionary with the landscape letter as key and the new parameters as value
+    :param: base: parameters from current_parameters that are set first, e.g. those of another process
+    """
+    saved = current_parameters()
+    try:
+        if base is not None:
+            restore_parameters(base)
+        for species, params in (animal_parameters or {}).items():
+            BioSim.set_animal_parameters(species, params)
+        for landscape, params in (landscape_parameters or {}).items():
+            BioSim.set_landscape_parameters(landscape, params)
+        yield
+    finally:
+        restore_parameters(saved)
+
+
+def run_seed(job):
+    """
+    One headless run of the island. This function runs in the worker processes.
+
+    :param: job: tuple with island_map, ini_pop, seed, num_years, engine, base parameters, animal parameters
+                 and landscape parameters
+    :return: array with the number of each species for every year, with shape (num_years, 2)
+    """
+    island_map, ini_pop, seed, num_years, engine, base, animal_parameters, landscape_parameters = job
+    with isolated_parameters(animal_parameters, landscape_parameters, base):
+        sim = BioSim(island_map, ini_pop, seed, engine=engine, headless=True)
+        sim.simulate(num_years, record=["num_animals_per_species"])
+    return np.array([[counts[species] for species in EnsembleStatistics.species_names]
+                     for counts in sim.records["num_animals_per_species"]], dtype=int).reshape(num_years, -1)
+
+
+def run_seeds(jobs):
+    """
+    Some runs after each other in the same worker process, see run_seed
+
+    :param: jobs: list with the jobs of the runs
+    :return: list with the result of every run
+    """
+    return [run_seed(job) for job in jobs]
+
+
+def default_bin_edges():
+    """
+    The bin edges that are used for the quantiles: one bin for every number up to 50, and then bins that are
+    about 3 % wide up to a million animals. The last bin has all the numbers from a million and up, see
+    EnsembleStatistics.
+
+    :return: array with the bin edges
+    """
+    return np.unique(np.concatenate((np.arange(51), np.round(np.geomspace(50, 1e6, 340)))))
+
+
+class EnsembleStatistics:
+    """
+    Statistics of the number of animals in many runs, collected one run at a time
+    """
+
+    species_names = ("Herbivore", "Carnivore")
+
+    def __init__(self, num_years, bin_edges=None):
+        """
+        :param: num_years: the number of years in every run
+        :param: bin_edges: bin edges for the numbers of animals, used to find the quantiles. The quantiles are
+                           exact for bins with width 1, and else found by interpolation in the bin. The last
+                           bin has no upper edge, and the largest number seen is used as its upper edge instead.
+        """
+        self.num_years = num_years
+        self.bin_edges = default_bin_edges() if bin_edges is None else np.asarray(bin_edges, dtype=float)
+        self.runs = 0
+        shape = (num_years, len(self.species_names))
+        self._sum = np.zeros(shape)
+        self._sum_of_squares = np.zeros(shape)
+        self._extinct = np.zeros(shape, dtype=int)
+        self._maximum = np.zeros(shape)
+        self._histogram = np.zeros(shape + (len(self.bin_edges),), dtype=int)
+
+    def add(self, counts):
+        """
+        Add the numbers of animals of one run
+
+        :param: counts: array with the number of each species for every year, with shape (num_years, 2)
+        """
+        counts = np.asarray(counts)
+        self.runs += 1
+        self._sum += counts
+        self._sum_of_squares += counts.astype(float) ** 2
+        self._extinct += counts == 0
+        self._maximum = np.maximum(self._maximum, counts)
+
+        bins = np.clip(np.searchsorted(self.bin_edges, counts, side="right") - 1, 0, len(self.bin_edges) - 1)
+        years, species = np.indices(counts.shape)
+        np.add.at(self._histogram, (years, species, bins), 1)
+
+    def as_dictionary(self, values):
+        """
+        :param: values: array with shape (num_years, 2)
+        :return: dictionary with one array per species
+        """
+        return {species: values[:, index] for index, species in enumerate(self.species_names)}
+
+    @property
+    def mean(self):
+        """
+        The mean number of each species for every year
+        """
+        return self.as_dictionary(self._sum / max(self.runs, 1))
+
+    @property
+    def std(self):
+        """
+        The standard deviation of the number of each species for every year
+        """
+        mean = self._sum / max(self.runs, 1)
+        return self.as_dictionary(np.sqrt(np.maximum(self._sum_of_squares / max(self.runs, 1) - mean ** 2, 0)))
+
+    @property
+    def extinction_probability(self):
+        """
+        The part of the runs where each species has no animals, for every year
+        """
+        return self.as_dictionary(self._extinct / max(self.runs, 1))
+
+    def quantile(self, q):
+        """
+        The q-quantile of the number of each species for every year
+
+        :param: q: number between 0 and 1, e.g. 0.5 for the median
+        :return: dictionary with one array per species
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("The quantile must be between 0 and 1")
+        cumulative = np.cumsum(self._histogram, axis=2)
+        target = max(q * self.runs, 1)
+        index = np.minimum(np.count_nonzero(cumulative < target, axis=2), len(self.bin_edges) - 1)
+
+        low = self.bin_edges[index]
+        high = np.where(index < len(self.bin_edges) - 1, np.append(self.bin_edges[1:], 0)[index],
+                        np.maximum(self._maximum, low))
+        width = high - low
+        in_bin = np.take_along_axis(self._histogram, index[..., np.newaxis], axis=2)[..., 0]
+        before = np.take_along_axis(cumulative, index[..., np.newaxis], axis=2)[..., 0] - in_bin
+        fraction = (target - before) / np.maximum(in_bin, 1)
+        return self.as_dictionary(np.where(width <= 1, low, low + fraction * width))
+
+
+class Ensemble:
+    """
+    The same island and population, simulated with many seeds in parallel
+    """
+
+    def __init__(self, island_map, ini_pop, seeds, engine="object",
+                 animal_parameters=None, landscape_parameters=None):
+        """
+        :param: island_map: Multi-line string specifying island geography
+        :param: ini_pop: List of dictionaries specifying initial population
+        :param: seeds: the seeds of the runs, one run per seed
+        :param: engine: the engine of the runs, see BioSim
+        :param: animal_parameters: dictionary with the species as key and parameters as value, for every run
+        :param: landscape_parameters: dictionary with the landscape letter as key and parameters as value
+
+        The parameters the classes have when the ensemble is made are used in all the runs, with the
+        animal_parameters and landscape_parameters on top.
+        """
+        self.island_map = island_map
+        self.ini_pop = ini_pop
+        self.seeds = list(seeds)
+        self.engine = engine
+        self.animal_parameters = animal_parameters or {}
+        self.landscape_parameters = landscape_parameters or {}
+        self.base_parameters = current_parameters()
+
+        # Check the parameters here, so a wrong name is found before the runs start
+        with isolated_parameters(self.animal_parameters, self.landscape_parameters):
+            pass
+
+    def jobs(self, num_years):
+        """
+        The jobs for the worker processes, one per seed
+
+        :param: num_years: number of years to simulate
+        """
+        for seed in self.seeds:
+            yield (self.island_map, self.ini_pop, seed, num_years, self.engine, self.base_parameters,
+                   self.animal_parameters, self.landscape_parameters)
+
+    def run(self, num_years, workers=None, chunksize=1, bin_edges=None):
+        """
+        Run all the seeds in a process pool, and collect the statistics while the runs finish
+
+        Only about two chunks of runs per worker are sent to the pool at a time, and a new chunk is sent when
+        one is done. So the jobs that wait and the results that are not added yet do not grow with the number
+        of seeds.
+
+        :param: num_years: number of years to simulate
+        :param: workers: number of worker processes, the number of processors if it is None
+        :param: chunksize: number of runs that are sent to a worker at a time
+        :param: bin_edges: bin edges for the quantiles, see EnsembleStatistics
+        :return: EnsembleStatistics with all the runs
+        """
+        statistics = EnsembleStatistics(num_years, bin_edges)
+        jobs = self.jobs(num_years)
+        chunks = iter(lambda: list(itertools.islice(jobs, chunksize)), [])
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(run_seeds, chunk)
+                       for chunk in itertools.islice(chunks, 2 * (workers or os.cpu_count() or 1))}
+            while futures:
+                future = next(as_completed(futures))
+                futures.remove(future)
+                for counts in future.result():
+                    statistics.add(counts)
+                futures.update(executor.submit(run_seeds, chunk) for chunk in itertools.islice(chunks, 1))
+        return statistics
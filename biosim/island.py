@@ -11,10 +11,13 @@ of the island. Which can be used to form the island map.
 __author__ = "Anish Thangalingam, Majorann Thevarjah"
 __email__ = "anish.thangalingam@nmbu.no ,Majorann.thevarajah@nmbu.no"
 
+import hashlib
+import numbers
 import textwrap
 import numpy as np
 
 
+from .checkpoint import generator_arrays, generator_rows, pack_generator_state, unpack_generator_state
 from .landscape import Water, Desert, Highland, Lowland
 
 
@@ -25,14 +28,21 @@ class Island:
     """
 
     landscapes = {"W": Water, "D": Desert, "H": Highland, "L": Lowland}
+    species_names = ("Herbivore", "Carnivore")
+    cell_generators = True
 
-    def __init__(self, island_map, initial_population=None):
+    def __init__(self, island_map, initial_population=None, backend="object", seed=None):
         """
         This function gives the opportunity to update the parameters
 
         :param island_map: the map of Rossumøya
         :param initial_population: The population in the island
+        :param backend: how the population in each cell is stored, "object" or "array"
+        :param seed: master seed for the random numbers, see random_generator and seed_entropy. If it is None,
+                     the random module and np.random are used.
         """
+        self.backend = backend
+        self.seed = self.seed_entropy(seed)
         self.amount_of_herbivores = []
         self.amount_of_carnivores = []
         self.map = {}
@@ -72,6 +82,20 @@ class Island:
             if len(self.line_island[0]) != len(line):
                 raise ValueError("All the lines in the island map must have the same length")
 
+    @staticmethod
+    def neighbour_locations(loc_pos):
+        """
+        This function gives the four neighbour cells of a cell, which are the cells below, above, right and left.
+
+        :param: loc_pos, the locations position of the cell
+        :return: list with the locations of the four neighbour cells
+        """
+        x_coord = loc_pos[1]
+        y_coord = loc_pos[0]
+
+        return [(y_coord + 1, x_coord), (y_coord - 1, x_coord),
+                (y_coord, x_coord + 1), (y_coord, x_coord - 1)]
+
     @staticmethod
     def move_to_cell(loc_pos):
         """
@@ -81,11 +105,7 @@ class Island:
         :param: loc_pos, the locations position of the cell
         :return: Random cell from the four neighbouring cells
         """
-        x_coord = loc_pos[1]
-        y_coord = loc_pos[0]
-
-        neighbour_cells_loc = [(y_coord + 1, x_coord), (y_coord - 1, x_coord),
-                               (y_coord, x_coord + 1), (y_coord, x_coord - 1)]
+        neighbour_cells_loc = Island.neighbour_locations(loc_pos)
 
         random_cell_from_list = np.random.choice(len(neighbour_cells_loc))
         cell = neighbour_cells_loc[random_cell_from_list]
@@ -104,64 +124,503 @@ class Island:
             pop = animal["pop"]
             loc = animal["loc"]
             self.map[loc].set_a_population(pop)
+            self.update_counts(loc)
+            if self.is_occupied(loc):
+                self.active_cells.add(loc)
+
+    @staticmethod
+    def structured_columns(population):
+        """
+        This function splits a structured numpy array with one animal per element into columns
+
+        :param: population: structured array with the fields loc, species, age and weight, where loc has the row
+                            and the column, or with the fields row and col instead of loc
+        :return: the locations with shape (n, 2), the species, the ages and the weights
+        """
+        if "loc" in population.dtype.names:
+            loc = population["loc"]
+        else:
+            loc = np.stack((population["row"], population["col"]), axis=-1)
+        return loc, population["species"], population["age"], population["weight"]
+
+    @staticmethod
+    def integer_column(values, name):
+        """
+        This function makes an integer array from a column, and checks that no value is rounded by it
+
+        :param: values: the column
+        :param: name: the name of the column, used in the error message
+        :return: the column as an integer array
+        """
+        values = np.asarray(values)
+        if not np.issubdtype(values.dtype, np.integer):
+            if not np.issubdtype(values.dtype, np.number) or \
+                    not np.all(np.isfinite(values) & (values == np.round(values))):
+                raise ValueError("The {} must be whole numbers".format(name))
+        return values.astype(int)
+
+    def add_population_columns(self, loc, species=None, age=None, weight=None):
+        """
+        This function adds many animals at once from columns, instead of a list with one dictionary per animal.
+        All the animals are checked at once with numpy before any of them are added: the species must be
+        Herbivore or Carnivore, the age and weight must be non-negative and the location must be a passable cell
+        on the island. The animals are then grouped by cell, and every cell gets all its animals at once.
+
+        :param: loc: array with the row and the column of every animal, with shape (n, 2), or a structured array
+                     with all the columns, see structured_columns
+        :param: species: array with "Herbivore" or "Carnivore" for every animal, or one species for all of them
+        :param: age: array with the age of every animal, or one age for all of them
+        :param: weight: array with the weight of every animal, or one weight for all of them
+
+        The locations and the ages must be whole numbers, so the animals are the same as when they are added as
+        dictionaries.
+        """
+        if isinstance(loc, np.ndarray) and loc.dtype.names is not None:
+            loc, species, age, weight = self.structured_columns(loc)
+        loc = self.integer_column(loc, "locations").reshape(-1, 2)
+        species, age, weight = (np.full(len(loc), column) if np.ndim(column) == 0 else column
+                                for column in (species, age, weight))
+        species = np.asarray(species).astype(str)
+        age = self.integer_column(age, "ages")
+        weight = np.asarray(weight, dtype=float)
+        if not len(loc) == len(species) == len(age) == len(weight):
+            raise ValueError("All the columns must have the same length")
+
+        is_species = {name: species == name for name in self.species_names}
+        if not np.all(np.logical_or.reduce(list(is_species.values()))):
+            raise ValueError("Species can only be Herbivore or Carnivore")
+        if not np.all(age >= 0):
+            raise ValueError("The age must be non-negative")
+        if not np.all(weight >= 0):
+            raise ValueError("The weight must be non-negative")
+
+        number_of_columns = len(self.line_island[0])
+        rows, cols = loc[:, 0], loc[:, 1]
+        on_island = (rows >= 1) & (rows <= len(self.line_island)) & (cols >= 1) & (cols <= number_of_columns)
+        if not np.all(on_island):
+            raise KeyError("The location {} is not on the island".format(tuple(loc[np.argmin(on_island)])))
+        cells = (rows - 1) * number_of_columns + cols - 1
+        passable = np.array([self.landscapes[cell_type].flag for line in self.line_island for cell_type in line])
+        if not np.all(passable[cells]):
+            raise ValueError("Animals can not be placed in water, at {}".format(
+                tuple(loc[np.argmin(passable[cells])])))
+
+        state = {}
+        for name in self.species_names:
+            state[name + "_cell"] = cells[is_species[name]]
+            state[name + "_age"] = age[is_species[name]]
+            state[name + "_weight"] = weight[is_species[name]]
+        self.set_population_state(state)
 
     def map_creating(self):
         """
         This function creates the island map, taking into account that it checks boundary, invalid lanscapes
         and map lines.
 
+        The cells are also numbered, and the neighbours of every cell are found once, see adjacency_creating.
+        Only the passable cells get a random generator, since no animal is ever in the other cells. The
+        generators keep the number of the cell, so the numbers do not change. If cell_generators is False, no
+        cell gets a generator.
+
         return: map, it returns the created map
         """
 
         self.check_boundary_and_invalid_landscape()
         self.check_map_lines()
+        number_of_columns = len(self.line_island[0]) if self.line_island else 0
+        self.rng = self.random_generator(len(self.line_island) * number_of_columns)
         for y_coord, line in enumerate(self.line_island):
             for x_coord, cell_type in enumerate(line):
-                self.map[(y_coord + 1, x_coord + 1)] = self.landscapes[cell_type]()
+                cell_rng = (self.random_generator(y_coord * number_of_columns + x_coord)
+                            if self.cell_generators and self.landscapes[cell_type].flag else None)
+                self.map[(y_coord + 1, x_coord + 1)] = self.landscapes[cell_type](self.backend, cell_rng)
+        self.adjacency_creating()
+        self.counters_creating()
         return self.map
 
+    def counters_creating(self):
+        """
+        This function creates the set of active cells and the running counters of the animals, with one grid per
+        species that shares memory with the counters, see get_density_grid.
+        """
+        self.active_cells = set()
+        self.animal_counts = np.zeros((len(self.species_names), len(self.locations)), dtype=int)
+        self.number_of_animals = {name: 0 for name in self.species_names}
+        number_of_columns = len(self.line_island[0]) if self.line_island else 1
+        self.density_grids = {name: self.animal_counts[species_index].reshape(-1, number_of_columns)
+                              for species_index, name in enumerate(self.species_names)}
+
+    @staticmethod
+    def seed_entropy(seed):
+        """
+        This function makes a non-negative integer from the seed, since SeedSequence only takes those. The
+        seeds random.seed takes are taken here too: a negative integer gives the same numbers as its absolute
+        value, a float with an integer value the same as that integer, and other floats, strings and bytes
+        are hashed.
+
+        :param: seed: the seed, or None
+        :return: non-negative integer, or None if the seed is None
+        """
+        if seed is None:
+            return None
+        if isinstance(seed, numbers.Integral):
+            return abs(int(seed))
+        if isinstance(seed, numbers.Real):
+            if np.isnan(seed):
+                raise ValueError("The seed can not be nan")
+            return abs(int(seed)) if float(seed).is_integer() else abs(hash(float(seed)))
+        if isinstance(seed, (str, bytes, bytearray)):
+            data = seed.encode() if isinstance(seed, str) else bytes(seed)
+            return int.from_bytes(hashlib.sha512(data).digest(), "big")
+        raise TypeError("The seed must be an integer, a float, a string or bytes, not {}".format(
+            type(seed).__name__))
+
+    def random_generator(self, index):
+        """
+        This function makes the numpy Generator with the given number from the master seed. It is the same
+        generator as number index from SeedSequence(seed).spawn. Every cell gets the generator with the same
+        number as the cell index in the whole map, and the number after the last cell is for the whole island.
+        Since every cell only uses its own generator, the result does not depend on the order the cells are
+        handled in, and the cells can be handled in parallel with the same result for the same seed.
+
+        :param: index: the number of the generator
+        :return: the generator, or None if the island has no seed
+        """
+        if self.seed is None:
+            return None
+        return np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=(index,)))
+
+    def adjacency_creating(self):
+        """
+        This function numbers the cells and makes a table of the neighbours of every cell. Every cell has four
+        neighbour slots, in the same order as neighbour_locations, so the table is a compact array where the
+        neighbours of cell i are in row i. Slots outside the map have the index -1.
+
+        neighbour_passable tells if an animal can move to the neighbour in each slot, so a migrating animal only
+        needs a random slot to know where it goes.
+        """
+        self.locations = list(self.map)
+        self.cell_index = {loc_pos: index for index, loc_pos in enumerate(self.locations)}
+        self.passable = np.array([self.map[loc_pos].flag for loc_pos in self.locations], dtype=bool)
+
+        self.neighbours = np.array([[self.cell_index.get(neighbour, -1)
+                                     for neighbour in self.neighbour_locations(loc_pos)]
+                                    for loc_pos in self.locations], dtype=int).reshape(len(self.locations), 4)
+        self.neighbour_passable = (self.neighbours >= 0) & self.passable[self.neighbours]
+
+    def emigration(self, loc_pos):
+        """
+        This function finds the animals that leave a cell this year. Every animal that wants to migrate gets a
+        random neighbour slot, all drawn at once, and if the neighbour cell there is passable it is removed from
+        the cell and put in the outbound buffer. The animals are not added to the new cells here, so every cell
+        can decide its migration independent of the other cells.
+
+        :param: loc_pos, the locations position of the cell
+        :return: list with the new location, the species and the animals for every group of migrating animals
+        """
+        cell = self.map[loc_pos]
+        outbound = []
+        if not cell.flag:
+            return outbound
+
+        index = self.cell_index[loc_pos]
+        rng = np.random if cell.rng is None else cell.rng
+        for species, migrating in zip(("Herbivore", "Carnivore"), cell.migration_masks()):
+            migrants = np.flatnonzero(migrating)
+            slots = rng.choice(4, size=len(migrants))
+            passable = self.neighbour_passable[index, slots]
+            moving = np.zeros(len(migrating), dtype=bool)
+            moving[migrants[passable]] = True
+            moving_slots = slots[passable]
+
+            moved_animals = cell.remove_animals(species, moving)
+            for slot in np.unique(moving_slots):
+                new_loc = self.locations[self.neighbours[index, slot]]
+                outbound.append((new_loc, species, cell.select_animals(moved_animals, moving_slots == slot)))
+        self.update_counts(loc_pos)
+        return outbound
+
+    def immigration(self, arrivals):
+        """
+        This function adds the migrated animals to their new cells.
+
+        :param: arrivals, list with the new location, the species and the animals, as given by emigration
+        """
+        for new_loc, species, animals in arrivals:
+            self.map[new_loc].add_animals(species, animals)
+            self.update_counts(new_loc)
+            self.active_cells.add(new_loc)
+
     def migration(self, loc_pos):
         """
-        This function makes a animal migrate, where flag is the passable landscape for the animal. So if the landscape
-        is suitable for the animal it will migrate there, if not it will move on to another random neighbour cell. When
-        the animal migrate it will be added to the new location and removed from the old.
+        This function makes the animals in one cell migrate, where flag is the passable landscape for the animal.
+        So if the landscape is suitable for the animal it will migrate there, if not it stays. When the animal
+        migrate it will be added to the new location and removed from the old.
 
         :param: loc_pos, the locations position of the cell
         """
+        self.immigration(self.emigration(loc_pos))
 
-        if self.map[loc_pos].flag:
-            migrating_herbivore = self.map[loc_pos].animal_migrate()[0]
-            migrating_carnivore = self.map[loc_pos].animal_migrate()[1]
+    def island_emigration(self):
+        """
+        This function puts the migrating animals of all the cells with animals in outbound buffers, see emigration.
+
+        :return: list with the location the animals come from, the new location, the species and the animals,
+                 in the order of the cells the animals come from
+        """
+        outbound = {loc_pos: self.emigration(loc_pos) for loc_pos in self.active_cells_in_order()}
+        return [(loc_pos,) + departure for loc_pos in sorted(outbound) for departure in outbound[loc_pos]]
+
+    def island_migration(self):
+        """
+        This function makes the animals on the whole island migrate. First every cell puts its migrating animals
+        in an outbound buffer, and when all the cells have decided, all the arrivals are added at once. So no
+        animal can migrate twice in one year. Only the cells with animals are asked. The arrivals are added in
+        the order of the cells they come from, so the animals in a cell always come in the same order.
+        """
+        self.immigration([departure[1:] for departure in self.island_emigration()])
+
+    def is_occupied(self, loc_pos):
+        """
+        This function checks if there are animals in a cell
 
-            for herbivore in migrating_herbivore:
-                new_loc = self.move_to_cell(loc_pos)
-                if self.map[new_loc].flag:
-                    self.map[new_loc].population_herbivore.append(herbivore)
-                    self.map[loc_pos].population_herbivore.remove(herbivore)
-                else:
-                    continue
+        :param: loc_pos, the locations position of the cell
+        :return: True if there is at least one animal in the cell
+        """
+        return self.map[loc_pos].get_number_of_herbivores() + self.map[loc_pos].get_number_of_carnivores() > 0
+
+    def active_cells_in_order(self):
+        """
+        This function gives the cells with animals, in the same order as in the map
 
-            for carnivore in migrating_carnivore:
-                new_loc = self.move_to_cell(loc_pos)
-                if self.map[new_loc].flag:
-                    self.map[new_loc].population_carnivore.append(carnivore)
-                    self.map[loc_pos].population_carnivore.remove(carnivore)
-                else:
-                    continue
+        :return: list with the locations of the active cells
+        """
+        return sorted(self.active_cells, key=self.cell_index.get)
+
+    def remove_empty_cells(self):
+        """
+        This function removes the cells where all the animals have died or moved away from the active cells
+        """
+        self.active_cells = {loc_pos for loc_pos in self.active_cells
+                             if self.animal_counts[:, self.cell_index[loc_pos]].any()}
+
+    def update_counts(self, loc_pos):
+        """
+        This function updates the running counters after the number of animals in a cell has changed. Only the
+        difference from the last count of the cell is added to the total of the island, so this takes the same
+        time no matter how big the island is.
+
+        :param: loc_pos, the locations position of the cell
+        """
+        index = self.cell_index[loc_pos]
+        new_counts = (self.map[loc_pos].get_number_of_herbivores(), self.map[loc_pos].get_number_of_carnivores())
+        for species_index, name in enumerate(self.species_names):
+            self.number_of_animals[name] += int(new_counts[species_index] - self.animal_counts[species_index, index])
+            self.animal_counts[species_index, index] = new_counts[species_index]
+
+    def count_animals(self):
+        """
+        This function counts all the animals again, in every cell. It is only needed if the populations of
+        the cells are changed without using the functions of the island.
+        """
+        for loc_pos in self.map:
+            self.update_counts(loc_pos)
+
+    def get_number_of_animals(self):
+        """
+        This function gives the number of animals of each species on the whole island, from the running counters
+
+        :return: dictionary with the number of herbivores and carnivores
+        """
+        return dict(self.number_of_animals)
+
+    def get_cell_counts(self):
+        """
+        This function gives the number of animals of each species in every cell, from the running counters
+
+        :return: list with row, column, number of herbivores and number of carnivores for every cell
+        """
+        return [[loc_pos[0], loc_pos[1], self.animal_counts[0, index], self.animal_counts[1, index]]
+                for index, loc_pos in enumerate(self.locations)]
+
+    def get_density_grid(self, species):
+        """
+        This function gives the number of animals of a species in every cell as a grid, where the element
+        [row - 1, col - 1] is the cell (row, col). The grid shares memory with the running counters, so it is
+        always up to date and is not created again every year.
+
+        :param: species: "Herbivore" or "Carnivore"
+        :return: 2D numpy array with the number of animals in every cell
+        """
+        return self.density_grids[species]
+
+    def close(self):
+        """
+        This function stops what the island has started. The island has nothing to stop, but DecomposedIsland
+        stops its worker processes.
+        """
+
+    def get_population_columns(self, species):
+        """
+        This function gives us the age, weight and fitness of all the animals of a species on the island, by
+        walking through the cells with animals once
+
+        :param: species: "Herbivore" or "Carnivore"
+        :return: three arrays with the ages, weights and fitness
+        """
+        columns = [self.map[loc_pos].get_population_columns(species) for loc_pos in self.active_cells_in_order()]
+        return tuple(np.concatenate([np.zeros(0)] + [cell_columns[column] for cell_columns in columns])
+                     for column in range(3))
+
+    def get_population_data(self, species, attribute):
+        """
+        This function gives us the age, weight or fitness of all the animals of a species on the island
+
+        :param: species: "Herbivore" or "Carnivore"
+        :param: attribute: "age", "weight" or "fitness"
+        :return: array with one value per animal
+        """
+        return self.get_population_columns(species)[("age", "weight", "fitness").index(attribute)]
+
+    def global_cell_index(self, loc_pos):
+        """
+        :param: loc_pos, the locations position of a cell
+        :return: the number of the cell in the whole map, row by row
+        """
+        return (loc_pos[0] - 1) * len(self.line_island[0]) + loc_pos[1] - 1
+
+    def state_locations(self):
+        """
+        :return: list with the locations of the cells whose state is given by get_state
+        """
+        return self.locations
+
+    def state_cells(self):
+        """
+        :return: dictionary with the number in the whole map of every cell in state_locations as key and the
+                 location as value
+        """
+        return {self.global_cell_index(loc_pos): loc_pos for loc_pos in self.state_locations()}
+
+    def get_state(self):
+        """
+        This function gives the state of the island as numpy arrays, used for checkpoints: the amount of food and
+        the random generator of every cell, and the cell, age and weight of every animal, see population_state.
+        The cells are given by their number in the whole map, see global_cell_index.
+
+        :return: dictionary with the name of the array as key
+        """
+        locations = self.state_locations()
+        state = {"cell": np.array([self.global_cell_index(loc_pos) for loc_pos in locations], dtype=int),
+                 "amount_of_food": np.array([self.map[loc_pos].amount_of_food for loc_pos in locations],
+                                            dtype=float)}
+        state.update(generator_arrays([self.map[loc_pos].random_numbers for loc_pos in locations]))
+        if self.rng is not None:
+            state["island_rng_state"] = pack_generator_state(self.rng)
+        state.update(self.population_state())
+        return state
+
+    def population_state(self):
+        """
+        This function gives the population as three columns per species, with the cell, age and weight of every
+        animal. The animals are given cell by cell, in the same order as in the cells.
+
+        :return: dictionary with e.g. "Herbivore_cell", "Herbivore_age" and "Herbivore_weight" as keys
+        """
+        state = {}
+        for species in self.species_names:
+            cells, ages, weights = [np.zeros(0, dtype=int)], [np.zeros(0)], [np.zeros(0)]
+            for loc_pos in self.active_cells_in_order():
+                age, weight, _ = self.map[loc_pos].get_population_columns(species)
+                cells.append(np.full(len(age), self.global_cell_index(loc_pos)))
+                ages.append(age)
+                weights.append(weight)
+            state[species + "_cell"] = np.concatenate(cells)
+            state[species + "_age"] = np.concatenate(ages)
+            state[species + "_weight"] = np.concatenate(weights)
+        return state
+
+    def set_state(self, state):
+        """
+        This function sets the state from get_state on a new island with the same map and no animals. Only the
+        cells in state_locations are set. If the state has no random generators, see without_random_state, the
+        generators of the island are kept.
+
+        :param: state: dictionary with the arrays from get_state
+        """
+        locations = self.state_cells()
+        generators = generator_rows(state) if "rng_state" in state else [None] * len(state["cell"])
+        for cell, amount_of_food, generator in zip(state["cell"], state["amount_of_food"], generators):
+            loc_pos = locations.get(int(cell))
+            if loc_pos is None:
+                continue
+            self.map[loc_pos].amount_of_food = float(amount_of_food)
+            random_numbers = self.map[loc_pos].random_numbers
+            if random_numbers is not None and generator is not None:
+                unpack_generator_state(random_numbers.rng, generator[0])
+                random_numbers.set_buffered(generator[1], generator[2])
+        if self.rng is not None and "island_rng_state" in state:
+            unpack_generator_state(self.rng, state["island_rng_state"])
+        self.set_population_state(state)
+
+    def set_population_state(self, state):
+        """
+        This function adds the animals from population_state to their cells. The animals in a cell keep their order.
+        Only the animals in the cells in state_locations are added.
+
+        :param: state: dictionary with the arrays from population_state
+        """
+        locations = self.state_cells()
+        for species in self.species_names:
+            cells = state[species + "_cell"]
+            order = np.argsort(cells, kind="stable")
+            cell_numbers, first = np.unique(cells[order], return_index=True)
+            for cell, animals in zip(cell_numbers, np.split(order, first[1:])):
+                loc_pos = locations.get(int(cell))
+                if loc_pos is not None:
+                    self.map[loc_pos].add_population_columns(species, state[species + "_age"][animals],
+                                                             state[species + "_weight"][animals])
+        for loc_pos in locations.values():
+            self.update_counts(loc_pos)
+            if self.is_occupied(loc_pos):
+                self.active_cells.add(loc_pos)
 
     def island_season_cycle(self):
         """
         This function gives us the cycle for a year. These functions work annually and works for all the cells in
-        the island.
+        the island. The migration is done for the whole island between feeding and birth, and weight loss, aging
+        and death, so that the animals that migrate are only handled once in a year.
+
+        Only the active cells, the cells with animals, are handled. Water cells and empty cells are skipped, and
+        the food in a cell is only set again when there are animals in the cell to eat it.
         """
 
-        for loc_pos in self.map:
+        self.feeding_and_births()
+        self.island_migration()
+        self.aging_and_death()
+
+    def feeding_and_births(self):
+        """
+        The phases of the year before the migration, in every cell with animals: the food grows, the herbivores
+        and then the carnivores eat, and the animals give birth.
+        """
+        for loc_pos in self.active_cells_in_order():
             self.map[loc_pos].set_food_parameters()
             self.map[loc_pos].herbivore_eat()
             self.map[loc_pos].carnivore_eat()
             self.map[loc_pos].new_herbivore_babies()
             self.map[loc_pos].new_carnivore_babies()
-            self.migration(loc_pos)
+            self.update_counts(loc_pos)
+
+    def aging_and_death(self):
+        """
+        The phases of the year after the migration, in every cell with animals: the animals lose weight, get one
+        year older and some of them die. The cells without animals are removed from the active cells.
+        """
+        for loc_pos in self.active_cells_in_order():
             self.map[loc_pos].animal_weight_loss()
             self.map[loc_pos].animal_aging()
             self.map[loc_pos].animal_death()
+            self.update_counts(loc_pos)
+
+        self.remove_empty_cells()
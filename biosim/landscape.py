@@ -8,7 +8,10 @@ Purpose of this function is to give detailed information about the landscape and
 what happens inside every landscape. Then use this information about the different cells
 create a map in the island script.
 
-To use this script the user has to have installed the random and operator
+The population in a cell can either be stored as lists of animal objects, or as numpy arrays
+with one array per property, see population.py. This is chosen with the backend parameter.
+
+To use this script the user has to have installed the random, operator and numpy
 package to the Python environment.
 """
 
@@ -16,7 +19,9 @@ __author__ = 'Anish Thangalingam & Majorann Thevarajah'
 __email__ = 'anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no'
 
 
-from biosim.animals import Herbivore, Carnivore
+from biosim.animals import Herbivore, Carnivore, RandomNumbers
+from biosim.population import SpeciesArrays
+import numpy as np
 import operator
 import random
 
@@ -40,13 +45,28 @@ class Landscape:
 
         cls.parameters.update(new_parameter)
 
-    def __init__(self):
+    backends = ("object", "array")
+
+    def __init__(self, backend="object", rng=None):
         """
         In this function we create an empty list for the population, and updates the population.
         The amount of food is given as 0, which will updated.
-        """
+
+        :param: backend: "object" stores the animals as Herbivore and Carnivore objects in lists,
+                         "array" stores them as numpy arrays in SpeciesArrays
+        :param: rng: numpy Generator that is used for all the random numbers in the cell. If it is None,
+                     the random module and np.random are used. The animal objects get their random numbers
+                     in batches from the generator, see RandomNumbers.
+        """
+        if backend not in self.backends:
+            raise ValueError("Backend must be object or array")
+        self.backend = backend
+        self.rng = rng
+        self.random_numbers = None if rng is None else RandomNumbers(rng)
         self.population_herbivore = []
         self.population_carnivore = []
+        self.herbivore_arrays = SpeciesArrays(Herbivore, rng)
+        self.carnivore_arrays = SpeciesArrays(Carnivore, rng)
         self.amount_of_food = 0
 
     def set_a_population(self, population_list):
@@ -56,6 +76,13 @@ class Landscape:
 
         :param: population_list, a list with species
         """
+        if self.backend == "array":
+            for species, arrays in (("Carnivore", self.carnivore_arrays), ("Herbivore", self.herbivore_arrays)):
+                animals = [each_animal for each_animal in population_list if each_animal["species"] == species]
+                arrays.add([each_animal["age"] for each_animal in animals],
+                           [each_animal["weight"] for each_animal in animals])
+            return
+
         for each_animal in population_list:
             if each_animal["species"] == "Carnivore":
                 self.population_carnivore.append(Carnivore(age=each_animal["age"],
@@ -66,13 +93,31 @@ class Landscape:
                 self.population_herbivore.append(Herbivore(age=each_animal["age"],
                                                            weight=each_animal["weight"]))
 
+    def add_population_columns(self, species, ages, weights):
+        """
+        This function adds animals of one species from columns with the age and weight of every animal, e.g.
+        from a checkpoint
+
+        :param: species: "Herbivore" or "Carnivore"
+        :param: ages: array with the age of every animal, the ages are whole numbers
+        :param: weights: array with the weight of every animal
+        """
+        if self.backend == "array":
+            self.species_arrays(species).add(ages, weights)
+            return
+        animal_class = Herbivore if species == "Herbivore" else Carnivore
+        ages = np.asarray(ages).astype(int).tolist()
+        self.add_animals(species, [animal_class(age=age, weight=weight)
+                                   for age, weight in zip(ages, np.asarray(weights).tolist())])
+
     def get_number_of_herbivores(self):
         """
         This function gives us the number of herbivores in the population
 
         :return: number of herbivores
         """
-
+        if self.backend == "array":
+            return len(self.herbivore_arrays)
         return len(self.population_herbivore)
 
     def get_number_of_carnivores(self):
@@ -81,14 +126,69 @@ class Landscape:
 
         :return: number of carnivores
         """
-
+        if self.backend == "array":
+            return len(self.carnivore_arrays)
         return len(self.population_carnivore)
 
+    def species_arrays(self, species):
+        """
+        This function gives us the arrays of a species, used by the array backend
+
+        :param: species: "Herbivore" or "Carnivore"
+        :return: SpeciesArrays of the species
+        """
+        if species == "Herbivore":
+            return self.herbivore_arrays
+        elif species == "Carnivore":
+            return self.carnivore_arrays
+        raise ValueError("Species can only be Herbivore or Carnivore")
+
+    def get_population_columns(self, species):
+        """
+        This function gives us the age, weight and fitness of all the animals of a species in the cell. The animals
+        are only walked through once, and the fitness is found for all of them in one numpy call.
+
+        :param: species: "Herbivore" or "Carnivore"
+        :return: three arrays with the ages, weights and fitness
+        """
+        if self.backend == "array":
+            arrays = self.species_arrays(species)
+            return arrays.age.copy(), arrays.weight.copy(), arrays.fitness.copy()
+
+        population = self.population_herbivore if species == "Herbivore" else self.population_carnivore
+        animal_class = Herbivore if species == "Herbivore" else Carnivore
+        columns = np.array([(animal.age, animal.weight) for animal in population], dtype=float).reshape(-1, 2)
+        return columns[:, 0], columns[:, 1], animal_class.fitness_of_population(columns[:, 0], columns[:, 1])
+
+    def get_population_data(self, species, attribute):
+        """
+        This function gives us the age, weight or fitness of all the animals of a species in the cell
+
+        :param: species: "Herbivore" or "Carnivore"
+        :param: attribute: "age", "weight" or "fitness"
+        :return: array with one value per animal
+        """
+        return self.get_population_columns(species)[("age", "weight", "fitness").index(attribute)]
+
+    def reserve_random_numbers(self, uniforms=0, normals=0):
+        """
+        Draw the random numbers the animal objects need in a phase, with one call to the generator
+
+        :param: uniforms: number of uniform random numbers
+        :param: normals: number of normal random numbers
+        """
+        if self.random_numbers is not None:
+            self.random_numbers.reserve(uniforms, normals)
+
     def animal_aging(self):
         """
         Aging is common for both Herbivores and Carnivores, so when we age them, all the
         animals in the landscape age. The animals age one year for every year that passes.
         """
+        if self.backend == "array":
+            self.herbivore_arrays.aging()
+            self.carnivore_arrays.aging()
+            return
 
         for herbivore in self.population_herbivore:
             herbivore.grows_in_age()
@@ -103,10 +203,15 @@ class Landscape:
 
         :return: the living animals
         """
+        if self.backend == "array":
+            self.carnivore_arrays.death()
+            self.herbivore_arrays.death()
+            return
 
         def living_animals(population):
-            return [animal for animal in population if not animal.death()]
+            return [animal for animal in population if not animal.death(self.random_numbers)]
 
+        self.reserve_random_numbers(uniforms=len(self.population_carnivore) + len(self.population_herbivore))
         self.population_carnivore = living_animals(self.population_carnivore)
         self.population_herbivore = living_animals(self.population_herbivore)
 
@@ -115,6 +220,10 @@ class Landscape:
         Animals losses weight every year, both Herbivores and Carnivores. These for loops makes
         both the herbivores and carnivores to lose weight every year.
         """
+        if self.backend == "array":
+            self.herbivore_arrays.weight_loss()
+            self.carnivore_arrays.weight_loss()
+            return
 
         for herbivore in self.population_herbivore:
             herbivore.weight_lose()
@@ -128,6 +237,9 @@ class Landscape:
         So if a animal is born it will be added to the empty list of newborn herbivores. So the population
         will extend with the list of newborn herbivores.
         """
+        if self.backend == "array":
+            self.herbivore_arrays.births()
+            return
         newborn_herbivores = []
 
         herbivores_present_count = self.get_number_of_herbivores()
@@ -135,8 +247,9 @@ class Landscape:
             return False
 
         if herbivores_present_count >= 2:
+            self.reserve_random_numbers(uniforms=herbivores_present_count, normals=herbivores_present_count)
             for animal in self.population_herbivore:
-                new_born_baby = animal.baby(herbivores_present_count)
+                new_born_baby = animal.baby(herbivores_present_count, self.random_numbers)
                 if new_born_baby is not None:
                     newborn_herbivores.append(new_born_baby)
         self.population_herbivore.extend(newborn_herbivores)
@@ -147,6 +260,9 @@ class Landscape:
         So if a animal is born it will be added to the empty list of newborn carnivores. So the population
         will extend with the list newborn carnivores.
         """
+        if self.backend == "array":
+            self.carnivore_arrays.births()
+            return
         newborn_carnivores = []
 
         carnivores_present_count = self.get_number_of_carnivores()
@@ -154,8 +270,9 @@ class Landscape:
             return False
 
         if carnivores_present_count >= 2:
+            self.reserve_random_numbers(uniforms=carnivores_present_count, normals=carnivores_present_count)
             for animal in self.population_carnivore:
-                new_born_baby = animal.baby(carnivores_present_count)
+                new_born_baby = animal.baby(carnivores_present_count, self.random_numbers)
                 if new_born_baby is not None:
                     newborn_carnivores.append(new_born_baby)
         self.population_carnivore.extend(newborn_carnivores)
@@ -174,7 +291,13 @@ class Landscape:
         they will eat even if the amount of food is less than the required amount of food. The amount of food
         is updated, so that its reduced for every time the herbivores eat.
         """
-        random.shuffle(self.population_herbivore)
+        if self.backend == "array":
+            self.amount_of_food = self.herbivore_arrays.eat_fodder(self.amount_of_food)
+            return
+        if self.rng is None:
+            random.shuffle(self.population_herbivore)
+        else:
+            self.rng.shuffle(self.population_herbivore)
         for herbivore in self.population_herbivore:
             if self.amount_of_food >= herbivore.parameters["F"]:
                 herbivore.eat(herbivore.parameters["F"])
@@ -186,38 +309,117 @@ class Landscape:
     def carnivore_eat(self):
         """
         First sort the Herbivores and Carnivores, so Carnivores with best fitness eat Herbivores with
-        lowest fitness. Then update the list so that the population of herbivore that remains are the
+        lowest fitness. The fitness of the herbivores is found once, and the killed herbivores are marked
+        as not alive. Then the list is updated once, so that the population of herbivore that remains are the
         ones that are not killed by carnivores.
         """
+        if self.backend == "array":
+            self.carnivore_arrays.predation(self.herbivore_arrays)
+            return
+
+        if not self.population_carnivore or not self.population_herbivore:
+            return
 
         self.population_herbivore.sort(key=operator.attrgetter('fitness'))
         self.population_carnivore.sort(key=operator.attrgetter('fitness'), reverse=True)
 
+        herbivore_fitness = [herbivore.fitness for herbivore in self.population_herbivore]
+        alive = [True] * len(self.population_herbivore)
+        self.reserve_random_numbers(uniforms=len(self.population_herbivore))
         for carnivore in self.population_carnivore:
-            updated_herbivore_population = carnivore.carnivore_eat(self.population_herbivore)
-            self.population_herbivore = updated_herbivore_population
+            carnivore.kill_herbivores(self.population_herbivore, herbivore_fitness, alive, self.random_numbers)
+
+        self.population_herbivore = [herbivore for herbivore, is_alive in zip(self.population_herbivore, alive)
+                                     if is_alive]
 
     def animal_migrate(self):
         """
         Animals does not stay in one place forever, it will move around in the island. So if it moves
         it will be added to the list of herbivores and carnivores that have migrated.
 
-        :return: lists, lists of which animals that have migrated
+        :return: lists, lists of which animals that have migrated. For the array backend
+                 it returns boolean arrays instead, True for the animals that migrate.
         """
+        if self.backend == "array":
+            return self.herbivore_arrays.migrants(), self.carnivore_arrays.migrants()
 
         migrated_herbivores = []
         migrated_carnivores = []
 
+        self.reserve_random_numbers(uniforms=len(self.population_herbivore) + len(self.population_carnivore))
         for herbivore in self.population_herbivore:
-            if herbivore.possible_for_moving() is True:
+            if herbivore.possible_for_moving(self.random_numbers) is True:
                 migrated_herbivores.append(herbivore)
 
         for carnivore in self.population_carnivore:
-            if carnivore.possible_for_moving() is True:
+            if carnivore.possible_for_moving(self.random_numbers) is True:
                 migrated_carnivores.append(carnivore)
 
         return migrated_herbivores, migrated_carnivores
 
+    def migration_masks(self):
+        """
+        Find the animals that want to migrate this year. Every animal is asked only once.
+
+        :return: two boolean arrays, True for the herbivores and carnivores that want to migrate
+        """
+        if self.backend == "array":
+            return self.herbivore_arrays.migrants(), self.carnivore_arrays.migrants()
+
+        self.reserve_random_numbers(uniforms=len(self.population_herbivore) + len(self.population_carnivore))
+        return (np.array([herbivore.possible_for_moving(self.random_numbers)
+                          for herbivore in self.population_herbivore], dtype=bool),
+                np.array([carnivore.possible_for_moving(self.random_numbers)
+                          for carnivore in self.population_carnivore], dtype=bool))
+
+    def remove_animals(self, species, mask):
+        """
+        Remove the animals of a species where the mask is True. The population is compacted once with the
+        mask, instead of removing the animals one by one.
+
+        :param: species: "Herbivore" or "Carnivore"
+        :param: mask: boolean array with one value per animal of the species
+        :return: the removed animals, a list of animals or for the array backend a tuple with ages and weights
+        """
+        if self.backend == "array":
+            return self.species_arrays(species).take(mask)
+
+        population = self.population_herbivore if species == "Herbivore" else self.population_carnivore
+        removed = [animal for animal, is_removed in zip(population, mask) if is_removed]
+        remaining = [animal for animal, is_removed in zip(population, mask) if not is_removed]
+        if species == "Herbivore":
+            self.population_herbivore = remaining
+        else:
+            self.population_carnivore = remaining
+        return removed
+
+    @staticmethod
+    def select_animals(animals, mask):
+        """
+        Select some of the animals returned by remove_animals
+
+        :param: animals: a list of animals or a tuple with ages and weights
+        :param: mask: boolean array, True for the animals to select
+        :return: the selected animals, in the same form as animals
+        """
+        if isinstance(animals, tuple):
+            return tuple(column[mask] for column in animals)
+        return [animal for animal, is_selected in zip(animals, mask) if is_selected]
+
+    def add_animals(self, species, animals):
+        """
+        Add animals that were removed from another cell with remove_animals
+
+        :param: species: "Herbivore" or "Carnivore"
+        :param: animals: a list of animals or for the array backend a tuple with ages and weights
+        """
+        if self.backend == "array":
+            self.species_arrays(species).add(*animals)
+        elif species == "Herbivore":
+            self.population_herbivore.extend(animals)
+        else:
+            self.population_carnivore.extend(animals)
+
 
 class Highland(Landscape):
     """
@@ -226,11 +428,14 @@ class Highland(Landscape):
     parameters = {"f_max": 300}
     flag = True
 
-    def __init__(self):
+    def __init__(self, backend="object", rng=None):
         """
         Initializing the Highland class
+
+        :param: backend: how the population is stored, "object" or "array"
+        :param: rng: numpy Generator for the random numbers in the cell
         """
-        super().__init__()
+        super().__init__(backend, rng)
 
 
 class Lowland(Landscape):
@@ -240,11 +445,14 @@ class Lowland(Landscape):
     parameters = {"f_max": 800}
     flag = True
 
-    def __init__(self):
+    def __init__(self, backend="object", rng=None):
         """
         Initializing the Lowland class
+
+        :param: backend: how the population is stored, "object" or "array"
+        :param: rng: numpy Generator for the random numbers in the cell
         """
-        super().__init__()
+        super().__init__(backend, rng)
 
 
 class Water(Landscape):
@@ -255,11 +463,14 @@ class Water(Landscape):
     parameters = {"f_max": 0}
     flag = False
 
-    def __init__(self):
+    def __init__(self, backend="object", rng=None):
         """
         Initializing the Water class
+
+        :param: backend: how the population is stored, "object" or "array"
+        :param: rng: numpy Generator for the random numbers in the cell
         """
-        super().__init__()
+        super().__init__(backend, rng)
 
 
 class Desert(Landscape):
@@ -269,8 +480,11 @@ class Desert(Landscape):
     parameters = {"f_max": 0}
     flag = True
 
-    def __init__(self):
+    def __init__(self, backend="object", rng=None):
         """
         Initializing the Desert class
+
+        :param: backend: how the population is stored, "object" or "array"
+        :param: rng: numpy Generator for the random numbers in the cell
         """
-        super().__init__()
+        super().__init__(backend, rng)
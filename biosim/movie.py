@@ -0,0 +1,197 @@
+# -*- encoding: utf-8 -*-
+"""
+This script contains two classes that write the figures of the simulation while it runs.
+
+MovieWriter makes a movie of the simulation. The pixels of every frame are written as raw RGBA data to
+the standard input of one ffmpeg process, which is started with the first frame and encodes the movie.
+No image files are written on the way. The encoder is only a command that reads raw frames from
+standard input, so any other program that does this can be given instead of ffmpeg, for example a
+small stub program in the tests.
+
+ImageWriter writes the figures as image files in a few background threads, so the simulation can go on
+with the next year while the last figure is encoded and written.
+
+To use this script the user has to have installed the numpy and matplotlib package to the Python
+environment, and ffmpeg has to be installed to make a movie.
+"""
+
+__author__ = "Anish Thangalingam & Majorann Thevarajah"
+__email__ = "anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no"
+
+from concurrent.futures import ThreadPoolExecutor
+import matplotlib.image as mpimg
+import numpy as np
+import subprocess
+import threading
+
+_FFMPEG_BINARY = 'ffmpeg'
+
+
+class MovieWriter:
+    """
+    Writes frames to a movie through a pipe to ffmpeg
+    """
+
+    def __init__(self, filename, fps=10, command=None):
+        """
+        :param: filename: name of the movie file, including path and file type, e.g. ’sim.mp4’
+        :param: fps: frames per second in the movie
+        :param: command: list with the command of the encoder, default is ffmpeg with the options below
+        """
+        self.filename = filename
+        self.fps = fps
+        self.command = command
+        self.frame_size = None
+        self.frames = 0
+        self.finished = False
+        self._process = None
+
+    def encoder_command(self, width, height):
+        """
+        The command that starts the encoder, for frames of the given size. A frame with an odd width or
+        height is padded by one pixel, since yuv420p needs an even size.
+
+        :param: width: width of the frames in pixels
+        :param: height: height of the frames in pixels
+        :return: list with the command and the arguments
+        """
+        if self.command is not None:
+            return list(self.command)
+        return [_FFMPEG_BINARY,
+                "-y",
+                "-f", "rawvideo",
+                "-pix_fmt", "rgba",
+                "-s", "{}x{}".format(width, height),
+                "-r", str(self.fps),
+                "-i", "-",
+                "-profile:v", "baseline",
+                "-level", "3.0",
+                "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+                "-pix_fmt", "yuv420p",
+                self.filename]
+
+    def write_frame(self, frame):
+        """
+        Writes one frame to the encoder. The encoder is started with the first frame, and all the frames
+        must have the same size as the first one. No frames can be written after close, since a new encoder
+        would write the movie file again from the start.
+
+        :param: frame: RGBA pixels of the frame, with shape (height, width, 4), e.g. canvas.buffer_rgba()
+        """
+        if self.finished:
+            raise RuntimeError("The movie {} is finished, no more frames can be written".format(self.filename))
+        pixels = np.asarray(frame, dtype=np.uint8)
+        if pixels.ndim != 3 or pixels.shape[2] != 4:
+            raise ValueError("A frame must have shape (height, width, 4)")
+
+        if self._process is None:
+            height, width = pixels.shape[:2]
+            try:
+                self._process = subprocess.Popen(self.encoder_command(width, height), stdin=subprocess.PIPE)
+            except OSError as err:
+                raise RuntimeError("ERROR: could not start the encoder: {}".format(err))
+            self.frame_size = pixels.shape
+        elif pixels.shape != self.frame_size:
+            raise ValueError("All frames in a movie must have the same size")
+
+        try:
+            self._process.stdin.write(np.ascontiguousarray(pixels).data)
+        except BrokenPipeError:
+            self._process.wait()
+            raise RuntimeError("ERROR: the encoder stopped with code {}".format(self._process.returncode))
+        self.frames += 1
+
+    def close(self):
+        """
+        Ends the movie. The pipe to the encoder is closed and the encoder finishes the file.
+        """
+        self.finished = True
+        if self._process is None:
+            return
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            pass
+        returncode = self._process.wait()
+        self._process = None
+        if returncode != 0:
+            raise RuntimeError("ERROR: the encoder failed with code {}".format(returncode))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ImageWriter:
+    """
+    Writes images to file in background threads
+    """
+
+    formats = ("png", "jpg", "jpeg", "tiff")
+
+    def __init__(self, workers=2, max_pending=8):
+        """
+        :param: workers: number of threads that encode and write the images
+        :param: max_pending: the largest number of images that wait to be written. If there are this many,
+                             submit waits until one of them is written.
+        """
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._futures = []
+        self._error = None
+
+    def submit(self, filename, frame, image_format="png"):
+        """
+        Gives an image to the threads. The pixels are copied, so the frame can be drawn again at once.
+
+        :param: filename: name of the image file
+        :param: frame: RGBA pixels of the image, with shape (height, width, 4), e.g. canvas.buffer_rgba()
+        :param: image_format: file type of the image, one of formats
+        """
+        if image_format not in self.formats:
+            raise ValueError("Image format must be one of {}".format(", ".join(self.formats)))
+        self._raise_error()
+        pixels = np.array(frame, dtype=np.uint8)
+        self._pending.acquire()
+        future = self._executor.submit(self._write, filename, pixels, image_format)
+        self._futures = [each_future for each_future in self._futures if not each_future.done()] + [future]
+
+    def _write(self, filename, pixels, image_format):
+        """
+        Encodes and writes one image, in one of the threads
+        """
+        try:
+            mpimg.imsave(filename, pixels, format=image_format)
+        except Exception as err:
+            if self._error is None:
+                self._error = err
+        finally:
+            self._pending.release()
+
+    def _raise_error(self):
+        """
+        Raises the first error from the threads in the thread of the simulation
+        """
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("ERROR: writing an image failed with: {}".format(error))
+
+    def wait(self):
+        """
+        Waits until all the images that are given are written
+        """
+        for future in self._futures:
+            future.result()
+        self._futures = []
+        self._raise_error()
+
+    def close(self):
+        """
+        Waits for the images and stops the threads
+        """
+        try:
+            self.wait()
+        finally:
+            self._executor.shutdown()
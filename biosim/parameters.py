@@ -0,0 +1,45 @@
+# -*- encoding: utf-8 -*-
+"""
+This script contains functions that copy the parameters of the animals and the landscapes, and set them
+back again. The parameters are stored in the classes, so they are shared by all the islands in a process.
+The copies are used to give other processes the same parameters, and to set the parameters back after
+a run that has changed them.
+
+To use this script the user has to have installed the biosim package to the Python environment.
+"""
+
+__author__ = "Anish Thangalingam & Majorann Thevarajah"
+__email__ = "anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no"
+
+from .animals import Herbivore, Carnivore
+from .landscape import Highland, Lowland
+
+animal_classes = {"Herbivore": Herbivore, "Carnivore": Carnivore}
+landscape_classes = {"H": Highland, "L": Lowland}
+
+
+def current_parameters():
+    """
+    Copy of the parameters of the animals and the landscapes that can be changed
+
+    :return: dictionary with the parameters of every species and landscape, with the name or letter as key
+    """
+    parameters = {name: dict(cls.parameters) for name, cls in animal_classes.items()}
+    parameters.update({letter: dict(cls.parameters) for letter, cls in landscape_classes.items()})
+    return parameters
+
+
+def restore_parameters(parameters):
+    """
+    Set the parameters back to a copy from current_parameters. The parameters are not checked again, since
+    they were valid when they were copied.
+
+    :param: parameters: dictionary from current_parameters
+    """
+    for name, cls in animal_classes.items():
+        cls.parameters.clear()
+        cls.parameters.update(parameters[name])
+        cls._parameters_version += 1
+    for letter, cls in landscape_classes.items():
+        cls.parameters.clear()
+        cls.parameters.update(parameters[letter])
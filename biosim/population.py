@@ -0,0 +1,294 @@
+# -*- encoding: utf-8 -*-
+"""
+This script contains a class called SpeciesArrays, which stores a population of one species
+as contiguous numpy arrays. Each animal is one position in the arrays with age, weight, cached
+fitness and the index of the cell it lives in, so the annual cycle can be done as array operations
+instead of calling methods on every Animal object. The same class is used for the population of one
+cell, where all the cell indexes are 0, and for the population of the whole island.
+
+Purpose of this script is to give the landscape and the island an alternative way to store the
+population. The rules for eating, birth, death, aging and weight loss are the same as in animals.py.
+
+To use this script the user has to have installed the numpy package to the Python environment.
+"""
+
+__author__ = "Anish Thangalingam & Majorann Thevarajah"
+__email__ = "anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no"
+
+import numpy as np
+
+
+def predation_kernel(species, predator_ages, predator_weights, predator_fitness, prey_fitness, prey_weights,
+                     rng=None):
+    """
+    The predation in one cell. The predators eat in the given order, and every predator tries to kill
+    the prey in the given order. A predator stops when it has eaten F, or when the next prey is at least
+    as fit as the predator. The prey must be sorted by fitness, lowest first.
+
+    The weight and fitness of the predators are updated in place.
+
+    :param: species: the predator class, the parameters are read from it
+    :param: predator_ages: array with the ages of the predators
+    :param: predator_weights: array with the weights of the predators
+    :param: predator_fitness: array with the fitness of the predators
+    :param: prey_fitness: array with the fitness of the prey, sorted lowest first
+    :param: prey_weights: array with the weights of the prey
+    :param: rng: numpy Generator for the random numbers, np.random is used if it is None
+    :return: boolean array, True for the prey that are still alive
+    """
+    rng = np.random if rng is None else rng
+    params = species.parameters
+    appetite = params["F"]
+    alive = np.ones(len(prey_fitness), dtype=bool)
+
+    for predator in range(len(predator_fitness)):
+        eaten = 0
+        start = 0
+        while eaten < appetite:
+            stop = np.searchsorted(prey_fitness, predator_fitness[predator], side="left")
+            candidates = np.flatnonzero(alive[start:stop]) + start
+            if len(candidates) == 0:
+                break
+            with np.errstate(divide="ignore"):
+                kill_probability = np.minimum(
+                    (predator_fitness[predator] - prey_fitness[candidates]) / params["DeltaPhiMax"], 1
+                )
+            kills = np.flatnonzero(rng.random(len(candidates)) < kill_probability)
+            if len(kills) == 0:
+                break
+            killed = candidates[kills[0]]
+            alive[killed] = False
+            food = min(prey_weights[killed], appetite - eaten)
+            eaten += food
+            predator_weights[predator] += params["beta"] * food
+            predator_fitness[predator] = species.fitness_of_population(predator_ages[predator],
+                                                                       predator_weights[predator])
+            start = killed + 1
+
+    return alive
+
+
+class SpeciesArrays:
+    """
+    Population of one species, stored as arrays of age, weight, fitness and cell index
+    """
+
+    def __init__(self, species, rng=None):
+        """
+        Initializing an empty population
+
+        :param: species: the animal class, Herbivore or Carnivore. The parameters are read from it
+        :param: rng: numpy Generator for the random numbers, np.random is used if it is None
+        """
+        self.species = species
+        self.rng = np.random if rng is None else rng
+        self.age = np.zeros(0)
+        self.weight = np.zeros(0)
+        self.fitness = np.zeros(0)
+        self.cell = np.zeros(0, dtype=int)
+
+    def __len__(self):
+        """
+        :return: number of animals in the population
+        """
+        return len(self.weight)
+
+    @property
+    def parameters(self):
+        """
+        The parameters of the species
+        """
+        return self.species.parameters
+
+    def update_fitness(self):
+        """
+        Calculate the cached fitness again, this must be done after age or weight has changed
+        """
+        self.fitness = self.species.fitness_of_population(self.age, self.weight)
+
+    def add(self, ages, weights, cells=0):
+        """
+        Add animals to the population
+
+        :param: ages: ages of the new animals
+        :param: weights: weights of the new animals
+        :param: cells: cell index of the new animals, one index or one per animal
+        """
+        ages = np.asarray(ages, dtype=float)
+        weights = np.asarray(weights, dtype=float)
+        if np.any(ages < 0):
+            raise ValueError('The age must be non-negative')
+        if np.any(weights < 0):
+            raise ValueError('The weight must be non-negative')
+        self._append(ages, weights, cells)
+
+    def _append(self, ages, weights, cells):
+        """
+        Add animals to the population without checking them, used for the newborns. A newborn can have a
+        negative weight, as in the object engine, and then has fitness 0.
+
+        :param: ages: ages of the new animals, as a float array
+        :param: weights: weights of the new animals, as a float array
+        :param: cells: cell index of the new animals, one index or one per animal
+        """
+        self.age = np.concatenate((self.age, ages))
+        self.weight = np.concatenate((self.weight, weights))
+        self.fitness = np.concatenate((self.fitness, self.species.fitness_of_population(ages, weights)))
+        self.cell = np.concatenate((self.cell, np.broadcast_to(np.asarray(cells, dtype=int), ages.shape)))
+
+    def keep(self, mask):
+        """
+        Keep only the animals where the mask is True
+
+        :param: mask: boolean array with one value per animal
+        """
+        self.age = self.age[mask]
+        self.weight = self.weight[mask]
+        self.fitness = self.fitness[mask]
+        self.cell = self.cell[mask]
+
+    def take(self, mask):
+        """
+        Remove the animals where the mask is True from the population
+
+        :param: mask: boolean array with one value per animal
+        :return: ages and weights of the removed animals
+        """
+        ages = self.age[mask]
+        weights = self.weight[mask]
+        self.keep(~mask)
+        return ages, weights
+
+    def count_per_cell(self, number_of_cells=1):
+        """
+        Count the animals in every cell
+
+        :param: number_of_cells: the number of cells
+        :return: array with the number of animals in each cell
+        """
+        return np.bincount(self.cell, minlength=number_of_cells)
+
+    def grouped_by_cell(self):
+        """
+        Group the animals by cell
+
+        :return: the cells that have animals, and a list with the animal indexes for each of these cells
+        """
+        order = np.argsort(self.cell, kind="stable")
+        cells, starts = np.unique(self.cell[order], return_index=True)
+        return cells, np.split(order, starts[1:])
+
+    def aging(self):
+        """
+        All the animals grow one year
+        """
+        self.age += 1
+        self.update_fitness()
+
+    def weight_loss(self):
+        """
+        All the animals lose weight by the factor "eta"
+        """
+        self.weight *= 1 - self.parameters["eta"]
+        self.update_fitness()
+
+    def death(self):
+        """
+        Remove the dead animals. Animals with weight 0 always die, the rest die with
+        probability omega*(1-fitness)
+        """
+        death_probability = self.parameters["omega"] * (1 - self.fitness)
+        dead = (self.weight == 0) | (self.rng.random(len(self)) < death_probability)
+        self.keep(~dead)
+
+    def births(self):
+        """
+        Every animal can give birth to one baby. The probability depends on the number of animals of the
+        same species in the cell. The babies are added to the cell of the mother, and the mothers lose
+        xi times the weight of the baby.
+
+        :return: number of newborns
+        """
+        number_of_animal = len(self)
+        if number_of_animal < 2:
+            return 0
+
+        params = self.parameters
+        animals_in_cell = np.bincount(self.cell)[self.cell]
+        probability = np.minimum(1, params["gamma"] * self.fitness * (animals_in_cell - 1))
+        random_numbers = self.rng.random(number_of_animal)
+        baby_weights = self.rng.normal(params["w_birth"], params["sigma_birth"], number_of_animal)
+
+        heavy_enough = self.weight >= params["zeta"] * (params["w_birth"] + params["sigma_birth"])
+        gives_birth = (heavy_enough & (random_numbers < probability) &
+                       (baby_weights * params["xi"] < self.weight))
+
+        self.weight[gives_birth] -= params["xi"] * baby_weights[gives_birth]
+        self.update_fitness()
+        self._append(np.zeros(np.count_nonzero(gives_birth)), baby_weights[gives_birth], self.cell[gives_birth])
+        return np.count_nonzero(gives_birth)
+
+    def eat_fodder(self, amount_of_food):
+        """
+        The animals eat in random order. In every cell each animal eats F, until the food in the
+        cell is finished.
+
+        :param: amount_of_food: the fodder, one number for a single cell or an array with one number per cell
+        :return: the food that is left, in the same shape as amount_of_food
+        """
+        appetite = self.parameters["F"]
+        food = np.asarray(amount_of_food, dtype=float)
+
+        order = self.rng.permutation(len(self))
+        order = order[np.argsort(self.cell[order], kind="stable")]
+        cells = self.cell[order]
+        rank_in_cell = np.arange(len(self)) - np.searchsorted(cells, cells, side="left")
+
+        food_in_cell = food[cells] if food.ndim else food
+        eaten = np.clip(food_in_cell - appetite * rank_in_cell, 0, appetite)
+        self.weight[order] += self.parameters["beta"] * eaten
+        self.update_fitness()
+
+        if food.ndim:
+            return np.maximum(food - np.bincount(cells, weights=eaten, minlength=len(food)), 0)
+        return max(amount_of_food - appetite * len(self), 0)
+
+    def predation(self, prey):
+        """
+        The animals eat from the prey population in the same cell. The fittest predator eats first, and
+        every predator tries to kill the prey with lowest fitness first, see predation_kernel.
+
+        :param: prey: SpeciesArrays with the prey, the killed animals are removed from it
+        """
+        if len(self) == 0 or len(prey) == 0:
+            return
+
+        survivors = np.ones(len(prey), dtype=bool)
+        prey_cells, prey_groups = prey.grouped_by_cell()
+        prey_in_cell = dict(zip(prey_cells, prey_groups))
+
+        for cell, predators in zip(*self.grouped_by_cell()):
+            if cell not in prey_in_cell:
+                continue
+            predators = predators[np.argsort(-self.fitness[predators], kind="stable")]
+            prey_index = prey_in_cell[cell]
+            prey_index = prey_index[np.argsort(prey.fitness[prey_index], kind="stable")]
+
+            weights = self.weight[predators]
+            fitness = self.fitness[predators]
+            alive = predation_kernel(self.species, self.age[predators], weights, fitness,
+                                     prey.fitness[prey_index], prey.weight[prey_index], self.rng)
+            self.weight[predators] = weights
+            self.fitness[predators] = fitness
+            survivors[prey_index] = alive
+
+        prey.keep(survivors)
+
+    def migrants(self):
+        """
+        Find the animals that want to move, each with probability mu*fitness
+
+        :return: boolean array, True for the animals that want to move
+        """
+        probability = self.parameters["mu"] * self.fitness
+        return self.rng.random(len(self)) < probability
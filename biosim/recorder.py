@@ -0,0 +1,176 @@
+# -*- encoding: utf-8 -*-
+"""
+This script contains a class called TimeSeriesRecorder, which records the state of the island every year
+while the simulation runs, and a class called TimeSeriesReader, which reads the records again later.
+
+Every year the recorder stores the number of animals of each species, and the mean, standard deviation,
+minimum and maximum of the age, weight and fitness of each species. It can also store the grid with the number
+of animals in every cell. The values are kept in memory only for chunk_years years, and then written as one
+chunk to the record directory, with one array per column. So the memory does not grow with the number of
+years, and a chunk that is written is never changed again.
+
+Every chunk is an .npz file named after the first and last year in it, so the reader can find the chunks of a
+range of years from the file names, and only reads those. A column that is not asked for is not read either.
+
+To use this script the user has to have installed the numpy package to the Python environment.
+"""
+
+__author__ = "Anish Thangalingam & Majorann Thevarajah"
+__email__ = "anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no"
+
+import os
+import re
+import numpy as np
+
+_CHUNK_NAME = re.compile(r"^years_(\d+)_(\d+)\.npz$")
+
+
+class TimeSeriesRecorder:
+    """
+    Records the numbers and summary statistics of the island every year, in chunks on disk
+    """
+
+    attributes = ("age", "weight", "fitness")
+    statistics = {"mean": np.mean, "std": np.std, "min": np.min, "max": np.max}
+
+    def __init__(self, directory, chunk_years=100, density=False):
+        """
+        :param: directory: the directory the chunks are written to, it is made if it does not exist
+        :param: chunk_years: the number of years in every chunk
+        :param: density: if True, the grid with the number of animals in every cell is recorded too
+        """
+        if chunk_years < 1:
+            raise ValueError("A chunk must have at least one year")
+        self.directory = directory
+        self.chunk_years = chunk_years
+        self.density = density
+        self._buffer = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def summary(self, island):
+        """
+        The values of one year
+
+        :param: island: the island, Island, VectorizedIsland or DecomposedIsland
+        :return: dictionary with the column name as key
+        """
+        values = {}
+        number_of_animals = island.get_number_of_animals()
+        for species in island.species_names:
+            values[species + "_count"] = number_of_animals[species]
+            for attribute, column in zip(self.attributes, island.get_population_columns(species)):
+                for name, statistic in self.statistics.items():
+                    values["{}_{}_{}".format(species, attribute, name)] = statistic(column) if len(column) else np.nan
+            if self.density:
+                values[species + "_density"] = island.get_density_grid(species).copy()
+        return values
+
+    def record(self, island, year):
+        """
+        Record the values of a year. The chunk is written when it has chunk_years years.
+
+        :param: island: the island
+        :param: year: the year
+        """
+        values = self.summary(island)
+        values["year"] = year
+        for name, value in values.items():
+            self._buffer.setdefault(name, []).append(value)
+        if len(self._buffer["year"]) >= self.chunk_years:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the years that are recorded but not written yet as a chunk. The chunk is written to another file
+        first and then renamed, so a run that stops while writing does not leave a broken chunk.
+        """
+        if not self._buffer:
+            return
+        years = self._buffer["year"]
+        filename = os.path.join(self.directory, "years_{:09d}_{:09d}.npz".format(years[0], years[-1]))
+        with open(filename + ".tmp", "wb") as chunk_file:
+            np.savez(chunk_file, **{name: np.array(values) for name, values in self._buffer.items()})
+        os.replace(filename + ".tmp", filename)
+        self._buffer = {}
+
+    def close(self):
+        """
+        Write the last chunk
+        """
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class TimeSeriesReader:
+    """
+    Reads the records of a TimeSeriesRecorder, a range of years at a time
+    """
+
+    def __init__(self, directory):
+        """
+        :param: directory: the directory with the chunks
+        """
+        self.directory = directory
+
+    def chunks(self):
+        """
+        :return: list with the first year, the last year and the file name of every chunk, in the order of the years
+        """
+        chunks = []
+        for filename in os.listdir(self.directory):
+            match = _CHUNK_NAME.match(filename)
+            if match:
+                chunks.append((int(match.group(1)), int(match.group(2)), os.path.join(self.directory, filename)))
+        return sorted(chunks)
+
+    def columns(self):
+        """
+        :return: list with the names of the columns
+        """
+        chunks = self.chunks()
+        if not chunks:
+            return []
+        with np.load(chunks[0][2]) as chunk:
+            return list(chunk.files)
+
+    def iter_chunks(self, first_year=None, last_year=None, columns=None):
+        """
+        Read the chunks with years in a range, one chunk at a time
+
+        :param: first_year: the first year to read, from the first year recorded if it is None
+        :param: last_year: the last year to read, to the last year recorded if it is None
+        :param: columns: list with the names of the columns to read, all the columns if it is None
+        :return: generator with one dictionary per chunk, with the column name as key and an array as value
+        """
+        for chunk_first, chunk_last, filename in self.chunks():
+            if (first_year is not None and chunk_last < first_year) or \
+                    (last_year is not None and chunk_first > last_year):
+                continue
+            with np.load(filename) as chunk:
+                years = chunk["year"]
+                in_range = np.ones(len(years), dtype=bool)
+                if first_year is not None:
+                    in_range &= years >= first_year
+                if last_year is not None:
+                    in_range &= years <= last_year
+                names = chunk.files if columns is None else ["year"] + [name for name in columns if name != "year"]
+                yield {name: chunk[name][in_range] for name in names}
+
+    def read(self, first_year=None, last_year=None, columns=None):
+        """
+        Read the years in a range
+
+        :param: first_year: the first year to read, from the first year recorded if it is None
+        :param: last_year: the last year to read, to the last year recorded if it is None
+        :param: columns: list with the names of the columns to read, all the columns if it is None
+        :return: dictionary with the column name as key and an array with one value per year as value
+        """
+        chunks = list(self.iter_chunks(first_year, last_year, columns))
+        if not chunks:
+            return {}
+        return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
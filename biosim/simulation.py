@@ -15,7 +15,14 @@ __email__ = "Majorann.thevarajah@nmbu.no & Anish.thangalingam@nmbu.no"
 from biosim.animals import Herbivore, Carnivore
 from biosim.landscape import Highland, Lowland
 from biosim.island import Island
+from biosim.vectorized_island import VectorizedIsland
+from biosim.decomposition import DecomposedIsland
 from biosim.visualization import Visualization
+from biosim.stats import StatsSnapshot
+from biosim.movie import MovieWriter, ImageWriter, _FFMPEG_BINARY
+from biosim.checkpoint import (write_checkpoint, read_checkpoint, global_random_state, restore_global_random_state,
+                               without_random_state)
+from biosim.parameters import current_parameters, restore_parameters
 import random
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -24,23 +31,29 @@ import subprocess
 import textwrap
 
 
-_FFMPEG_BINARY = 'ffmpeg'
-
-
 class BioSim:
     def __init__(self, island_map, ini_pop, seed,
                  ymax_animals=None, cmax_animals=None, hist_specs=None,
-                 img_base=None, img_fmt='png'):
+                 img_base=None, img_fmt='png', engine="object", blit=False, headless=False,
+                 stream_movie=False, img_workers=0, workers=None):
 
         """
         :param island_map: Multi-line string specifying island geography
         :param ini_pop: List of dictionaries specifying initial population
-        :param seed: Integer used as random number seed
+        :param seed: Integer used as random number seed. A negative integer gives the same simulation as its
+                     absolute value, and floats, strings and bytes are also taken, see Island.seed_entropy
         :param ymax_animals: Number specifying y-axis limit for graph showing animal numbers
         :param cmax_animals: Dict specifying color-code limits for animal densities
         :param hist_specs: Specifications for histograms, see below
         :param img_base: String with beginning of file name for figures, including path
         :param img_fmt: String with file type for figures, e.g. ’png’
+        :param engine: String with the engine for the annual cycle, ’object’, ’array’, ’vectorized’ or
+                       ’decomposed’
+        :param blit: Bool, if True only the changing parts of the figure are redrawn every year
+        :param headless: Bool, if True the simulation runs without any figure, see simulate
+        :param stream_movie: Bool, if True the figures are written directly to a movie instead of to files
+        :param img_workers: Number of threads that write the figures to file in the background
+        :param workers: Number of worker processes for the engine ’decomposed’
 
         If ymax_animals is None, the y-axis limit should be adjusted automatically.
 
@@ -59,12 +72,45 @@ class BioSim:
 
         where img_no are consecutive image numbers starting from 0.
         img_base should contain a path and beginning of a file name.
+
+        engine ’object’ stores every animal as an object in the cells, ’array’ stores the animals in each
+        cell as numpy arrays, and ’vectorized’ runs every phase of the annual cycle once for the whole
+        island, see VectorizedIsland. ’decomposed’ splits the rows of the island into strips, which are
+        handled by workers worker processes with the ’array’ cells, see DecomposedIsland. The worker
+        processes are stopped by close, so use the simulation in a with block or call close when it is done:
+            with BioSim(island_map, ini_pop, seed, engine=’decomposed’) as sim:
+                sim.simulate(100)
+
+        If blit is True, the island map, legend, colorbars and axes are drawn once and stored, and every year
+        only the heat maps, curves, year and histograms are drawn on top. If the matplotlib backend can not
+        blit, the whole figure is redrawn as without blit.
+
+        If headless is True, no matplotlib figure is created and no data for the visualization is computed,
+        and no figures are written to file. This is for runs where only the numbers are needed.
+
+        If stream_movie is True, the figures are sent to ffmpeg as raw pixels while the simulation runs, and
+        make_movie finishes the movie ’{img_base}.mp4’. No image files are written. The movie can not be
+        continued after make_movie, so a figure that is saved after that raises RuntimeError.
+
+        If img_workers is larger than 0 and img_fmt is one of the formats in ImageWriter.formats, the pixels
+        of the figure are copied and the image files are encoded and written in img_workers background threads,
+        while the simulation goes on. At most 2 * img_workers images wait to be written at the same time.
         """
 
         random.seed(seed)
         self.island_map = island_map
         self.ini_pop = ini_pop
-        self.island = Island(self.island_map, self.ini_pop)
+        self.seed = seed
+        self.engine = engine
+        if engine == "vectorized":
+            self.island = VectorizedIsland(self.island_map, self.ini_pop, seed=seed)
+        elif engine in ("object", "array"):
+            self.island = Island(self.island_map, self.ini_pop, backend=engine, seed=seed)
+        elif engine == "decomposed":
+            self.island = DecomposedIsland(self.island_map, self.ini_pop, backend="array", seed=seed,
+                                           workers=workers)
+        else:
+            raise ValueError("Engine must be object, array, vectorized or decomposed")
 
         if ymax_animals is None:
             # Adjust y-max value
@@ -91,9 +137,19 @@ class BioSim:
 
         self.image_format = img_fmt
         self._present_year = 0
-        self.visual = Visualization(self.cmax_animal, self.hist_spec)
+        self.visual = Visualization(self.cmax_animal, self.hist_spec, blit=blit)
         self.image_counter = 0
         self.count = 0
+        self.headless = headless
+        self.records = {}
+        if stream_movie and self.image_base is not None:
+            self.movie_writer = MovieWriter("{}.mp4".format(self.image_base))
+        else:
+            self.movie_writer = None
+        if img_workers > 0 and self.image_base is not None and self.image_format in ImageWriter.formats:
+            self.image_writer = ImageWriter(img_workers, 2 * img_workers)
+        else:
+            self.image_writer = None
 
     @staticmethod
     def set_animal_parameters(species, params):
@@ -120,16 +176,76 @@ class BioSim:
         if landscape in landscapes_changeable:
             landscapes_changeable[landscape].new_parameter_set(params)
 
-    def simulate(self, num_years, vis_years=1, img_years=None):
+    recordable = ("year", "num_animals", "num_animals_per_species", "distributions",
+                  "hist_fitness_data", "hist_age_data", "hist_weight_data")
+
+    def simulate(self, num_years, vis_years=1, img_years=None, headless=None, record=None,
+                 checkpoint_years=None, checkpoint_file=None, recorder=None):
         """
         Run simulation while visualizing the result.
         :param num_years: number of years to simulate
         :param vis_years: years between visualization updates
         :param img_years: years between visualizations saved to files (default: vis_years)
+        :param headless: if True, run without visualization (default: headless given to BioSim)
+        :param record: list with names of properties to record every year, e.g. [’num_animals_per_species’]
+        :param checkpoint_years: years between checkpoints written to checkpoint_file, see save_checkpoint
+        :param checkpoint_file: name of the checkpoint file, e.g. ’sim.npz’, which is written again every time
+        :param recorder: TimeSeriesRecorder that records the numbers and statistics of every year to disk, or
+                         DensityCube that records the number of animals in every cell, or a list of recorders
         Image files will be numbered consecutively.
+
+        The recorded values are appended to the lists in the dictionary records, with the property name as key.
+        The years that the recorders have not written yet are written when the simulation is done.
         """
-        self.visual.creat_a_window()
+        if recorder is None:
+            recorders = []
+        elif isinstance(recorder, (list, tuple)):
+            recorders = list(recorder)
+        else:
+            recorders = [recorder]
+        if checkpoint_years is not None and checkpoint_file is None:
+            raise ValueError("checkpoint_file must be given with checkpoint_years")
+        if img_years is None:
+            img_years = vis_years
+        if headless is None:
+            headless = self.headless
+        for name in record or ():
+            if name not in self.recordable:
+                raise ValueError(f"Can only record {', '.join(self.recordable)}")
+            self.records.setdefault(name, [])
+
         num_years = num_years + self._present_year
+        if not headless:
+            self.setup_graphics(num_years)
+
+        while num_years > self._present_year:
+            self.island.island_season_cycle()
+            self._present_year += 1
+            for name in record or ():
+                self.records[name].append(getattr(self, name))
+            for each_recorder in recorders:
+                each_recorder.record(self.island, self._present_year)
+            if not headless:
+                if self.count % vis_years == 0:
+                    self.visual.update_graphics_per_year(self.stats_snapshot())
+                if self.count % img_years == 0:
+                    self.save_fig()
+            self.count += 1
+            if checkpoint_years is not None and self._present_year % checkpoint_years == 0:
+                self.save_checkpoint(checkpoint_file)
+
+        if self.image_writer is not None:
+            self.image_writer.wait()
+        for each_recorder in recorders:
+            each_recorder.flush()
+
+    def setup_graphics(self, num_years):
+        """
+        Create the window with all the subplots, and draw the island map and the first heat maps and histograms
+
+        :param num_years: the last year of the simulation
+        """
+        self.visual.creat_a_window()
         self.visual.subplot_for_the_animal_count_curves(num_years+1, self.ymax_animals)
 
         self.visual.subplot_for_map()
@@ -139,28 +255,23 @@ class BioSim:
 
         self.visual.subplot_for_year()
 
+        stats = self.stats_snapshot()
         self.visual.subplot_for_distribution_plot()
-        distribution = self.distributions
-        self.visual.herbivore_heat_map_update(distribution)
-        self.visual.carnivore_heat_map_update(distribution)
+        self.visual.herbivore_heat_map_update(stats.density["Herbivore"])
+        self.visual.carnivore_heat_map_update(stats.density["Carnivore"])
 
         self.visual.subplot_for_histogram()
-        self.visual.fitness_hist_update(self.hist_fitness_data[0], self.hist_fitness_data[1])
-        self.visual.age_hist_update(self.hist_age_data[0], self.hist_age_data[1])
-        self.visual.weight_hist_update(self.hist_weight_data[0], self.hist_weight_data[1])
+        self.visual.fitness_hist_update(*stats.hist_data("fitness"))
+        self.visual.age_hist_update(*stats.hist_data("age"))
+        self.visual.weight_hist_update(*stats.hist_data("weight"))
 
-        while num_years > self._present_year:
-            self.island.island_season_cycle()
-            self._present_year += 1
-            if self.count % vis_years == 0:
-                self.visual.update_graphics_per_year(self.distributions, self.num_animals_per_species,
-                                                     self.year, self.hist_fitness_data[0],
-                                                     self.hist_fitness_data[1],
-                                                     self.hist_age_data[0], self.hist_age_data[1],
-                                                     self.hist_weight_data[0], self.hist_weight_data[1])
-            if self.count % img_years == 0:
-                self.save_fig()
-            self.count += 1
+    def stats_snapshot(self):
+        """
+        Collect the statistics of the island for the present year, walking through the population once
+
+        :return: StatsSnapshot of the present year
+        """
+        return StatsSnapshot(self.island, self.year, self.hist_spec)
 
     def save_fig(self):
         """
@@ -168,16 +279,98 @@ class BioSim:
         """
         if self.image_base is None:
             return
-        plt.savefig('{base}_{num:05d}.{type}'.format(base=self.image_base, num=self.image_counter,
-                                                     type=self.image_format))
+        if self.movie_writer is not None:
+            self.movie_writer.write_frame(self.visual.frame_buffer())
+            self.image_counter += 1
+            return
+        filename = '{base}_{num:05d}.{type}'.format(base=self.image_base, num=self.image_counter,
+                                                    type=self.image_format)
+        if self.image_writer is not None:
+            self.image_writer.submit(filename, self.visual.frame_buffer(), self.image_format)
+        else:
+            plt.savefig(filename)
         self.image_counter += 1
 
+    def save_checkpoint(self, filename):
+        """
+        Write the state of the simulation to a checkpoint file, so the simulation can be continued later with
+        load_checkpoint. The file has the island map, the engine, the seed, the year, the image counter, the
+        parameters of the animals and landscapes, the random generators and the population, see checkpoint.py.
+
+        :param filename: name of the file, e.g. ’sim.npz’
+        """
+        metadata = {"island_map": self.island_map, "engine": self.engine, "seed": self.seed,
+                    "year": self._present_year, "image_counter": self.image_counter, "count": self.count,
+                    "parameters": current_parameters()}
+        arrays = self.island.get_state()
+        arrays.update(global_random_state())
+        write_checkpoint(filename, metadata, arrays)
+
+    @classmethod
+    def load_checkpoint(cls, filename, seed=None, **options):
+        """
+        Make a simulation from a checkpoint file written by save_checkpoint. The parameters of the animals and
+        landscapes are set to those in the file. A simulation that is continued from a checkpoint gives the same
+        result as if it had not been stopped.
+
+        :param filename: name of the file
+        :param seed: if it is not None, the random generators are started from this seed instead of being set to
+                     their state in the file, e.g. to make branches from the same checkpoint
+        :param options: other arguments to BioSim, e.g. img_base or headless. The engine is the one in the file,
+                        unless another engine is given.
+        :return: the simulation
+        """
+        metadata, arrays = read_checkpoint(filename)
+        return cls.from_checkpoint(metadata, arrays, seed, **options)
+
+    @classmethod
+    def from_checkpoint(cls, metadata, arrays, seed=None, **options):
+        """
+        Make a simulation from the metadata and arrays of a checkpoint, see load_checkpoint
+
+        :param metadata: dictionary with the metadata from read_checkpoint
+        :param arrays: dictionary with the arrays from read_checkpoint
+        :param seed: if it is not None, the random generators are started from this seed
+        :param options: other arguments to BioSim
+        :return: the simulation
+        """
+        restore_parameters(metadata["parameters"])
+        options.setdefault("engine", metadata["engine"])
+        if seed is None:
+            sim = cls(metadata["island_map"], [], metadata["seed"], **options)
+            sim.island.set_state(arrays)
+            restore_global_random_state(arrays)
+        else:
+            sim = cls(metadata["island_map"], [], seed, **options)
+            sim.island.set_state(without_random_state(arrays))
+        sim._present_year = metadata["year"]
+        sim.image_counter = metadata["image_counter"]
+        sim.count = metadata["count"]
+        return sim
+
     def add_population(self, population):
         """
         Add a population to the island
-        :param population: List of dictionaries specifying population
+        :param population: List of dictionaries specifying population, or a structured numpy array with one
+                           animal per element, see add_population_columns
+        """
+        if isinstance(population, np.ndarray):
+            self.island.add_population_columns(population)
+        else:
+            self.island.population_in_cell(population)
+
+    def add_population_columns(self, loc, species=None, age=None, weight=None):
+        """
+        Add many animals to the island at once, from columns
+        :param loc: array with shape (n, 2) with the row and column of every animal, or a structured array with
+                    the fields loc (or row and col), species, age and weight
+        :param species: array with ’Herbivore’ or ’Carnivore’ for every animal
+        :param age: array with the age of every animal
+        :param weight: array with the weight of every animal
+
+        All the animals are checked before any of them are added, see Island.add_population_columns.
         """
-        self.island.population_in_cell(population)
+        self.island.add_population_columns(loc, species, age, weight)
 
     @property
     def year(self):
@@ -195,23 +388,12 @@ class BioSim:
     @property
     def num_animals_per_species(self):
         """Number of animals per species in island, as dictionary."""
-        count_of_per_species = {"Herbivore": 0, "Carnivore": 0}
-        for position in self.island.map:
-            if self.island.map[position].flag:
-                count_of_per_species["Carnivore"] += len(self.island.map[position].population_carnivore)
-                count_of_per_species["Herbivore"] += len(self.island.map[position].population_herbivore)
-        return count_of_per_species
+        return self.island.get_number_of_animals()
 
     @property
     def distributions(self):
 
-        cell_data = []
-        for coordinate, cell in self.island.map.items():
-            row = coordinate[0]
-            col = coordinate[1]
-            herbivore = len(cell.population_herbivore)
-            carnivore = len(cell.population_carnivore)
-            cell_data.append([row, col, herbivore, carnivore])
+        cell_data = self.island.get_cell_counts()
         distribution = pd.DataFrame(data=cell_data, columns=['Row', 'Col', 'Herbivore', 'Carnivore'])
         return distribution
 
@@ -223,19 +405,8 @@ class BioSim:
         :return: herbivore_fitness_dictionary: a dictionary with data
         :return: carnivore_fitness_dictionary: a dictionary with dat
         """
-        fitness_herbivore_list = []
-        fitness_carnivore_list = []
-        herbivore_fitness_dictionary = {"fitness": []}
-        carnivore_fitness_dictionary = {"fitness": []}
-        for cell in self.island.map:
-            if self.island.map[cell].flag:
-                for carnivore in self.island.map[cell].population_carnivore:
-                    fitness_carnivore_list.append(carnivore.fitness)
-
-            for herbivore in self.island.map[cell].population_herbivore:
-                fitness_herbivore_list.append(herbivore.fitness)
-        herbivore_fitness_dictionary["fitness"] = np.array(fitness_herbivore_list)
-        carnivore_fitness_dictionary["fitness"] = np.array(fitness_carnivore_list)
+        herbivore_fitness_dictionary = {"fitness": self.island.get_population_data("Herbivore", "fitness")}
+        carnivore_fitness_dictionary = {"fitness": self.island.get_population_data("Carnivore", "fitness")}
         return herbivore_fitness_dictionary, carnivore_fitness_dictionary
 
     @property
@@ -246,19 +417,8 @@ class BioSim:
         :return: herbivore_age_dictionary: a dictionary with data
         :return: carnivore_age_dictionary: a dictionary with data
         """
-        age_herbivore_list = []
-        age_carnivore_list = []
-        herbivore_age_dictionary = {"age": []}
-        carnivore_age_dictionary = {"age": []}
-        for cell in self.island.map:
-            if self.island.map[cell].flag:
-                for carnivore in self.island.map[cell].population_carnivore:
-                    age_carnivore_list.append(carnivore.age)
-
-                for herbivore in self.island.map[cell].population_herbivore:
-                    age_herbivore_list.append(herbivore.age)
-        herbivore_age_dictionary["age"] = np.array(age_herbivore_list)
-        carnivore_age_dictionary["age"] = np.array(age_carnivore_list)
+        herbivore_age_dictionary = {"age": self.island.get_population_data("Herbivore", "age")}
+        carnivore_age_dictionary = {"age": self.island.get_population_data("Carnivore", "age")}
 
         return herbivore_age_dictionary, carnivore_age_dictionary
 
@@ -270,30 +430,25 @@ class BioSim:
         :return: herbivore_weight_dictionary: a dictionary with data
         :return: carnivore_weight_dictionary: a dictionary with data
         """
-        weight_herbivore_list = []
-        weight_carnivore_list = []
-        herbivore_weight_dictionary = {"weight": []}
-        carnivore_weight_dictionary = {"weight": []}
-        for cell in self.island.map:
-            if self.island.map[cell].flag:
-                for carnivore in self.island.map[cell].population_carnivore:
-                    weight_carnivore_list.append(carnivore.weight)
-
-                for herbivore in self.island.map[cell].population_herbivore:
-                    weight_herbivore_list.append(herbivore.weight)
-        herbivore_weight_dictionary["weight"] = np.array(weight_herbivore_list)
-        carnivore_weight_dictionary["weight"] = np.array(weight_carnivore_list)
+        herbivore_weight_dictionary = {"weight": self.island.get_population_data("Herbivore", "weight")}
+        carnivore_weight_dictionary = {"weight": self.island.get_population_data("Carnivore", "weight")}
 
         return herbivore_weight_dictionary, carnivore_weight_dictionary
 
     def make_movie(self):
         """
         Create MPEG4 movie from visualization images saved.
+        If the figures are streamed to ffmpeg, the movie is finished instead.
         The code below is inspired by a lecture hold by Hans Ekkehard Plesser.
         """
         format_of_the_movie = 'mp4'
         if self.image_base is None:
             raise RuntimeError('The filename is not defined')
+        if self.movie_writer is not None:
+            self.movie_writer.close()
+            return
+        if self.image_writer is not None:
+            self.image_writer.wait()
 
         try:
             subprocess.check_call(
@@ -314,3 +469,24 @@ class BioSim:
 
         except subprocess.CalledProcessError as err:
             raise RuntimeError("ERROR: ffmpeg failed with: {}".format(err))
+
+    def close(self):
+        """
+        Stop everything the simulation has started: the encoder of a streamed movie that make_movie has not
+        ended, the threads that write the images, and the worker processes of the island.
+        """
+        try:
+            if self.movie_writer is not None:
+                self.movie_writer.close()
+        finally:
+            try:
+                if self.image_writer is not None:
+                    self.image_writer.close()
+            finally:
+                self.island.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,70 @@
+# -*- encoding: utf-8 -*-
+"""
+This script contains a class called StatsSnapshot, which collects the statistics of the island in a
+given year. The population is walked through only once, and the snapshot gives the number of animals,
+a grid with the number of animals in every cell, the age, weight and fitness of every animal and the histogram
+counts for the properties in hist_spec.
+
+Purpose of this script is to collect the data that the visualization needs in one go, instead of
+walking through the island once for every plot.
+
+To use this script the user has to have installed the numpy package to the Python environment.
+"""
+
+__author__ = "Anish Thangalingam & Majorann Thevarajah"
+__email__ = "anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no"
+
+import numpy as np
+
+
+def histogram_bin_edges(spec):
+    """
+    Find the bin edges of a histogram from the maximum value and the bin width
+
+    :param: spec: dictionary with "max" and "delta"
+    :return: array with the bin edges, from 0 to max, all delta apart. If max is not a multiple of delta, the
+             last edge is the first multiple of delta above max.
+    """
+    number_of_bins = int(np.ceil(round(spec["max"] / spec["delta"], 9)))
+    return np.arange(number_of_bins + 1) * spec["delta"]
+
+
+class StatsSnapshot:
+    """
+    Statistics of the island in one year
+    """
+
+    attributes = ("age", "weight", "fitness")
+
+    def __init__(self, island, year, hist_spec=None):
+        """
+        Collect the statistics of the island
+
+        :param: island: the island, Island or VectorizedIsland
+        :param: year: the present year
+        :param: hist_spec: dictionary with "max" and "delta" for the properties that shall have a histogram
+        """
+        self.year = year
+        self.number_of_animals = island.get_number_of_animals()
+        self.density = {species: island.get_density_grid(species).copy() for species in island.species_names}
+
+        self.data = {}
+        for species in island.species_names:
+            ages, weights, fitness = island.get_population_columns(species)
+            self.data[species] = {"age": ages, "weight": weights, "fitness": fitness}
+
+        self.hist_spec = {} if hist_spec is None else hist_spec
+        self.bin_edges = {attribute: histogram_bin_edges(spec) for attribute, spec in self.hist_spec.items()}
+        self.histograms = {attribute: {species: np.histogram(self.data[species][attribute], bins=edges)[0]
+                                       for species in self.data}
+                           for attribute, edges in self.bin_edges.items()}
+
+    def hist_data(self, attribute):
+        """
+        The data for the histogram of a property, in the form the visualization uses
+
+        :param: attribute: "age", "weight" or "fitness"
+        :return: two dictionaries, for herbivores and carnivores, with the property name as key
+        """
+        return ({attribute: self.data["Herbivore"][attribute]},
+                {attribute: self.data["Carnivore"][attribute]})
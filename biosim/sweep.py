@@ -0,0 +1,255 @@
+# -*- encoding: utf-8 -*-
+"""
+This script contains a class called Sweep, which runs the island for many sets of parameters and many
+seeds, and two functions that make the sets of parameters: grid_points for a grid and latin_hypercube_points
+for a Latin hypercube.
+
+A parameter is named with the species or the landscape letter and the parameter name, e.g. "Herbivore.zeta",
+"Carnivore.DeltaPhiMax" or "L.f_max". Every combination of a point and a seed is one job, and the jobs are
+run headless in a process pool, with the parameters set only for that job, see ensemble.py.
+
+The summary of every job is stored in a cache directory as soon as the job is done, so a sweep that is
+stopped can be started again, and only the jobs that are missing are run. The summaries of all the jobs
+are written to a columnar .npz file with one array per column.
+
+To use this script the user has to have installed the numpy package to the Python environment.
+"""
+
+__author__ = "Anish Thangalingam & Majorann Thevarajah"
+__email__ = "anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no"
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import hashlib
+import itertools
+import json
+import os
+import numpy as np
+
+from .ensemble import EnsembleStatistics, isolated_parameters, run_seed
+from .parameters import current_parameters
+
+
+def split_point(point):
+    """
+    Split a point into parameters for the animals and for the landscapes
+
+    :param: point: dictionary with names like "Herbivore.zeta" or "L.f_max" as keys, where the part before the
+                   dot is Herbivore, Carnivore, H or L
+    :return: two dictionaries, with the species or the landscape letter as key and the parameters as value
+    """
+    animal_parameters = {}
+    landscape_parameters = {}
+    for name, value in point.items():
+        owner, _, parameter = name.partition(".")
+        if not parameter:
+            raise ValueError("A parameter must be named like Herbivore.zeta or L.f_max")
+        if owner in EnsembleStatistics.species_names:
+            parameters = animal_parameters
+        elif owner in ("H", "L"):
+            parameters = landscape_parameters
+        else:
+            raise ValueError("The parameter {} must belong to Herbivore, Carnivore, H or L".format(name))
+        parameters.setdefault(owner, {})[parameter] = value
+    return animal_parameters, landscape_parameters
+
+
+def grid_points(space):
+    """
+    All the combinations of the values of the parameters
+
+    :param: space: dictionary with the parameter name as key and a list of values as value
+    :return: list with one dictionary per point
+    """
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def latin_hypercube_points(space, number_of_points, seed=None):
+    """
+    Points from a Latin hypercube. The range of every parameter is split in number_of_points parts of the same
+    size, and every part is used by exactly one point.
+
+    :param: space: dictionary with the parameter name as key and the range (low, high) as value
+    :param: number_of_points: the number of points
+    :param: seed: seed for the random numbers
+    :return: list with one dictionary per point
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, (low, high) in space.items():
+        unit = (rng.permutation(number_of_points) + rng.random(number_of_points)) / number_of_points
+        columns[name] = low + unit * (high - low)
+    return [{name: float(columns[name][point]) for name in space} for point in range(number_of_points)]
+
+
+def summary_metrics(counts, last_years=10):
+    """
+    The summary of one run
+
+    :param: counts: array with the number of each species for every year, with shape (num_years, 2)
+    :param: last_years: the number of years at the end that the mean is taken over
+    :return: dictionary with the final number, the mean of the last years and if the species died out
+    """
+    metrics = {}
+    for index, species in enumerate(EnsembleStatistics.species_names):
+        metrics[f"{species}_final"] = int(counts[-1, index]) if len(counts) else 0
+        metrics[f"{species}_mean_last"] = float(np.mean(counts[-last_years:, index])) if len(counts) else 0.0
+        metrics[f"{species}_extinct"] = bool(len(counts) and counts[-1, index] == 0)
+    return metrics
+
+
+def run_sweep_job(job):
+    """
+    One job of the sweep, a point with one seed. This function runs in the worker processes.
+
+    :param: job: tuple with the job of run_seed, the point and last_years
+    :return: dictionary with the summary metrics
+    """
+    seed_job, point, last_years = job
+    island_map, ini_pop, seed, num_years, engine, base, _, _ = seed_job
+    animal_parameters, landscape_parameters = split_point(point)
+    counts = run_seed((island_map, ini_pop, seed, num_years, engine, base, animal_parameters, landscape_parameters))
+    return summary_metrics(counts, last_years)
+
+
+class Sweep:
+    """
+    Runs the island for every combination of a point in the parameter space and a seed
+    """
+
+    def __init__(self, island_map, ini_pop, points, seeds, num_years, engine="object", cache_dir=None,
+                 last_years=10):
+        """
+        :param: island_map: Multi-line string specifying island geography
+        :param: ini_pop: List of dictionaries specifying initial population
+        :param: points: list with dictionaries of parameters, e.g. from grid_points or latin_hypercube_points
+        :param: seeds: the seeds, every point is run once with every seed
+        :param: num_years: the number of years of every run
+        :param: engine: the engine of the runs, see BioSim
+        :param: cache_dir: directory where the summary of every job is stored, no cache if it is None
+        :param: last_years: the number of years at the end that the mean is taken over
+        """
+        self.island_map = island_map
+        self.ini_pop = ini_pop
+        self.points = [dict(point) for point in points]
+        self.seeds = list(seeds)
+        self.num_years = num_years
+        self.engine = engine
+        self.cache_dir = cache_dir
+        self.last_years = last_years
+        self.base_parameters = current_parameters()
+        self.results = {}
+
+        # Check the parameter names here, so a wrong name is found before the runs start
+        for point in self.points:
+            with isolated_parameters(*split_point(point)):
+                pass
+
+    def jobs(self):
+        """
+        All the jobs of the sweep
+
+        :return: list with the point index, the seed and the job for run_sweep_job
+        """
+        return [(point_index, seed,
+                 ((self.island_map, self.ini_pop, seed, self.num_years, self.engine, self.base_parameters, {}, {}),
+                  point, self.last_years))
+                for point_index, point in enumerate(self.points) for seed in self.seeds]
+
+    @staticmethod
+    def job_key(job):
+        """
+        A key that is the same for jobs that give the same result, used as file name in the cache
+
+        :param: job: a job for run_sweep_job
+        :return: string with a hash of the job
+        """
+        text = json.dumps(job, sort_keys=True, default=str)
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def cache_path(self, job):
+        """
+        :param: job: a job for run_sweep_job
+        :return: the file in the cache for the job, or None if there is no cache
+        """
+        if self.cache_dir is None:
+            return None
+        return os.path.join(self.cache_dir, self.job_key(job) + ".json")
+
+    def load_cached(self, job):
+        """
+        :param: job: a job for run_sweep_job
+        :return: the summary of the job from the cache, or None if it is not there
+        """
+        path = self.cache_path(job)
+        if path is None or not os.path.exists(path):
+            return None
+        with open(path) as cache_file:
+            return json.load(cache_file)
+
+    def store(self, job, metrics):
+        """
+        Write the summary of a job to the cache. It is written to another file first and then renamed, so a
+        sweep that is stopped while writing does not leave a broken file in the cache.
+
+        :param: job: a job for run_sweep_job
+        :param: metrics: the summary of the job
+        """
+        path = self.cache_path(job)
+        if path is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(path + ".tmp", "w") as cache_file:
+            json.dump(metrics, cache_file)
+        os.replace(path + ".tmp", path)
+
+    def run(self, workers=None):
+        """
+        Run all the jobs that are not in the cache in a process pool
+
+        :param: workers: number of worker processes, the number of processors if it is None
+        :return: dictionary with one array per column, see columns
+        """
+        missing = []
+        for point_index, seed, job in self.jobs():
+            metrics = self.load_cached(job)
+            if metrics is None:
+                missing.append((point_index, seed, job))
+            else:
+                self.results[(point_index, seed)] = metrics
+
+        if missing:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(run_sweep_job, job): (point_index, seed, job)
+                           for point_index, seed, job in missing}
+                for future in as_completed(futures):
+                    point_index, seed, job = futures[future]
+                    metrics = future.result()
+                    self.store(job, metrics)
+                    self.results[(point_index, seed)] = metrics
+        return self.columns()
+
+    def columns(self):
+        """
+        The summaries of the jobs that are done, as columns: one column per parameter, the seed, and one
+        column per metric
+
+        :return: dictionary with the column name as key and an array as value
+        """
+        keys = sorted(self.results)
+        parameter_names = sorted({name for point in self.points for name in point})
+        metric_names = sorted({name for metrics in self.results.values() for name in metrics})
+
+        columns = {name: np.array([self.points[point_index].get(name, np.nan) for point_index, _ in keys])
+                   for name in parameter_names}
+        columns["seed"] = np.array([seed for _, seed in keys])
+        columns.update({name: np.array([self.results[key][name] for key in keys]) for name in metric_names})
+        return columns
+
+    def save_summary(self, filename):
+        """
+        Write the summaries to a columnar .npz file, with one array per column
+
+        :param: filename: name of the file
+        """
+        np.savez(filename, **self.columns())
@@ -0,0 +1,139 @@
+# -*- encoding: utf-8 -*-
+"""
+This script contains a class called VectorizedIsland, which is a second engine for the annual
+cycle of the island. All the animals on the island are stored in one SpeciesArrays per species, with
+the cell index of every animal as a column. Every phase of the annual cycle is then done once for the
+whole island, instead of once for every cell.
+
+The island map is created and checked in the same way as in the Island class, and the rules for the
+animals are the same as in animals.py, so the population should develop in the same way as with the
+Island class.
+
+To use this script the user has to have installed the numpy package to the Python environment.
+"""
+
+__author__ = "Anish Thangalingam & Majorann Thevarajah"
+__email__ = "anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no"
+
+import numpy as np
+
+from .animals import Herbivore, Carnivore
+from .island import Island
+from .population import SpeciesArrays
+
+
+class VectorizedIsland(Island):
+    """
+    Island where the annual cycle is done with arrays for the whole island at once
+    """
+
+    species = {"Herbivore": Herbivore, "Carnivore": Carnivore}
+    cell_generators = False
+
+    def map_creating(self):
+        """
+        This function creates the island map and the neighbour table in the same way as the Island class, and
+        then makes the arrays for the animals. All the animals use the generator of the whole island, since
+        every phase is done for all the cells at once, so the cells get no generators, see cell_generators.
+
+        return: map, it returns the created map
+        """
+        super().map_creating()
+        self.cell_types = [type(self.map[loc_pos]) for loc_pos in self.locations]
+        self.animals = {name: SpeciesArrays(species, self.rng) for name, species in self.species.items()}
+        return self.map
+
+    def population_in_cell(self, population):
+        """
+        This function places the given population in the given cells
+
+        :param: population, list with the location and the population of the cells
+        """
+        for animal in population:
+            cell = self.cell_index[animal["loc"]]
+            for name, arrays in self.animals.items():
+                animals = [each_animal for each_animal in animal["pop"] if each_animal["species"] == name]
+                arrays.add([each_animal["age"] for each_animal in animals],
+                           [each_animal["weight"] for each_animal in animals], cell)
+        self.count_animals()
+
+    def amount_of_fodder(self):
+        """
+        This function gives the fodder in every cell at the start of the year
+
+        :return: array with f_max for every cell
+        """
+        f_max_of_type = {cell_type: cell_type.parameters["f_max"] for cell_type in set(self.cell_types)}
+        return np.array([f_max_of_type[cell_type] for cell_type in self.cell_types], dtype=float)
+
+    def island_migration(self):
+        """
+        The animals that want to move choose one of the four neighbour cells at random, and move there if the
+        cell is passable. This is done for all the animals on the island at once.
+        """
+        for arrays in self.animals.values():
+            movers = np.flatnonzero(arrays.migrants())
+            cells = arrays.cell[movers]
+            slots = arrays.rng.choice(4, size=len(movers))
+            passable = self.neighbour_passable[cells, slots]
+            arrays.cell[movers[passable]] = self.neighbours[cells, slots][passable]
+
+    def count_animals(self):
+        """
+        This function counts the animals in every cell with np.bincount, and updates the counters of the island
+        """
+        for species_index, name in enumerate(self.species_names):
+            self.animal_counts[species_index] = self.animals[name].count_per_cell(len(self.locations))
+            self.number_of_animals[name] = len(self.animals[name])
+
+    def get_population_columns(self, species):
+        """
+        This function gives us the age, weight and fitness of all the animals of a species on the island
+
+        :param: species: "Herbivore" or "Carnivore"
+        :return: three arrays with the ages, weights and fitness
+        """
+        arrays = self.animals[species]
+        return arrays.age.copy(), arrays.weight.copy(), arrays.fitness.copy()
+
+    def population_state(self):
+        """
+        This function gives the population as three columns per species, with the cell, age and weight of every
+        animal, in the same order as in the arrays
+
+        :return: dictionary with e.g. "Herbivore_cell", "Herbivore_age" and "Herbivore_weight" as keys
+        """
+        state = {}
+        for name, arrays in self.animals.items():
+            state[name + "_cell"] = arrays.cell.copy()
+            state[name + "_age"] = arrays.age.copy()
+            state[name + "_weight"] = arrays.weight.copy()
+        return state
+
+    def set_population_state(self, state):
+        """
+        This function adds the animals from population_state to the arrays
+
+        :param: state: dictionary with the arrays from population_state
+        """
+        for name, arrays in self.animals.items():
+            arrays.add(state[name + "_age"], state[name + "_weight"], state[name + "_cell"])
+        self.count_animals()
+
+    def island_season_cycle(self):
+        """
+        This function gives us the cycle for a year. Every phase is done once for all the animals on the island.
+        """
+        herbivores = self.animals["Herbivore"]
+        carnivores = self.animals["Carnivore"]
+
+        herbivores.eat_fodder(self.amount_of_fodder())
+        carnivores.predation(herbivores)
+        herbivores.births()
+        carnivores.births()
+        self.island_migration()
+        for arrays in (herbivores, carnivores):
+            arrays.weight_loss()
+            arrays.aging()
+            arrays.death()
+        self.count_animals()
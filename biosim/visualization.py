@@ -4,7 +4,7 @@ This script contains visualization class and the pupose of this class is to give
 simulation in Island. This class will create a plot window with several subplot to show island map,
 population growth, heatmaps and histograms. It will show the graphics of the simulation.
 
-The user must have installed math, numpy and matplotlib package to the python environment to run this script.
+The user must have installed numpy and matplotlib package to the python environment to run this script.
 """
 
 __author__ = "Anish Thangalingam & Majorann Thevarajah"
@@ -12,7 +12,8 @@ __email__ = "Anish.thangalingam@nmbu.no & Majorann.thevarajah@nmbu.no"
 
 import matplotlib.pyplot as plt
 import numpy as np
-import math
+
+from .stats import histogram_bin_edges
 
 
 class Visualization:
@@ -20,15 +21,20 @@ class Visualization:
     Visualization class for the visualization of the simulation
     """
 
-    def __init__(self, cmax, hist_spec):
+    def __init__(self, cmax, hist_spec, blit=False):
         """
         Initializing the visualization class
 
         :param: cmax: max value for heat map distribution
         :param: hist_spec:hist_specs is a dictionary with one entry per property for which a histogram shall be shown.
+        :param: blit: if True, only the heat maps, curves, year and histograms are redrawn every year, on top of a
+                      stored background with the rest of the figure. If the backend can not blit, the whole figure
+                      is redrawn.
         """
         self.cmax = cmax
         self.hist_spec = hist_spec
+        self.blit = blit
+        self._background = None
         self._fig = None
         self._grids = None
         self._map = None
@@ -43,9 +49,8 @@ class Visualization:
         self._carnivore_heat = None
         self._carnivore_dist = None
         self._herbivore_dist = None
-        self._fitness_histogram = None
-        self._age_histogram = None
-        self._weight_histogram = None
+        self._hist_axes = {}
+        self._histograms = {}
         self._year_text = None
 
     def creat_a_window(self):
@@ -56,6 +61,8 @@ class Visualization:
             self._fig = plt.figure(constrained_layout=True, figsize=(10, 8))
             self._fig.set_facecolor('lightblue')
             self._grids = self._fig.add_gridspec(8, 12)
+            if self.blit:
+                self._fig.canvas.mpl_connect("draw_event", self._on_draw)
 
     def subplot_for_map(self):
         """
@@ -102,6 +109,10 @@ class Visualization:
         if self._weight_hist_fig is None:
             self._weight_hist_fig = self._fig.add_subplot(self._grids[6:, 8:])
 
+        self._hist_axes = {"fitness": self._fitness_hist_fig,
+                           "age": self._age_hist_fig,
+                           "weight": self._weight_hist_fig}
+
     def subplot_for_the_animal_count_curves(self, x_limit, y_limit):
         """
         Subplot for the curves where it count the count of each animal every year
@@ -122,6 +133,7 @@ class Visualization:
             self._animal_count.set_ylim(0, y_limit)
         elif self._animal_count is not None:
             self._animal_count.set_xlim(0, x_limit)
+            self._background = None
 
         # Carnivore curve
         if self._carnivore_curve is None:
@@ -220,44 +232,93 @@ class Visualization:
         carnivore_y_data[year] = carnivore_count
         self._carnivore_curve.set_ydata(carnivore_y_data)
 
-    def herbivore_heat_map_update(self, distribution):
+    def herbivore_heat_map_update(self, density):
         """
         Updating the heatmap for herbivores each year. It contains how many
-        herbivores that is present in each cell.
+        herbivores that is present in each cell. The image is only created the first time,
+        after that the data of the image is changed.
 
         This code is inspired by a lecture hold by Hans Ekkehard Plesser in january block 2021
 
-        :params: distribution: Information about herbivores in each cell.
-                               distribution is a dataframe
+        :params: density: 2D array with the number of herbivores in each cell, indexed by row and column
         """
         if self._herbivore_dist is not None:
-            self._herbivore_dist.set_data(distribution.pivot("Row", "Col", "Herbivore"))
+            self._herbivore_dist.set_data(density)
         else:
-            self._herbivore_dist = self._herbivore_heat.imshow(distribution.pivot("Row", "Col", "Herbivore"),
+            self._herbivore_dist = self._herbivore_heat.imshow(density,
                                                                interpolation="nearest", vmin=0,
                                                                vmax=self.cmax["Herbivore"])
             self._herbivore_heat.figure.colorbar(self._herbivore_dist, ax=self._herbivore_heat,
                                                  orientation="vertical")
 
-    def carnivore_heat_map_update(self, distribution):
+    def carnivore_heat_map_update(self, density):
         """
         Updating the heatmap for carnivores each year. It contains how many
-        carnivores that is present in each cell.
+        carnivores that is present in each cell. The image is only created the first time,
+        after that the data of the image is changed.
 
         This code is inspired by a lecture hold by Hans Ekkehard Plesser in january block 2021
 
-        :params: distribution: Information about carnivores in each cell.
-                               distribution is a dataframe
+        :params: density: 2D array with the number of carnivores in each cell, indexed by row and column
         """
         if self._carnivore_dist is not None:
-            self._carnivore_dist.set_data(distribution.pivot("Row", "Col", "Carnivore"))
+            self._carnivore_dist.set_data(density)
         else:
-            self._carnivore_dist = self._carnivore_heat.imshow(distribution.pivot("Row", "Col", "Carnivore"),
+            self._carnivore_dist = self._carnivore_heat.imshow(density,
                                                                interpolation="nearest", vmin=0,
                                                                vmax=self.cmax["Carnivore"])
             self._carnivore_heat.figure.colorbar(self._carnivore_dist, ax=self._carnivore_heat,
                                                  orientation="vertical")
 
+    def histogram_update(self, attribute, herbivore_counts, carnivore_counts):
+        """
+        This function updates the histogram of a property with counts that are already computed. The axes
+        and the step artists are only created the first time, with the bin edges from hist_spec, after that
+        only the counts of the step artists are changed.
+
+        The upper y-limit is set from the current counts, to 10 % above the highest bin. So the axes are not
+        drawn again every year, it is only changed when a bin is above the limit, or when all the bins are
+        below half of it.
+
+        :param: attribute: "age", "weight" or "fitness"
+        :param: herbivore_counts: the number of herbivores in each bin
+        :param: carnivore_counts: the number of carnivores in each bin
+        """
+        axes = self._hist_axes[attribute]
+        if attribute not in self._histograms:
+            edges = histogram_bin_edges(self.hist_spec[attribute])
+            axes.set_title(f"{attribute.capitalize()} - Histogram")
+            axes.set_xlim(edges[0], edges[-1])
+            axes.set_ylim(0, 1)
+            self._histograms[attribute] = (axes.stairs(herbivore_counts, edges, color="green"),
+                                           axes.stairs(carnivore_counts, edges, color="red"))
+            self._background = None
+        else:
+            herbivore_step, carnivore_step = self._histograms[attribute]
+            herbivore_step.set_data(herbivore_counts)
+            carnivore_step.set_data(carnivore_counts)
+
+        top = max(np.max(herbivore_counts, initial=0), np.max(carnivore_counts, initial=0))
+        limit = max(1.1 * top, 1)
+        if top > axes.get_ylim()[1] or limit < axes.get_ylim()[1] / 2:
+            axes.set_ylim(0, limit)
+            self._background = None
+
+    def hist_update(self, attribute, herbivore_values, carnivore_values):
+        """
+        This function counts the values of a property in the bins with np.histogram, and updates the histogram
+
+        :param: attribute: "age", "weight" or "fitness"
+        :param: herbivore_values: dictionary with the values of the herbivores, with the property as key
+        :param: carnivore_values: dictionary with the values of the carnivores, with the property as key
+        """
+        if attribute not in self.hist_spec:
+            return
+        edges = histogram_bin_edges(self.hist_spec[attribute])
+        self.histogram_update(attribute,
+                              np.histogram(herbivore_values[attribute], bins=edges)[0],
+                              np.histogram(carnivore_values[attribute], bins=edges)[0])
+
     def age_hist_update(self, herbivore_age, carnivore_age):
         """
         This function updates the age histogram of the animals age
@@ -265,15 +326,7 @@ class Visualization:
         :param: herbivore_age: gets the age of the herbivores
         :param: carnivore_age: gets the age of the carnivores
         """
-        if self._age_histogram is None:
-            bin_set = math.ceil((self.hist_spec["age"]["max"]) / (self.hist_spec["age"]["delta"]))
-            self._age_hist_fig.clear()
-            self._age_hist_fig.set_title("Age - Histogram")
-            max_range = self.hist_spec["age"]["max"]
-            self._age_hist_fig.hist(herbivore_age["age"], bins=int(bin_set), range=(0, max_range),
-                                    histtype="step", color="green")
-            self._age_hist_fig.hist(carnivore_age["age"], bins=int(bin_set), range=(0, max_range),
-                                    histtype="step", color="red")
+        self.hist_update("age", herbivore_age, carnivore_age)
 
     def weight_hist_update(self, herbivore_weight, carnivore_weight):
         """
@@ -282,15 +335,7 @@ class Visualization:
         :param: herbivore_weight: gets the weight of the herbivores
         :param: carnivore_weight: gets the weight of the carnivores
         """
-        if self._weight_histogram is None:
-            bin_set = math.ceil((self.hist_spec["weight"]["max"]) / (self.hist_spec["weight"]["delta"]))
-            self._weight_hist_fig.clear()
-            self._weight_hist_fig.set_title("Weight - Histogram")
-            max_range = self.hist_spec["weight"]["max"]
-            self._weight_hist_fig.hist(herbivore_weight["weight"], bins=int(bin_set), range=(0, max_range),
-                                       histtype="step", color="green")
-            self._weight_hist_fig.hist(carnivore_weight["weight"], bins=int(bin_set), range=(0, max_range),
-                                       histtype="step", color="red")
+        self.hist_update("weight", herbivore_weight, carnivore_weight)
 
     def fitness_hist_update(self, herbivore_fitness, carnivore_fitness):
         """
@@ -299,39 +344,77 @@ class Visualization:
         :param: herbivore_fitness: gets the fitness of the herbivores
         :param: carnivore_fitness: gets the fitness of the carnivores
         """
-        if self._fitness_histogram is None:
-            bin_set = math.ceil((self.hist_spec["fitness"]["max"]) / (self.hist_spec["fitness"]["delta"]))
-            self._fitness_hist_fig.clear()
-            self._fitness_hist_fig.set_title("Fitness - Histogram")
-            max_range = self.hist_spec["fitness"]["max"]
-            self._fitness_hist_fig.hist(herbivore_fitness["fitness"], bins=int(bin_set), range=(0, max_range),
-                                        histtype="step", color="green")
-            self._fitness_hist_fig.hist(carnivore_fitness["fitness"], bins=int(bin_set), range=(0, max_range),
-                                        histtype="step", color="red")
+        self.hist_update("fitness", herbivore_fitness, carnivore_fitness)
 
-    def update_graphics_per_year(self, distribution, number_of_animal, year, herbivore_fitness, carnivore_fitness,
-                                 herbivore_age, carnivore_age, herbivore_weight, carnivore_weight):
+    def update_graphics_per_year(self, stats):
         """
         updates the graphics every year, so that these functions are updated for every year that passes. This makes it
         possible to show visualisation for over a hundred years.
 
-        :param distribution: Information about carnivores in each cell, distribution is a dataframe.
-        :param number_of_animal: gives us the number of the species
-        :param year: present year
-        :param herbivore_fitness: gets the fitness of the herbivores
-        :param carnivore_fitness: gets the fitness of the carnivores
-        :param herbivore_age: gets the age of the herbivores
-        :param carnivore_age: gets the age of the carnivores
-        :param herbivore_weight: gets the weight of the herbivores
-        :param carnivore_weight: gets the weight of the carnivores
-        """
-        self.herbivore_heat_map_update(distribution)
-        self.carnivore_heat_map_update(distribution)
-        count_herbivore = number_of_animal["Herbivore"]
-        count_carnivore = number_of_animal["Carnivore"]
-        self.curves_update(year, count_herbivore, count_carnivore)
-        self.year_update(year)
-        self.fitness_hist_update(herbivore_fitness, carnivore_fitness)
-        self.age_hist_update(herbivore_age, carnivore_age)
-        self.weight_hist_update(herbivore_weight, carnivore_weight)
-        plt.pause(1e-6)
+        :param stats: StatsSnapshot with the statistics of the island for the present year
+        """
+        self.herbivore_heat_map_update(stats.density["Herbivore"])
+        self.carnivore_heat_map_update(stats.density["Carnivore"])
+        count_herbivore = stats.number_of_animals["Herbivore"]
+        count_carnivore = stats.number_of_animals["Carnivore"]
+        self.curves_update(stats.year, count_herbivore, count_carnivore)
+        self.year_update(stats.year)
+        for attribute, counts in stats.histograms.items():
+            self.histogram_update(attribute, counts["Herbivore"], counts["Carnivore"])
+        self.redraw()
+
+    def dynamic_artists(self):
+        """
+        The artists that change every year: the two heat maps, the two curves, the year and the histogram steps
+
+        :return: list with the artists that are created
+        """
+        artists = [self._herbivore_dist, self._carnivore_dist, self._herbivore_curve, self._carnivore_curve,
+                   self._year_text]
+        for steps in self._histograms.values():
+            artists.extend(steps)
+        return [artist for artist in artists if artist is not None]
+
+    def _on_draw(self, event):
+        """
+        Stores the background after every full redraw of the figure, for example when the window is resized,
+        and draws the dynamic artists on top of it again.
+
+        :param: event: the draw event from matplotlib
+        """
+        if event.canvas.is_saving():
+            return
+        self._background = event.canvas.copy_from_bbox(self._fig.bbox)
+        for artist in self.dynamic_artists():
+            self._fig.draw_artist(artist)
+
+    def frame_buffer(self):
+        """
+        The pixels of the figure as it was last drawn
+
+        :return: RGBA buffer of the canvas, with shape (height, width, 4)
+        """
+        return self._fig.canvas.buffer_rgba()
+
+    def redraw(self):
+        """
+        Shows the updated graphics. With blitting, the stored background is put back and only the dynamic
+        artists are drawn on top of it. The whole figure is drawn the first time, and when something in the
+        background has changed, like the limits of an axis. Without blitting the whole figure is redrawn.
+        """
+        canvas = self._fig.canvas
+        if not (self.blit and canvas.supports_blit):
+            plt.pause(1e-6)
+            return
+
+        for artist in self.dynamic_artists():
+            artist.set_animated(True)
+        if self._background is None:
+            canvas.draw()
+            plt.pause(1e-6)
+        else:
+            canvas.restore_region(self._background)
+            for artist in self.dynamic_artists():
+                self._fig.draw_artist(artist)
+            canvas.blit(self._fig.bbox)
+            canvas.flush_events()
@@ -0,0 +1,22 @@
+# -*- encoding: utf-8 -*-
+"""
+This script contains the fixtures that are shared by the tests in several scripts.
+
+To use this script the user must have installed the python package to the Python environment.
+The user must also import pytest.
+"""
+
+__author__ = "Anish Thangalingam & Majorann Thevarajah"
+__email__ = "anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no"
+
+import pytest
+
+
+@pytest.fixture
+def population():
+    """
+    Herbivores and carnivores in the cell (2, 2), which is land in all the small test maps
+    """
+    return [{'loc': (2, 2),
+             'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 20} for _ in range(20)] +
+                    [{'species': 'Carnivore', 'age': 5, 'weight': 20} for _ in range(3)]}]
@@ -12,7 +12,8 @@ from biosim package.
 __author__ = "Majorann Thevarjah & Anish Thangalingam"
 __email__ = "Majorann.thevarajah@nmbu.no & Anish.thangalingam@nmbu.no"
 
-from biosim.animals import Herbivore, Carnivore
+from biosim.animals import Herbivore, Carnivore, RandomNumbers
+import numpy as np
 import pytest
 
 
@@ -272,3 +273,98 @@ def test_carnivore_weight_after_eating(mocker):
     carnivore = Carnivore(4, 14)
     carnivore.carnivore_eat(herbivore_least_fit)
     assert carnivore.weight == 14 + 10*0.75
+
+
+def test_fitness_cache_updated_after_change():
+    """
+    Test that the cached fitness is calculated again when age, weight or the parameters change
+    """
+    herbivore = Herbivore(Herbivore.parameters["a_half"], 30)
+    fitness_before = herbivore.fitness
+    herbivore.eat(10)
+    assert herbivore.fitness > fitness_before
+
+    fitness_before = herbivore.fitness
+    herbivore.grows_in_age()
+    assert herbivore.fitness < fitness_before
+
+    carnivore = Carnivore(10, 30)
+    fitness_before = carnivore.fitness
+    carnivore.weight = 2
+    assert carnivore.fitness < fitness_before
+
+
+def test_fitness_cache_not_recalculated(mocker):
+    """
+    Test that the fitness is only calculated once when age and weight do not change
+    """
+    herbivore = Herbivore(10, 30)
+    spy = mocker.spy(herbivore, "calculate_fitness")
+    for _ in range(5):
+        herbivore.fitness
+    assert spy.call_count == 1
+
+
+def test_fitness_of_population():
+    """
+    Test that the batch fitness gives the same fitness as the fitness of each animal
+    """
+    ages = [10, 3, 40]
+    weights = [30.0, 0.0, 12.5]
+
+    fitness = Herbivore.fitness_of_population(ages, weights)
+    expected = [Herbivore(age, weight).fitness for age, weight in zip(ages, weights)]
+
+    assert fitness == pytest.approx(expected)
+
+
+def test_kill_herbivores_marks_killed(mocker):
+    """
+    Test that the killed herbivores are marked as not alive, and that herbivores already
+    killed by another carnivore are skipped
+    """
+    mocker.patch("random.random", return_value=0.0)
+    herbivore_least_fit = [Herbivore(3, 10), Herbivore(3, 12)]
+    herbivore_fitness = [herbivore.fitness for herbivore in herbivore_least_fit]
+    alive = [False, True]
+    carnivore = Carnivore(4, 14)
+    carnivore.kill_herbivores(herbivore_least_fit, herbivore_fitness, alive)
+
+    assert alive == [False, False]
+    assert carnivore.weight == 14 + 12*0.75
+
+
+def test_random_numbers_from_generator():
+    """
+    Tests that the animals use the numpy Generator when one is given, instead of the random module
+    """
+    herbivore = Herbivore(rng=np.random.default_rng(5))
+    assert herbivore.weight == np.random.default_rng(5).normal(Herbivore.parameters["w_birth"],
+                                                               Herbivore.parameters["sigma_birth"])
+
+    probability = herbivore.parameters["mu"] * herbivore.fitness
+    assert herbivore.possible_for_moving(np.random.default_rng(8)) == (np.random.default_rng(8).random() < probability)
+
+
+def test_random_numbers_in_batches(mocker):
+    """
+    Tests that the numbers reserved for a phase are drawn with one call, and come in the same order as
+    from the generator
+    """
+    rng = mocker.Mock(wraps=np.random.default_rng(3))
+    random_numbers = RandomNumbers(rng)
+    random_numbers.reserve(uniforms=5)
+    numbers = [random_numbers.random() for _ in range(5)]
+
+    assert rng.random.call_count == 1
+    assert numbers == np.random.default_rng(3).random(5).tolist()
+
+
+def test_random_numbers_normal():
+    """
+    Tests that the normal random numbers are the same as from Generator.normal
+    """
+    random_numbers = RandomNumbers(np.random.default_rng(4))
+    random_numbers.reserve(normals=3)
+    assert [random_numbers.normal(8.0, 1.5) for _ in range(3)] == pytest.approx(
+        np.random.default_rng(4).normal(8.0, 1.5, 3))
@@ -0,0 +1,99 @@
+# -*- encoding: utf-8 -*-
+"""
+This script contains several tests, which test the branching scripts functions.
+
+To use this script the user must have installed the python package to the Python environment and
+import the branching.py from the biosim package. The user must also import pytest and numpy
+"""
+
+__author__ = "Anish Thangalingam & Majorann Thevarajah"
+__email__ = "anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no"
+
+from biosim.branching import Branches, burn_in, run_branch, set_burn_in
+from biosim.checkpoint import read_checkpoint
+from biosim.ensemble import current_parameters
+from biosim.simulation import BioSim
+import numpy as np
+import pytest
+
+test_map = """\
+               WWWWWWW
+               WLLLLHW
+               WLHLDLW
+               WDLLLHW
+               WWWWWWW"""
+
+
+@pytest.fixture
+def checkpoint_file(tmp_path):
+    """
+    A burn-in with only herbivores
+    """
+    population = [{'loc': (2, 3), 'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 20} for _ in range(30)]}]
+    return burn_in(test_map, population, 1, 5, str(tmp_path / "burn_in.npz"))
+
+
+@pytest.fixture
+def carnivores():
+    """
+    Carnivores that are added to the branches
+    """
+    return [{'loc': (3, 3), 'pop': [{'species': 'Carnivore', 'age': 5, 'weight': 20} for _ in range(5)]}]
+
+
+def test_burn_in(checkpoint_file):
+    """
+    Tests that the burn-in writes a checkpoint after the given number of years
+    """
+    metadata, arrays = read_checkpoint(checkpoint_file)
+    assert metadata["year"] == 5
+    assert len(arrays["Herbivore_age"]) > 0
+    assert len(arrays["Carnivore_age"]) == 0
+
+
+def test_branch_is_continued_simulation(checkpoint_file, carnivores):
+    """
+    Tests that a branch gives the same numbers as a simulation that is loaded with the same seed and continued
+    """
+    set_burn_in(read_checkpoint(checkpoint_file))
+    counts = run_branch((7, {}, carnivores, 4))
+    set_burn_in(None)
+
+    sim = BioSim.load_checkpoint(checkpoint_file, seed=7, headless=True)
+    sim.add_population(carnivores)
+    sim.simulate(4)
+    assert counts.shape == (4, 2)
+    assert list(counts[-1]) == [sim.num_animals_per_species["Herbivore"], sim.num_animals_per_species["Carnivore"]]
+
+
+def test_branches_are_independent(checkpoint_file, carnivores):
+    """
+    Tests that branches with different seeds differ, that the same seed gives the same branch, and that the
+    parameters in the main process are not changed
+    """
+    before = current_parameters()
+    branches = Branches(checkpoint_file, [3, 3, 4], population=carnivores)
+    results = branches.run(6, workers=2)
+    assert np.array_equal(results[0], results[1])
+    assert not np.array_equal(results[0], results[2])
+    assert current_parameters() == before
+
+
+def test_branch_parameters(checkpoint_file):
+    """
+    Tests that a branch uses its own parameters
+    """
+    branches = Branches(checkpoint_file, [3, 3], points=[{}, {"Herbivore.omega": 1.0, "Herbivore.w_half": 1000.0}])
+    results = branches.run(3, workers=2)
+    assert results[0][-1, 0] > 0
+    assert results[1][-1, 0] == 0
+
+
+def test_wrong_points(checkpoint_file):
+    """
+    Tests that a wrong number of points or a wrong parameter name gives an error before the runs start
+    """
+    with pytest.raises(ValueError):
+        Branches(checkpoint_file, [1, 2], points=[{}])
+    with pytest.raises(KeyError):
+        Branches(checkpoint_file, [1], points=[{"Herbivore.not_a_parameter": 1}])
@@ -0,0 +1,148 @@
+# -*- encoding: utf-8 -*-
+"""
+This script contains several tests, which test the checkpoint scripts functions and the checkpoints of BioSim.
+
+To use this script the user must have installed the python package to the Python environment and
+import the checkpoint.py from the biosim package. The user must also import pytest and numpy
+"""
+
+__author__ = "Anish Thangalingam & Majorann Thevarajah"
+__email__ = "anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no"
+
+from biosim.animals import Herbivore, RandomNumbers
+from biosim.checkpoint import (pack_generator_state, unpack_generator_state, generator_arrays, generator_rows,
+                               global_random_state, restore_global_random_state, write_checkpoint, read_checkpoint)
+from biosim.ensemble import isolated_parameters
+from biosim.simulation import BioSim
+import numpy as np
+import random
+import pytest
+
+test_map = """\
+               WWWWWWW
+               WLLLLHW
+               WLHLDLW
+               WDLLLHW
+               WWWWWWW"""
+
+
+def test_generator_state():
+    """
+    Tests that a generator with an unpacked state gives the same numbers as the generator that was packed
+    """
+    rng = np.random.default_rng(3)
+    rng.random(5)
+    rng.integers(10)
+    packed = pack_generator_state(rng)
+    other = np.random.default_rng(4)
+    unpack_generator_state(other, packed)
+    assert np.array_equal(other.random(5), rng.random(5))
+
+
+def test_generator_arrays():
+    """
+    Tests that the numbers that are drawn but not used are stored for every cell
+    """
+    first = RandomNumbers(np.random.default_rng(1))
+    first.reserve(uniforms=3, normals=2)
+    first.random()
+    arrays = generator_arrays([first, None])
+    assert list(arrays["uniform_counts"]) == [2, 0]
+    assert list(arrays["normal_counts"]) == [2, 0]
+
+    copy = RandomNumbers(np.random.default_rng(2))
+    packed, uniforms, normals = generator_rows(arrays)[0]
+    unpack_generator_state(copy.rng, packed)
+    copy.set_buffered(uniforms, normals)
+    assert [copy.random() for _ in range(5)] == [first.random() for _ in range(5)]
+    assert copy.normal(0, 1) == first.normal(0, 1)
+
+
+def test_global_random_state():
+    """
+    Tests that the random module and np.random give the same numbers after the state is set back
+    """
+    random.gauss(0, 1)
+    state = global_random_state()
+    expected = (random.random(), random.gauss(0, 1), np.random.random())
+    restore_global_random_state(state)
+    assert (random.random(), random.gauss(0, 1), np.random.random()) == expected
+
+
+def test_write_and_read(tmp_path):
+    """
+    Tests that the metadata and the arrays are read as they were written, and that no temporary file is left
+    """
+    filename = str(tmp_path / "test.npz")
+    write_checkpoint(filename, {"year": 3}, {"numbers": np.arange(4)})
+    metadata, arrays = read_checkpoint(filename)
+    assert metadata["year"] == 3
+    assert np.array_equal(arrays["numbers"], np.arange(4))
+    assert [path.name for path in tmp_path.iterdir()] == ["test.npz"]
+
+
+@pytest.mark.parametrize("engine", ["object", "array", "vectorized"])
+@pytest.mark.parametrize("seed", [12, None])
+def test_continue_from_checkpoint(population, tmp_path, engine, seed):
+    """
+    Tests that a simulation that is continued from a checkpoint gives exactly the same result as the simulation
+    that was not stopped, with and without a seed
+    """
+    filename = str(tmp_path / "sim.npz")
+    sim = BioSim(test_map, population, seed, engine=engine, headless=True)
+    sim.simulate(4)
+    sim.save_checkpoint(filename)
+    sim.simulate(4)
+
+    continued = BioSim.load_checkpoint(filename, headless=True)
+    assert continued.year == 4
+    continued.simulate(4)
+    assert continued.year == 8
+    assert np.array_equal(continued.island.get_cell_counts(), sim.island.get_cell_counts())
+    for species in ("Herbivore", "Carnivore"):
+        for column, continued_column in zip(sim.island.get_population_columns(species),
+                                            continued.island.get_population_columns(species)):
+            assert np.array_equal(column, continued_column)
+
+
+def test_decomposed_checkpoint(population, tmp_path):
+    """
+    Tests that a checkpoint of the engine decomposed can be continued with the engine array, with the same result
+    """
+    filename = str(tmp_path / "sim.npz")
+    with BioSim(test_map, population, 5, engine="decomposed", headless=True, workers=2) as sim:
+        sim.simulate(3)
+        sim.save_checkpoint(filename)
+        sim.simulate(3)
+
+        continued = BioSim.load_checkpoint(filename, engine="array", headless=True)
+        continued.simulate(3)
+        assert np.array_equal(continued.island.get_cell_counts(), sim.island.get_cell_counts())
+
+
+def test_checkpoint_parameters(population, tmp_path):
+    """
+    Tests that the parameters in the checkpoint are set when it is loaded
+    """
+    filename = str(tmp_path / "sim.npz")
+    with isolated_parameters({"Herbivore": {"zeta": 2.5}}):
+        sim = BioSim(test_map, population, 1, headless=True)
+        sim.save_checkpoint(filename)
+    assert Herbivore.parameters["zeta"] != 2.5
+    with isolated_parameters():
+        BioSim.load_checkpoint(filename, headless=True)
+        assert Herbivore.parameters["zeta"] == 2.5
+
+
+def test_simulate_writes_checkpoints(population, tmp_path):
+    """
+    Tests that simulate writes a checkpoint every checkpoint_years years
+    """
+    filename = str(tmp_path / "sim.npz")
+    sim = BioSim(test_map, population, 1, headless=True)
+    sim.simulate(5, checkpoint_years=2, checkpoint_file=filename)
+    metadata, _ = read_checkpoint(filename)
+    assert metadata["year"] == 4
+
+    with pytest.raises(ValueError):
+        sim.simulate(1, checkpoint_years=2)
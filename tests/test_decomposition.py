@@ -0,0 +1,161 @@
+# -*- encoding: utf-8 -*-
+"""
+This script contains several tests, which test the decomposition scripts functions.
+
+To use this script the user must have installed the python package to the Python environment and
+import the decomposition.py from the biosim package. The user must also import pytest and numpy
+"""
+
+__author__ = "Anish Thangalingam & Majorann Thevarajah"
+__email__ = "anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no"
+
+from biosim.animals import Herbivore
+from biosim.decomposition import DecomposedIsland, StripIsland
+from biosim.ensemble import isolated_parameters
+from biosim.island import Island
+from biosim.simulation import BioSim
+import numpy as np
+import pytest
+
+test_map = """\
+               WWWWWWW
+               WLLLLHW
+               WLHLDLW
+               WDLLLHW
+               WLLHLLW
+               WHLLDLW
+               WWWWWWW"""
+
+
+@pytest.fixture
+def strip_population():
+    """
+    Population in two cells in different strips, so the animals migrate across the strip borders
+    """
+    return [{'loc': (3, 3),
+             'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 20} for _ in range(60)] +
+                    [{'species': 'Carnivore', 'age': 5, 'weight': 20} for _ in range(10)]},
+            {'loc': (5, 4),
+             'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 20} for _ in range(40)]}]
+
+
+def test_strip_island_cells():
+    """
+    Tests that a strip has the cells of its rows and the halo rows, and that only its own cells have a
+    random generator with the same seed as in the whole island
+    """
+    strip = StripIsland(test_map, 3, 4, backend="array", seed=3)
+    assert sorted({loc_pos[0] for loc_pos in strip.map}) == [2, 3, 4, 5]
+    assert strip.owns((3, 2)) and not strip.owns((5, 2))
+    assert strip.map[(5, 2)].rng is None
+
+    island = Island(test_map, [], backend="array", seed=3)
+    assert strip.map[(4, 3)].rng.random() == island.map[(4, 3)].rng.random()
+
+
+@pytest.mark.parametrize("backend", ["object", "array"])
+@pytest.mark.parametrize("workers", [2, 3])
+def test_same_result_as_island(strip_population, backend, workers):
+    """
+    Tests that the decomposed island gives exactly the same animals in every cell as the island with the same
+    seed, also when the migrating animals cross the strip borders
+    """
+    island = Island(test_map, strip_population, backend=backend, seed=11)
+    with DecomposedIsland(test_map, strip_population, backend=backend, seed=11, workers=workers) as decomposed:
+        for _ in range(6):
+            island.island_season_cycle()
+            decomposed.island_season_cycle()
+            assert np.array_equal(decomposed.get_cell_counts(), island.get_cell_counts())
+            assert decomposed.get_number_of_animals() == island.get_number_of_animals()
+            assert np.array_equal(decomposed.get_density_grid("Herbivore"), island.get_density_grid("Herbivore"))
+
+        for species in island.species_names:
+            for column, decomposed_column in zip(island.get_population_columns(species),
+                                                 decomposed.get_population_columns(species)):
+                assert np.allclose(np.sort(column), np.sort(decomposed_column))
+
+
+def test_parameters_sent_to_workers(strip_population):
+    """
+    Tests that the workers use parameters that are changed after they are started
+    """
+    with DecomposedIsland(test_map, strip_population, seed=5, workers=2) as decomposed:
+        with isolated_parameters({"Herbivore": {"omega": 1.0, "w_half": 1000.0}}):
+            for _ in range(3):
+                decomposed.island_season_cycle()
+        assert decomposed.get_number_of_animals()["Herbivore"] == 0
+        assert Herbivore.parameters["omega"] != 1.0
+
+
+def test_invalid_location(strip_population):
+    """
+    Tests that a population outside the map gives a KeyError
+    """
+    with DecomposedIsland(test_map, [], workers=2) as decomposed:
+        with pytest.raises(KeyError):
+            decomposed.population_in_cell([{'loc': (9, 9), 'pop': strip_population[1]['pop']}])
+
+
+def test_more_workers_than_rows():
+    """
+    Tests that there is never more than one worker per row
+    """
+    with DecomposedIsland(test_map, [], workers=20) as decomposed:
+        assert len(decomposed.strip_rows) == len(test_map.splitlines())
+
+
+def test_biosim_decomposed_engine(strip_population):
+    """
+    Tests that BioSim with the engine decomposed gives the same numbers as the engine array
+    """
+    array_sim = BioSim(test_map, strip_population, 4, engine="array", headless=True)
+    array_sim.simulate(3)
+    with BioSim(test_map, strip_population, 4, engine="decomposed", headless=True, workers=2) as decomposed_sim:
+        decomposed_sim.simulate(3)
+        assert decomposed_sim.num_animals_per_species == array_sim.num_animals_per_species
+        processes = decomposed_sim.island._processes
+        assert all(process.is_alive() for process in processes)
+    assert not any(process.is_alive() for process in processes)
+
+
+def test_add_population_columns(strip_population):
+    """
+    Tests that animals added from columns are sent to the workers that own their cells
+    """
+    island = Island(test_map, strip_population, backend="array", seed=2)
+    animals = [(each_cell['loc'], each_animal)
+               for each_cell in strip_population for each_animal in each_cell['pop']]
+    with DecomposedIsland(test_map, [], seed=2, workers=3) as decomposed:
+        decomposed.add_population_columns([loc for loc, _ in animals],
+                                          [each_animal['species'] for _, each_animal in animals],
+                                          [each_animal['age'] for _, each_animal in animals],
+                                          [each_animal['weight'] for _, each_animal in animals])
+        assert np.array_equal(decomposed.get_cell_counts(), island.get_cell_counts())
+        island.island_season_cycle()
+        decomposed.island_season_cycle()
+        assert np.array_equal(decomposed.get_cell_counts(), island.get_cell_counts())
+
+
+def test_error_in_worker(strip_population):
+    """
+    Tests that an error in a worker is raised in the main process, and that all the workers are stopped
+    """
+    with DecomposedIsland(test_map, strip_population, workers=2) as decomposed:
+        processes = list(decomposed._processes)
+        with pytest.raises(ValueError, match="non-negative"):
+            decomposed.population_in_cell([{'loc': (5, 4),
+                                             'pop': [{'species': 'Herbivore', 'age': -1, 'weight': 20}]}])
+        assert not any(process.is_alive() for process in processes)
+        with pytest.raises(RuntimeError):
+            decomposed.island_season_cycle()
+
+
+def test_worker_that_has_stopped(strip_population):
+    """
+    Tests that a worker that has stopped gives a RuntimeError, and not an EOFError
+    """
+    with DecomposedIsland(test_map, strip_population, workers=2) as decomposed:
+        decomposed._processes[0].terminate()
+        decomposed._processes[0].join()
+        with pytest.raises(RuntimeError):
+            decomposed.island_season_cycle()
@@ -0,0 +1,105 @@
+# -*- encoding: utf-8 -*-
+"""
+This script contains several tests, which test the density_cube scripts functions.
+
+To use this script the user must have installed the python package to the Python environment and
+import the density_cube.py from the biosim package. The user must also import pytest and numpy
+"""
+
+__author__ = "Anish Thangalingam & Majorann Thevarajah"
+__email__ = "anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no"
+
+from biosim.density_cube import DensityCube, HEADER_SIZE, npy_header, read_npy_shape
+from biosim.island import Island
+from biosim.recorder import TimeSeriesRecorder
+from biosim.simulation import BioSim
+import numpy as np
+import os
+import pytest
+
+test_map = """\
+               WWWWW
+               WLLHW
+               WLDLW
+               WWWWW"""
+
+
+def test_npy_header():
+    """
+    Tests that the header always has the same size, and that numpy can read it
+    """
+    for years in (0, 7, 10 ** 9):
+        header = npy_header((years, 4, 5, 2), np.int32)
+        assert len(header) == HEADER_SIZE
+    with pytest.raises(ValueError):
+        npy_header(tuple(range(40)), np.int32)
+
+
+def test_cube_grows_in_chunks(population, tmp_path):
+    """
+    Tests that the file grows chunk_years years at a time, and that the unused years are removed by close
+    """
+    filename = str(tmp_path / "density.npy")
+    island = Island(test_map, population)
+    cube = DensityCube(filename, chunk_years=4)
+    for year in range(5):
+        cube.record(island, year)
+    year_size = 4 * 5 * 2 * 4
+    assert os.path.getsize(filename) == HEADER_SIZE + 8 * year_size
+    cube.flush()
+    assert read_npy_shape(filename)[0] == (5, 4, 5, 2)
+    cube.close()
+    assert os.path.getsize(filename) == HEADER_SIZE + 5 * year_size
+
+    array = DensityCube.load(filename)
+    assert isinstance(array, np.memmap)
+    assert array[3, 1, 1, 0] == 20
+    assert array[3, 1, 1, 1] == 3
+
+
+def test_simulate_with_cube(population, tmp_path):
+    """
+    Tests that the cube has the distributions of every year, also with another recorder, and that a simulation
+    that is continued appends to the cube
+    """
+    filename = str(tmp_path / "density.npy")
+    sim = BioSim(test_map, population, 2, headless=True)
+    distributions = []
+    with DensityCube(filename, chunk_years=3) as cube:
+        for _ in range(4):
+            sim.simulate(1, recorder=[cube, TimeSeriesRecorder(str(tmp_path / "series"))])
+            distributions.append(sim.distributions)
+
+    with DensityCube(filename, chunk_years=3, append=True) as cube:
+        sim.simulate(2, recorder=cube)
+
+    array = DensityCube.load(filename)
+    assert array.shape == (6, 4, 5, 2)
+    for year, distribution in enumerate(distributions):
+        for row, col, herbivores, carnivores in distribution.itertuples(index=False):
+            assert array[year, row - 1, col - 1, 0] == herbivores
+            assert array[year, row - 1, col - 1, 1] == carnivores
+    assert np.array_equal(array[-1, :, :, 0], sim.island.get_density_grid("Herbivore"))
+
+
+def test_new_cube_replaces_file(population, tmp_path):
+    """
+    Tests that a cube without append writes a new file
+    """
+    filename = str(tmp_path / "density.npy")
+    island = Island(test_map, population)
+    for _ in range(2):
+        with DensityCube(filename) as cube:
+            cube.record(island)
+    assert DensityCube.load(filename).shape == (1, 4, 5, 2)
+
+
+def test_map_size_must_not_change(population, tmp_path):
+    """
+    Tests that all the years must have the same map size
+    """
+    cube = DensityCube(str(tmp_path / "density.npy"))
+    cube.record(Island(test_map, population))
+    with pytest.raises(ValueError):
+        cube.record(Island("WWW\nWLW\nWWW", []))
+    cube.close()
@@ -0,0 +1,99 @@
+# -*- encoding: utf-8 -*-
+"""
+This script contains several tests, which test the ensemble scripts functions.
+
+To use this script the user must have installed the python package to the Python environment and
+import the ensemble.py from the biosim package. The user must also import pytest and numpy
+"""
+
+__author__ = "Anish Thangalingam & Majorann Thevarajah"
+__email__ = "anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no"
+
+from biosim.animals import Herbivore
+from biosim.ensemble import Ensemble, EnsembleStatistics, isolated_parameters, run_seed, current_parameters
+from biosim.landscape import Lowland
+from biosim.simulation import BioSim
+import numpy as np
+import pytest
+
+
+def test_isolated_parameters():
+    """
+    Tests that the parameters are set inside the with block, and set back afterwards
+    """
+    old_zeta = Herbivore.parameters["zeta"]
+    old_f_max = Lowland.parameters["f_max"]
+    with isolated_parameters({"Herbivore": {"zeta": 1.0}}, {"L": {"f_max": 100}}):
+        assert Herbivore.parameters["zeta"] == 1.0
+        assert Lowland.parameters["f_max"] == 100
+
+    assert Herbivore.parameters["zeta"] == old_zeta
+    assert Lowland.parameters["f_max"] == old_f_max
+
+
+def test_isolated_parameters_after_error():
+    """
+    Tests that the parameters are set back after a wrong parameter name
+    """
+    before = current_parameters()
+    with pytest.raises(KeyError):
+        with isolated_parameters({"Herbivore": {"zeta": 1.0, "not_a_parameter": 1}}):
+            pass
+    assert current_parameters() == before
+
+
+def test_statistics():
+    """
+    Tests the mean, the quantiles and the extinction probability of a few runs
+    """
+    statistics = EnsembleStatistics(2)
+    for herbivores in (1, 2, 3, 4):
+        statistics.add([[herbivores, 0], [10 * herbivores, herbivores % 2]])
+
+    assert statistics.runs == 4
+    assert statistics.mean["Herbivore"] == pytest.approx([2.5, 25])
+    assert statistics.quantile(0.5)["Herbivore"][0] == 2
+    assert statistics.quantile(1)["Herbivore"][0] == 4
+    assert statistics.quantile(0.5)["Herbivore"][1] == pytest.approx(20, rel=0.05)
+    assert statistics.extinction_probability["Carnivore"] == pytest.approx([1, 0.5])
+
+
+def test_statistics_above_last_bin_edge():
+    """
+    Tests that numbers above the last bin edge are not cut off at the bin edge in the quantiles
+    """
+    statistics = EnsembleStatistics(1, bin_edges=[0, 1, 2, 10])
+    for herbivores in (5, 20, 30):
+        statistics.add([[herbivores, 0]])
+    assert statistics.quantile(1)["Herbivore"][0] == 30
+    assert 10 < statistics.quantile(0.5)["Herbivore"][0] <= 30
+
+
+@pytest.mark.parametrize('workers, chunksize', [(2, 1), (1, 2)])
+def test_ensemble_same_as_single_runs(population, workers, chunksize):
+    """
+    Tests that the ensemble gives the same mean as running BioSim with every seed
+    """
+    ensemble = Ensemble("WWWW\nWLHW\nWWWW", population, seeds=[1, 2, 3])
+    statistics = ensemble.run(4, workers=workers, chunksize=chunksize)
+
+    single_runs = []
+    for seed in (1, 2, 3):
+        sim = BioSim("WWWW\nWLHW\nWWWW", population, seed, headless=True)
+        sim.simulate(4, record=["num_animals_per_species"])
+        single_runs.append([counts["Herbivore"] for counts in sim.records["num_animals_per_species"]])
+
+    assert statistics.runs == 3
+    assert statistics.mean["Herbivore"] == pytest.approx(np.mean(single_runs, axis=0))
+
+
+def test_run_parameters_do_not_leak(population):
+    """
+    Tests that the parameters of a run are only used in that run
+    """
+    old_f_max = Lowland.parameters["f_max"]
+    job = ("WWWW\nWLHW\nWWWW", population, 1, 3, "object", current_parameters(), {}, {"L": {"f_max": 0}})
+    counts = run_seed(job)
+
+    assert counts.shape == (3, 2)
+    assert Lowland.parameters["f_max"] == old_f_max
@@ -11,6 +11,7 @@ __author__ = "Anish Thangalingam, Majorann Thevarjah"
 __email__ = "anish.thangalingam@nmbu.no ,Majorann.thevarajah@nmbu.no"
 
 from biosim.island import Island
+import numpy as np
 import pytest
 
 
@@ -126,7 +127,7 @@ def test_migration(mocker):
     Test if animals migrate to suitable landscapes, if the population before is not the same as the population after,
     it means that the function works and that the animals migrate to a suitable landscape
     """
-    mocker.patch("numpy.random.choice", return_value=2)
+    mocker.patch("numpy.random.choice", side_effect=lambda slots, size: np.full(size, 2))
     mocker.patch("random.random", return_value=0)
     test_map = """\
                     WWWWWW
@@ -175,3 +176,337 @@ def test_island_season_cycle(mocker):
     island = Island(island_map=test_map, initial_population=[])
     island.population_in_cell(population)
     island.island_season_cycle()
+
+
+def test_array_backend_season_cycle():
+    """
+    Tests that the annual cycle runs with the array backend and that no animal ends up in water
+    """
+    test_map = """\
+                    WWWWWW
+                    WHHHHW
+                    WLLLLW
+                    WWWWWW"""
+
+    population = [{'loc': (3, 3),
+                   'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 20} for _ in range(50)] +
+                          [{'species': 'Carnivore', 'age': 5, 'weight': 20} for _ in range(5)]}]
+
+    island = Island(island_map=test_map, initial_population=population, backend="array")
+    for _ in range(5):
+        island.island_season_cycle()
+
+    for cell in island.map.values():
+        if not cell.flag:
+            assert cell.get_number_of_herbivores() == 0
+            assert cell.get_number_of_carnivores() == 0
+
+
+def test_emigration_buffers_animals(mocker):
+    """
+    Tests that emigration removes the animals from the cell, but does not add them to the new cell before
+    immigration
+    """
+    mocker.patch("numpy.random.choice", side_effect=lambda slots, size: np.full(size, 2))
+    mocker.patch("random.random", return_value=0)
+    test_map = """\
+                    WWWWWW
+                    WHHHHW
+                    WWWWWW"""
+
+    population = [{'loc': (2, 2),
+                   'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 20} for _ in range(3)]}]
+
+    island = Island(island_map=test_map, initial_population=population)
+    outbound = island.emigration((2, 2))
+
+    assert island.map[(2, 2)].get_number_of_herbivores() == 0
+    assert island.map[(2, 3)].get_number_of_herbivores() == 0
+    assert outbound[0][0] == (2, 3)
+
+    island.immigration(outbound)
+    assert island.map[(2, 3)].get_number_of_herbivores() == 3
+
+
+def test_island_migration_moves_once(mocker):
+    """
+    Tests that an animal only migrates one cell in a year, even if the new cell is handled later
+    """
+    mocker.patch("numpy.random.choice", side_effect=lambda slots, size: np.full(size, 2))
+    mocker.patch("random.random", return_value=0)
+    test_map = """\
+                    WWWWWW
+                    WHHHHW
+                    WWWWWW"""
+
+    population = [{'loc': (2, 2),
+                   'pop': [{'species': 'Carnivore', 'age': 5, 'weight': 20}]}]
+
+    island = Island(island_map=test_map, initial_population=population)
+    island.island_migration()
+
+    assert island.map[(2, 3)].get_number_of_carnivores() == 1
+    assert island.map[(2, 4)].get_number_of_carnivores() == 0
+
+
+def test_adjacency_creating():
+    """
+    Tests that the neighbour table gives the neighbour cells and if they are passable
+    """
+    test_map = """\
+                    WWWWW
+                    WHLWW
+                    WWWWW"""
+
+    island = Island(island_map=test_map, initial_population=[])
+    index = island.cell_index[(2, 2)]
+    neighbours = [island.locations[neighbour] for neighbour in island.neighbours[index]]
+
+    assert neighbours == island.neighbour_locations((2, 2))
+    assert list(island.neighbour_passable[index]) == [False, False, True, False]
+    assert island.neighbours[island.cell_index[(1, 1)], 1] == -1
+
+
+def test_active_cells(mocker):
+    """
+    Tests that only the cells with animals are active, and that a cell is removed when all the animals
+    have died. The mocker makes sure that the animal dies.
+    """
+    test_map = """\
+                    WWWWWW
+                    WHHHHW
+                    WWWWWW"""
+
+    population = [{'loc': (2, 3),
+                   'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 20}]}]
+
+    island = Island(island_map=test_map, initial_population=population)
+    assert island.active_cells == {(2, 3)}
+
+    mocker.patch("random.random", return_value=0)
+    island.island_season_cycle()
+
+    assert island.active_cells == set()
+
+
+def test_season_cycle_skips_empty_cells(mocker):
+    """
+    Tests that the annual cycle does not handle cells without animals
+    """
+    test_map = """\
+                    WWWWWW
+                    WHHHHW
+                    WWWWWW"""
+
+    island = Island(island_map=test_map, initial_population=[])
+    spy = mocker.spy(island.map[(2, 2)], "set_food_parameters")
+    island.island_season_cycle()
+
+    assert spy.call_count == 0
+
+
+def test_running_counters_match_cells():
+    """
+    Tests that the running counters give the same number of animals as counting the animals in every cell
+    """
+    test_map = """\
+                    WWWWWW
+                    WHHHHW
+                    WLLDDW
+                    WWWWWW"""
+
+    population = [{'loc': (3, 3),
+                   'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 20} for _ in range(40)] +
+                          [{'species': 'Carnivore', 'age': 5, 'weight': 20} for _ in range(5)]}]
+
+    island = Island(island_map=test_map, initial_population=population)
+    assert island.get_number_of_animals() == {'Herbivore': 40, 'Carnivore': 5}
+
+    for _ in range(5):
+        island.island_season_cycle()
+
+    herbivores = sum(cell.get_number_of_herbivores() for cell in island.map.values())
+    carnivores = sum(cell.get_number_of_carnivores() for cell in island.map.values())
+    assert island.get_number_of_animals() == {'Herbivore': herbivores, 'Carnivore': carnivores}
+    for row, col, herbivore_count, carnivore_count in island.get_cell_counts():
+        assert herbivore_count == island.map[(row, col)].get_number_of_herbivores()
+        assert carnivore_count == island.map[(row, col)].get_number_of_carnivores()
+
+
+def test_density_grid_follows_counters():
+    """
+    Tests that the density grid of a species is a view of the running counters, so it changes with the
+    population without being created again
+    """
+    island = Island(island_map="WWWW\nWLHW\nWWWW", initial_population=[])
+    grid = island.get_density_grid("Herbivore")
+    assert grid.shape == (3, 4)
+    assert grid.sum() == 0
+
+    island.population_in_cell([{"loc": (2, 3), "pop": [{"species": "Herbivore", "age": 5, "weight": 20}]}])
+    assert grid[1, 2] == 1
+    assert island.get_density_grid("Herbivore") is grid
+
+
+@pytest.mark.parametrize('backend', ['object', 'array'])
+def test_seed_gives_same_result(backend):
+    """
+    Tests that two islands with the same seed give the same result, and that another seed gives another result
+    """
+    test_map = "WWWWW\nWLLHW\nWLDLW\nWWWWW"
+    population = [{'loc': (2, 2),
+                   'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 20} for _ in range(50)] +
+                          [{'species': 'Carnivore', 'age': 5, 'weight': 20} for _ in range(10)]}]
+
+    def run(seed):
+        island = Island(test_map, population, backend=backend, seed=seed)
+        for _ in range(10):
+            island.island_season_cycle()
+        return island.get_cell_counts()
+
+    assert run(3) == run(3)
+    assert run(3) != run(4)
+
+
+@pytest.mark.parametrize('backend', ['object', 'array'])
+def test_seed_result_independent_of_cell_order(backend, mocker):
+    """
+    Tests that the result for a seed is the same when the cells are handled in the opposite order, since
+    every cell has its own random generator
+    """
+    test_map = "WWWWW\nWLLHW\nWLDLW\nWWWWW"
+    population = [{'loc': loc,
+                   'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 20} for _ in range(30)] +
+                          [{'species': 'Carnivore', 'age': 5, 'weight': 20} for _ in range(5)]}
+                  for loc in [(2, 2), (3, 4)]]
+
+    island = Island(test_map, population, backend=backend, seed=7)
+    for _ in range(5):
+        island.island_season_cycle()
+
+    reversed_island = Island(test_map, population, backend=backend, seed=7)
+    mocker.patch.object(reversed_island, "active_cells_in_order",
+                        side_effect=lambda: sorted(reversed_island.active_cells,
+                                                   key=reversed_island.cell_index.get, reverse=True))
+    for _ in range(5):
+        reversed_island.island_season_cycle()
+
+    assert island.get_cell_counts() == reversed_island.get_cell_counts()
+    for species in ("Herbivore", "Carnivore"):
+        assert np.array_equal(np.sort(island.get_population_data(species, "weight")),
+                              np.sort(reversed_island.get_population_data(species, "weight")))
+
+
+@pytest.mark.parametrize('backend', ['object', 'array'])
+def test_add_population_columns_same_as_dictionaries(backend):
+    """
+    Tests that animals added from columns give the same island as the same animals added as dictionaries
+    """
+    test_map = "WWWWW\nWLLHW\nWLDLW\nWWWWW"
+    population = [{'loc': (2, 2), 'pop': [{'species': 'Herbivore', 'age': 3, 'weight': 10 + number}
+                                          for number in range(20)]},
+                  {'loc': (3, 4), 'pop': [{'species': 'Carnivore', 'age': 4, 'weight': 30 - number}
+                                          for number in range(4)]}]
+    island = Island(test_map, population, backend=backend, seed=2)
+
+    animals = [(each_cell['loc'], each_animal) for each_cell in population[::-1] for each_animal in each_cell['pop']]
+    columns_island = Island(test_map, [], backend=backend, seed=2)
+    columns_island.add_population_columns([loc for loc, _ in animals],
+                                          [each_animal['species'] for _, each_animal in animals],
+                                          [each_animal['age'] for _, each_animal in animals],
+                                          [each_animal['weight'] for _, each_animal in animals])
+    assert columns_island.get_cell_counts() == island.get_cell_counts()
+    assert columns_island.active_cells == island.active_cells
+
+    for _ in range(3):
+        island.island_season_cycle()
+        columns_island.island_season_cycle()
+    assert columns_island.get_cell_counts() == island.get_cell_counts()
+
+
+def test_add_population_structured_array():
+    """
+    Tests that a structured array with the fields row and col or loc can be added
+    """
+    island = Island("WWWW\nWLHW\nWWWW", [])
+    population = np.zeros(3, dtype=[('row', int), ('col', int), ('species', 'U9'), ('age', float),
+                                    ('weight', float)])
+    population['row'] = 2
+    population['col'] = [2, 3, 3]
+    population['species'] = ['Herbivore', 'Carnivore', 'Herbivore']
+    population['weight'] = 20
+    island.add_population_columns(population)
+    assert island.get_number_of_animals() == {'Herbivore': 2, 'Carnivore': 1}
+
+    with_loc = np.zeros(2, dtype=[('loc', int, 2), ('species', 'U9'), ('age', float), ('weight', float)])
+    with_loc['loc'] = (2, 3)
+    with_loc['species'] = 'Carnivore'
+    island.add_population_columns(with_loc)
+    assert island.get_cell_counts()[6][2:] == [1, 3]
+
+
+@pytest.mark.parametrize('loc, species, age, weight, error', [
+    ((2, 2), 'Herbivore', -1, 20, ValueError),
+    ((2, 2), 'Herbivore', 5, -20, ValueError),
+    ((2, 2), 'Herbivore', 5, np.nan, ValueError),
+    ((2, 2), 'Wolf', 5, 20, ValueError),
+    ((1, 2), 'Herbivore', 5, 20, ValueError),
+    ((3, 9), 'Herbivore', 5, 20, KeyError),
+    ((2, 2.5), 'Herbivore', 5, 20, ValueError),
+    ((2, 2), 'Herbivore', 5.5, 20, ValueError),
+    ((2, 2), 'Herbivore', np.inf, 20, ValueError)])
+def test_add_population_columns_invalid(loc, species, age, weight, error):
+    """
+    Tests that an invalid animal gives an error, and that no animals are added then
+    """
+    island = Island("WWWW\nWLHW\nWWWW", [])
+    with pytest.raises(error):
+        island.add_population_columns([(2, 3), loc], ['Herbivore', species], [5, age], [20, weight])
+    assert island.get_number_of_animals() == {'Herbivore': 0, 'Carnivore': 0}
+
+
+@pytest.mark.parametrize('backend', ['object', 'array'])
+def test_add_population_columns_integer_ages(backend):
+    """
+    Tests that ages given as whole floats give the animals integer ages, as when they are added as dictionaries
+    """
+    island = Island("WWWW\nWLHW\nWWWW", [], backend=backend)
+    island.add_population_columns([(2, 2.0), (2, 3)], ['Herbivore', 'Herbivore'], [5.0, 3], [20, 30])
+    assert island.get_cell_counts()[5][2:] == [1, 0]
+    if backend == 'object':
+        ages = [animal.age for animal in island.map[(2, 2)].population_herbivore]
+        assert ages == [5] and isinstance(ages[0], int)
+
+
+def test_add_population_columns_scalars():
+    """
+    Tests that one species, age or weight is used for all the animals
+    """
+    island = Island("WWWW\nWLHW\nWWWW", [])
+    island.add_population_columns([(2, 2), (2, 3), (2, 3)], 'Carnivore', 4, [20, 30, 40])
+    assert island.get_number_of_animals() == {'Herbivore': 0, 'Carnivore': 3}
+    assert sorted(island.get_population_data('Carnivore', 'weight')) == [20, 30, 40]
+    with pytest.raises(ValueError):
+        island.add_population_columns([(2, 2), (2, 3)], ['Carnivore'] * 3, 4, 20)
+
+
+@pytest.mark.parametrize('seed, same_seed', [(-3, 3), (2.0, 2), (np.int64(7), 7), ('rossum', 'rossum'),
+                                             (2.5, 2.5)])
+def test_seeds_random_seed_takes(seed, same_seed):
+    """
+    Tests that the seeds random.seed takes give the same generators as the seed with the same numbers
+    """
+    island = Island("WWW\nWLW\nWWW", [], seed=seed)
+    other_island = Island("WWW\nWLW\nWWW", [], seed=same_seed)
+    assert island.seed >= 0
+    assert island.rng.random() == other_island.rng.random()
+
+
+def test_invalid_seed():
+    """
+    Tests that a seed that can not be used gives an error
+    """
+    with pytest.raises(TypeError):
+        Island("WWW\nWLW\nWWW", [], seed=[1, 2])
+    with pytest.raises(ValueError):
+        Island("WWW\nWLW\nWWW", [], seed=float("nan"))
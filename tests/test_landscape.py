@@ -11,6 +11,7 @@ __author__ = 'Anish Thangalingam & Majorann Thevarajah'
 __email__ = 'anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no'
 
 from biosim.landscape import Highland, Lowland, Desert
+import numpy as np
 
 
 def test_get_number_of_herbivores():
@@ -231,3 +232,72 @@ def test_set_parameters():
     lowland.set_food_parameters()
 
     assert lowland.amount_of_food == 800
+
+
+def test_array_backend_set_population():
+    """
+    Tests if the array backend stores the population in arrays and counts the animals
+    """
+    population = [{'species': 'Carnivore', 'age': 8, 'weight': 31.0},
+                  {'species': 'Herbivore', 'age': 8, 'weight': 31.0},
+                  {'species': 'Herbivore', 'age': 4, 'weight': 29.0}]
+
+    lowland = Lowland(backend="array")
+    lowland.set_a_population(population)
+
+    assert lowland.get_number_of_herbivores() == 2
+    assert lowland.get_number_of_carnivores() == 1
+    assert lowland.population_herbivore == []
+    assert list(lowland.get_population_data("Herbivore", "age")) == [8, 4]
+
+
+def test_array_backend_annual_phases():
+    """
+    Tests if the herbivores in the array backend eat, lose weight and age
+    """
+    population = [{'species': 'Herbivore', 'age': 8, 'weight': 31.0}]
+
+    lowland = Lowland(backend="array")
+    lowland.set_a_population(population)
+    lowland.set_food_parameters()
+    lowland.herbivore_eat()
+    lowland.animal_weight_loss()
+    lowland.animal_aging()
+
+    assert lowland.get_population_data("Herbivore", "age")[0] == 9
+    assert lowland.get_population_data("Herbivore", "weight")[0] > 31.0
+
+
+def test_carnivore_eat_removes_killed_herbivores(mocker):
+    """
+    Tests if the herbivores killed by several carnivores are all removed from the population
+    """
+    mocker.patch("random.random", return_value=0)
+    population = ([{'species': 'Carnivore', 'age': 5, 'weight': 40.0} for _ in range(3)] +
+                  [{'species': 'Herbivore', 'age': 60, 'weight': 5.0} for _ in range(20)])
+
+    lowland = Lowland()
+    lowland.set_a_population(population)
+    lowland.carnivore_eat()
+
+    assert lowland.get_number_of_herbivores() < 20
+    assert len(set(map(id, lowland.population_herbivore))) == lowland.get_number_of_herbivores()
+
+
+def test_remove_and_add_animals():
+    """
+    Tests if the animals removed with a mask can be added to another cell
+    """
+    population = [{'species': 'Herbivore', 'age': 8, 'weight': 31.0},
+                  {'species': 'Herbivore', 'age': 4, 'weight': 29.0},
+                  {'species': 'Herbivore', 'age': 6, 'weight': 25.0}]
+
+    for backend in ("object", "array"):
+        highland = Highland(backend=backend)
+        lowland = Lowland(backend=backend)
+        highland.set_a_population(population)
+        removed = highland.remove_animals("Herbivore", np.array([True, False, True]))
+        lowland.add_animals("Herbivore", removed)
+
+        assert highland.get_number_of_herbivores() == 1
+        assert list(lowland.get_population_data("Herbivore", "age")) == [8, 6]
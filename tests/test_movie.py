@@ -0,0 +1,189 @@
+# -*- encoding: utf-8 -*-
+"""
+This script contains several tests, which test the movie scripts functions. Instead of ffmpeg, the tests
+use a small Python program as encoder, which writes the number of bytes it gets to a file.
+
+To use this script the user must have installed the python package to the Python environment and
+import the movie.py from the biosim package. The user must also import pytest and numpy
+"""
+
+__author__ = "Anish Thangalingam & Majorann Thevarajah"
+__email__ = "anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no"
+
+import matplotlib
+import matplotlib.image
+matplotlib.use("Agg")
+
+from biosim.movie import MovieWriter, ImageWriter
+from biosim.simulation import BioSim
+import numpy as np
+import pytest
+import sys
+
+
+def stub_encoder(output):
+    """
+    Command for an encoder that counts the bytes on standard input and writes the number to a file
+
+    :param: output: the file the number of bytes is written to
+    """
+    program = "import sys; open(sys.argv[1], 'w').write(str(len(sys.stdin.buffer.read())))"
+    return [sys.executable, "-c", program, str(output)]
+
+
+def test_frames_written_to_encoder(tmp_path):
+    """
+    Tests that all the pixels of the frames are sent to the encoder
+    """
+    output = tmp_path / "bytes.txt"
+    with MovieWriter(str(tmp_path / "movie.mp4"), command=stub_encoder(output)) as writer:
+        for value in range(3):
+            writer.write_frame(np.full((4, 6, 4), value, dtype=np.uint8))
+
+    assert writer.frames == 3
+    assert int(output.read_text()) == 3 * 4 * 6 * 4
+
+
+def test_default_command_uses_frame_size():
+    """
+    Tests that the ffmpeg command reads raw frames of the right size from standard input
+    """
+    command = MovieWriter("sim.mp4", fps=25).encoder_command(640, 480)
+    assert command[command.index("-s") + 1] == "640x480"
+    assert command[command.index("-i") + 1] == "-"
+    assert command[-1] == "sim.mp4"
+    assert command[command.index("-vf") + 1] == "pad=ceil(iw/2)*2:ceil(ih/2)*2"
+
+
+def test_no_frames_after_close(tmp_path):
+    """
+    Tests that a frame after close raises RuntimeError, and does not start the encoder again
+    """
+    output = tmp_path / "bytes.txt"
+    writer = MovieWriter(str(tmp_path / "movie.mp4"), command=stub_encoder(output))
+    writer.write_frame(np.zeros((4, 6, 4), dtype=np.uint8))
+    writer.close()
+    with pytest.raises(RuntimeError):
+        writer.write_frame(np.zeros((4, 6, 4), dtype=np.uint8))
+    writer.close()
+
+    assert writer.frames == 1
+    assert int(output.read_text()) == 4 * 6 * 4
+
+
+def test_frame_size_must_not_change(tmp_path):
+    """
+    Tests that a frame with another size than the first frame raises ValueError
+    """
+    writer = MovieWriter(str(tmp_path / "movie.mp4"), command=stub_encoder(tmp_path / "bytes.txt"))
+    writer.write_frame(np.zeros((4, 6, 4), dtype=np.uint8))
+    with pytest.raises(ValueError):
+        writer.write_frame(np.zeros((6, 4, 4), dtype=np.uint8))
+    writer.close()
+
+
+def test_failing_encoder(tmp_path):
+    """
+    Tests that an encoder that fails gives RuntimeError
+    """
+    writer = MovieWriter(str(tmp_path / "movie.mp4"), command=[sys.executable, "-c", "import sys; sys.exit(1)"])
+    with pytest.raises(RuntimeError):
+        for _ in range(100):
+            writer.write_frame(np.zeros((100, 100, 4), dtype=np.uint8))
+        writer.close()
+
+
+def test_simulation_streams_movie(tmp_path):
+    """
+    Tests that BioSim sends the figures to the encoder without writing image files
+    """
+    population = [{'loc': (2, 2), 'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 20} for _ in range(10)]}]
+    sim = BioSim(island_map="WWWW\nWLHW\nWWWW", ini_pop=population, seed=1,
+                 img_base=str(tmp_path / "sim"), stream_movie=True)
+    sim.movie_writer.command = stub_encoder(tmp_path / "bytes.txt")
+    sim.simulate(3)
+    sim.make_movie()
+
+    height, width = sim.movie_writer.frame_size[:2]
+    assert int((tmp_path / "bytes.txt").read_text()) == 3 * height * width * 4
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["bytes.txt"]
+
+    with pytest.raises(RuntimeError):
+        sim.simulate(1)
+    assert int((tmp_path / "bytes.txt").read_text()) == 3 * height * width * 4
+
+
+def test_simulation_close_ends_movie(tmp_path):
+    """
+    Tests that the encoder of a streamed movie is ended when BioSim is closed without make_movie
+    """
+    population = [{'loc': (2, 2), 'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 20} for _ in range(10)]}]
+    with BioSim(island_map="WWWW\nWLHW\nWWWW", ini_pop=population, seed=1,
+                img_base=str(tmp_path / "sim"), stream_movie=True) as sim:
+        sim.movie_writer.command = stub_encoder(tmp_path / "bytes.txt")
+        sim.simulate(2)
+
+    height, width = sim.movie_writer.frame_size[:2]
+    assert int((tmp_path / "bytes.txt").read_text()) == 2 * height * width * 4
+
+
+def test_image_writer_writes_all_images(tmp_path):
+    """
+    Tests that the image writer writes all the images, also when more images are given than can wait
+    """
+    writer = ImageWriter(workers=2, max_pending=2)
+    for number in range(6):
+        writer.submit(str(tmp_path / f"img_{number}.png"), np.full((4, 6, 4), 255, dtype=np.uint8))
+    writer.close()
+
+    assert len(list(tmp_path.iterdir())) == 6
+    assert matplotlib.image.imread(str(tmp_path / "img_5.png")).shape == (4, 6, 4)
+
+
+def test_image_writer_copies_frame(tmp_path):
+    """
+    Tests that the frame can be changed at once after it is given to the writer
+    """
+    writer = ImageWriter(workers=1)
+    frame = np.zeros((4, 6, 4), dtype=np.uint8)
+    writer.submit(str(tmp_path / "img.png"), frame)
+    frame[:] = 255
+    writer.close()
+
+    assert matplotlib.image.imread(str(tmp_path / "img.png")).max() == 0
+
+
+def test_image_writer_error(tmp_path):
+    """
+    Tests that an error in a thread is raised when the writer waits for the images
+    """
+    writer = ImageWriter(workers=1)
+    writer.submit(str(tmp_path / "missing" / "img.png"), np.zeros((4, 6, 4), dtype=np.uint8))
+    with pytest.raises(RuntimeError):
+        writer.close()
+
+
+def test_simulation_writes_images_in_background(tmp_path):
+    """
+    Tests that BioSim writes the same number of images with the background threads
+    """
+    population = [{'loc': (2, 2), 'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 20} for _ in range(10)]}]
+    sim = BioSim(island_map="WWWW\nWLHW\nWWWW", ini_pop=population, seed=1,
+                 img_base=str(tmp_path / "sim"), img_workers=2)
+    sim.simulate(4, vis_years=2)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["sim_00000.png", "sim_00001.png"]
+
+
+def test_simulation_close_stops_image_threads(tmp_path):
+    """
+    Tests that the images are written and the threads are stopped when BioSim is closed
+    """
+    population = [{'loc': (2, 2), 'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 20} for _ in range(10)]}]
+    with BioSim(island_map="WWWW\nWLHW\nWWWW", ini_pop=population, seed=1,
+                img_base=str(tmp_path / "sim"), img_workers=2) as sim:
+        sim.simulate(2)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["sim_00000.png", "sim_00001.png"]
+    with pytest.raises(RuntimeError):
+        sim.image_writer.submit(str(tmp_path / "late.png"), np.zeros((4, 6, 4), dtype=np.uint8))
@@ -0,0 +1,133 @@
+# -*- encoding: utf-8 -*-
+"""
+This script contains several tests, which test the population scripts functions.
+
+To use this script the user must have installed the python package to the Python environment and
+import the population.py from the biosim package. The user must also import pytest and numpy
+"""
+
+__author__ = "Anish Thangalingam & Majorann Thevarajah"
+__email__ = "anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no"
+
+from biosim.animals import Herbivore, Carnivore
+from biosim.population import SpeciesArrays
+import numpy as np
+import pytest
+
+
+def test_add_and_len():
+    """
+    Tests that animals are added to the arrays and that fitness is calculated
+    """
+    herbivores = SpeciesArrays(Herbivore)
+    herbivores.add([10, 5], [30, 20])
+
+    assert len(herbivores) == 2
+    assert herbivores.fitness[0] == pytest.approx(Herbivore(10, 30).fitness)
+
+
+def test_add_negative_raises():
+    """
+    Tests that negative age or weight raises valueerror
+    """
+    carnivores = SpeciesArrays(Carnivore)
+    with pytest.raises(ValueError):
+        carnivores.add([-1], [10])
+    with pytest.raises(ValueError):
+        carnivores.add([1], [-10])
+
+
+def test_aging_and_weight_loss():
+    """
+    Tests that the animals grow one year and lose weight by eta
+    """
+    carnivores = SpeciesArrays(Carnivore)
+    carnivores.add([3], [20])
+    carnivores.aging()
+    carnivores.weight_loss()
+
+    assert carnivores.age[0] == 4
+    assert carnivores.weight[0] == pytest.approx(20 * (1 - Carnivore.parameters["eta"]))
+    assert carnivores.fitness[0] == pytest.approx(Carnivore(4, carnivores.weight[0]).fitness)
+
+
+def test_death_weight_zero(mocker):
+    """
+    Tests that an animal with weight zero always dies
+    """
+    mocker.patch("numpy.random.random", return_value=np.array([1.0, 1.0]))
+    herbivores = SpeciesArrays(Herbivore)
+    herbivores.add([3, 3], [0, 20])
+    herbivores.death()
+
+    assert len(herbivores) == 1
+    assert herbivores.weight[0] == 20
+
+
+def test_births(mocker):
+    """
+    Tests that newborns are added with age 0 and that the mothers lose weight
+    """
+    mocker.patch("numpy.random.random", return_value=np.zeros(3))
+    mocker.patch("numpy.random.normal", return_value=np.full(3, 8.0))
+    herbivores = SpeciesArrays(Herbivore)
+    herbivores.add([5, 5, 5], [40, 40, 40])
+    newborns = herbivores.births()
+
+    assert newborns == 3
+    assert len(herbivores) == 6
+    assert np.all(herbivores.age[3:] == 0)
+    assert herbivores.weight[0] == pytest.approx(40 - Herbivore.parameters["xi"] * 8)
+
+
+def test_eat_fodder():
+    """
+    Tests that the herbivores eat F each until the food is finished
+    """
+    herbivores = SpeciesArrays(Herbivore)
+    herbivores.add([1, 1, 1], [10, 10, 10])
+    food_left = herbivores.eat_fodder(25)
+
+    assert food_left == 0
+    assert herbivores.weight.sum() == pytest.approx(30 + Herbivore.parameters["beta"] * 25)
+
+
+def test_predation(mocker):
+    """
+    Tests that a fit carnivore kills the unfit herbivore and gains weight
+    """
+    mocker.patch("numpy.random.random", side_effect=lambda size: np.zeros(size))
+    herbivores = SpeciesArrays(Herbivore)
+    herbivores.add([80, 2], [5, 40])
+    carnivores = SpeciesArrays(Carnivore)
+    carnivores.add([4], [6])
+    carnivores.predation(herbivores)
+
+    assert len(herbivores) == 1
+    assert herbivores.weight[0] == 40
+    assert carnivores.weight[0] == pytest.approx(6 + Carnivore.parameters["beta"] * 5)
+
+
+def test_eat_fodder_per_cell():
+    """
+    Tests that the herbivores only eat the food in their own cell
+    """
+    herbivores = SpeciesArrays(Herbivore)
+    herbivores.add([1, 1, 1], [10, 10, 10], [0, 1, 1])
+    food_left = herbivores.eat_fodder(np.array([100.0, 0.0]))
+
+    assert food_left == pytest.approx([100 - Herbivore.parameters["F"], 0])
+    assert herbivores.weight[0] > 10
+    assert np.all(herbivores.weight[1:] == 10)
+
+
+def test_births_use_animals_in_same_cell(mocker):
+    """
+    Tests that an animal alone in its cell can not give birth, even if there are animals in other cells
+    """
+    mocker.patch("numpy.random.random", return_value=np.zeros(2))
+    mocker.patch("numpy.random.normal", return_value=np.full(2, 8.0))
+    herbivores = SpeciesArrays(Herbivore)
+    herbivores.add([5, 5], [40, 40], [0, 1])
+
+    assert herbivores.births() == 0
@@ -0,0 +1,92 @@
+# -*- encoding: utf-8 -*-
+"""
+This script contains several tests, which test the recorder scripts functions.
+
+To use this script the user must have installed the python package to the Python environment and
+import the recorder.py from the biosim package. The user must also import pytest and numpy
+"""
+
+__author__ = "Anish Thangalingam & Majorann Thevarajah"
+__email__ = "anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no"
+
+from biosim.island import Island
+from biosim.recorder import TimeSeriesRecorder, TimeSeriesReader
+from biosim.simulation import BioSim
+import numpy as np
+import os
+import pytest
+
+test_map = """\
+               WWWWW
+               WLLHW
+               WLDLW
+               WWWWW"""
+
+
+def test_summary(tmp_path):
+    """
+    Tests the numbers and statistics of one year, also for a species without animals
+    """
+    population = [{'loc': (2, 2), 'pop': [{'species': 'Herbivore', 'age': age, 'weight': 10 + age}
+                                          for age in range(10)]}]
+    island = Island(test_map, population)
+    values = TimeSeriesRecorder(str(tmp_path), density=True).summary(island)
+    assert values["Herbivore_count"] == 10
+    assert values["Herbivore_age_mean"] == pytest.approx(4.5)
+    assert values["Herbivore_weight_max"] == 19
+    assert values["Carnivore_count"] == 0
+    assert np.isnan(values["Carnivore_fitness_mean"])
+    assert values["Herbivore_density"][1, 1] == 10
+
+
+def test_chunks_are_written(tmp_path):
+    """
+    Tests that a chunk is written every chunk_years years, and that the last years are written by close
+    """
+    island = Island(test_map, [])
+    with TimeSeriesRecorder(str(tmp_path), chunk_years=3) as recorder:
+        for year in range(1, 8):
+            recorder.record(island, year)
+        assert len(os.listdir(str(tmp_path))) == 2
+    assert sorted(os.listdir(str(tmp_path))) == ["years_000000001_000000003.npz", "years_000000004_000000006.npz",
+                                                 "years_000000007_000000007.npz"]
+
+
+def test_simulate_with_recorder(population, tmp_path):
+    """
+    Tests that the recorder gets the same numbers as the records of BioSim, and that a range of years can be read
+    """
+    sim = BioSim(test_map, population, 3, headless=True)
+    recorder = TimeSeriesRecorder(str(tmp_path), chunk_years=4, density=True)
+    sim.simulate(10, record=["num_animals_per_species"], recorder=recorder)
+
+    reader = TimeSeriesReader(str(tmp_path))
+    everything = reader.read()
+    assert list(everything["year"]) == list(range(1, 11))
+    assert list(everything["Herbivore_count"]) == [counts["Herbivore"]
+                                                   for counts in sim.records["num_animals_per_species"]]
+    assert everything["Herbivore_density"].shape == (10, 4, 5)
+    assert np.array_equal(everything["Herbivore_density"][-1], sim.island.get_density_grid("Herbivore"))
+
+    some_years = reader.read(3, 6, columns=["Herbivore_count"])
+    assert sorted(some_years) == ["Herbivore_count", "year"]
+    assert list(some_years["year"]) == [3, 4, 5, 6]
+    assert np.array_equal(some_years["Herbivore_count"], everything["Herbivore_count"][2:6])
+    assert len(list(reader.iter_chunks(5, 7))) == 1
+
+
+def test_reader_without_chunks(tmp_path):
+    """
+    Tests that an empty directory gives no columns
+    """
+    reader = TimeSeriesReader(str(tmp_path))
+    assert reader.read() == {}
+    assert reader.columns() == []
+
+
+def test_wrong_chunk_years(tmp_path):
+    """
+    Tests that a chunk must have at least one year
+    """
+    with pytest.raises(ValueError):
+        TimeSeriesRecorder(str(tmp_path), chunk_years=0)
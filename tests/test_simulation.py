@@ -0,0 +1,129 @@
+# -*- encoding: utf-8 -*-
+
+"""
+This script contains several tests, which test the BioSim class in simulation.py.
+
+To use this script the user has to have installed the python package to the Python environment
+and import the simulation.py from the biosim package. The user must also import pytest.
+"""
+
+__author__ = "Majorann Thevarjah & Anish Thangalingam"
+__email__ = "Majorann.thevarajah@nmbu.no & Anish.thangalingam@nmbu.no"
+
+from biosim.ensemble import isolated_parameters
+from biosim.simulation import BioSim
+from biosim.vectorized_island import VectorizedIsland
+from biosim.visualization import Visualization
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize('engine', ['object', 'array', 'vectorized'])
+def test_engines_count_animals(engine, population):
+    """
+    Tests that all the engines count the animals and give the data for the histograms
+    """
+    sim = BioSim(island_map="WWWW\nWLHW\nWWWW", ini_pop=population, seed=1, engine=engine)
+
+    assert sim.num_animals_per_species == {'Herbivore': 20, 'Carnivore': 3}
+    assert len(sim.hist_age_data[0]['age']) == 20
+    assert len(sim.hist_fitness_data[1]['fitness']) == 3
+    assert sim.distributions['Herbivore'].sum() == 20
+
+
+def test_vectorized_engine_selected(population):
+    """
+    Tests that the vectorized engine uses the VectorizedIsland
+    """
+    sim = BioSim(island_map="WWWW\nWLHW\nWWWW", ini_pop=population, seed=1, engine='vectorized')
+
+    assert isinstance(sim.island, VectorizedIsland)
+
+
+def test_invalid_engine():
+    """
+    Tests that an unknown engine raises valueerror
+    """
+    with pytest.raises(ValueError):
+        BioSim(island_map="WWW\nWLW\nWWW", ini_pop=[], seed=1, engine='fast')
+
+
+def test_headless_creates_no_figure(population, mocker):
+    """
+    Tests that a headless simulation creates no figure and computes no statistics for the visualization,
+    but still records the asked series
+    """
+    window = mocker.spy(Visualization, "creat_a_window")
+    snapshot = mocker.spy(BioSim, "stats_snapshot")
+    sim = BioSim(island_map="WWWW\nWLHW\nWWWW", ini_pop=population, seed=1, headless=True, img_base="unused")
+    sim.simulate(5, record=["year", "num_animals_per_species"])
+
+    assert window.call_count == 0
+    assert snapshot.call_count == 0
+    assert sim.records["year"] == [1, 2, 3, 4, 5]
+    assert sim.records["num_animals_per_species"][-1] == sim.num_animals_per_species
+
+
+def test_img_years_defaults_to_vis_years(population, mocker):
+    """
+    Tests that img_years=None saves a figure every vis_years
+    """
+    mocker.patch.object(BioSim, "setup_graphics")
+    mocker.patch.object(Visualization, "update_graphics_per_year")
+    save = mocker.patch.object(BioSim, "save_fig")
+    sim = BioSim(island_map="WWWW\nWLHW\nWWWW", ini_pop=population, seed=1)
+    sim.simulate(6, vis_years=2)
+
+    assert save.call_count == 3
+
+
+def test_record_unknown_series(population):
+    """
+    Tests that a series that can not be recorded raises ValueError
+    """
+    sim = BioSim(island_map="WWWW\nWLHW\nWWWW", ini_pop=population, seed=1)
+    with pytest.raises(ValueError):
+        sim.simulate(1, headless=True, record=["island"])
+
+
+@pytest.mark.parametrize('engine', ['object', 'array', 'vectorized'])
+def test_add_population_columns(engine):
+    """
+    Tests that all the engines add animals from columns and from a structured array
+    """
+    sim = BioSim(island_map="WWWW\nWLHW\nWWWW", ini_pop=[], seed=1, engine=engine)
+    sim.add_population_columns([(2, 2)] * 5 + [(2, 3)] * 2, ['Herbivore'] * 5 + ['Carnivore'] * 2,
+                               [1] * 7, [20] * 7)
+    population = np.zeros(3, dtype=[('loc', int, 2), ('species', 'U9'), ('age', float), ('weight', float)])
+    population['loc'] = (2, 3)
+    population['species'] = 'Herbivore'
+    population['weight'] = 10
+    sim.add_population(population)
+
+    assert sim.num_animals_per_species == {'Herbivore': 8, 'Carnivore': 2}
+    assert list(sim.distributions['Herbivore']) == [0, 0, 0, 0, 0, 5, 3, 0, 0, 0, 0, 0]
+    sim.simulate(2, headless=True)
+
+
+@pytest.mark.parametrize('engine', ['array', 'vectorized'])
+def test_negative_birth_weight(engine):
+    """
+    Tests that a newborn with a negative weight, which a large sigma_birth gives, does not stop the simulation
+    """
+    population = [{'loc': (2, 2), 'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 40} for _ in range(50)]}]
+    with isolated_parameters({'Herbivore': {'sigma_birth': 6.0}}):
+        sim = BioSim(island_map="WWWW\nWLHW\nWWWW", ini_pop=population, seed=1, engine=engine)
+        sim.simulate(15, headless=True)
+    assert sim.year == 15
+
+
+@pytest.mark.parametrize('engine', ['object', 'vectorized'])
+def test_negative_seed(engine, population):
+    """
+    Tests that a negative seed gives the same simulation as its absolute value
+    """
+    sim = BioSim(island_map="WWWW\nWLHW\nWWWW", ini_pop=population, seed=-3, engine=engine)
+    other_sim = BioSim(island_map="WWWW\nWLHW\nWWWW", ini_pop=population, seed=3, engine=engine)
+    sim.simulate(3, headless=True)
+    other_sim.simulate(3, headless=True)
+    assert sim.num_animals_per_species == other_sim.num_animals_per_species
@@ -0,0 +1,80 @@
+# -*- encoding: utf-8 -*-
+"""
+This script contains several tests, which test the stats scripts functions.
+
+To use this script the user must have installed the python package to the Python environment and
+import the stats.py from the biosim package. The user must also import pytest and numpy
+"""
+
+__author__ = "Anish Thangalingam & Majorann Thevarajah"
+__email__ = "anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no"
+
+from biosim.island import Island
+from biosim.vectorized_island import VectorizedIsland
+from biosim.stats import StatsSnapshot, histogram_bin_edges
+import numpy as np
+import pytest
+
+
+def test_histogram_bin_edges():
+    """
+    Tests that the bin edges go from 0 to max with the given bin width
+    """
+    edges = histogram_bin_edges({'max': 60, 'delta': 2})
+
+    assert len(edges) == 31
+    assert edges[0] == 0
+    assert edges[-1] == 60
+
+    edges = histogram_bin_edges({'max': 5, 'delta': 2})
+    assert list(edges) == [0, 2, 4, 6]
+
+
+
+@pytest.mark.parametrize('max_value, delta, number_of_edges', [(0.2, 0.1, 3), (1.1, 0.1, 12), (0.1, 0.05, 3),
+                                                               (0.25, 0.1, 4)])
+def test_histogram_bin_edges_float(max_value, delta, number_of_edges):
+    """
+    Tests that float values of max and delta do not give an extra bin above max
+    """
+    edges = histogram_bin_edges({'max': max_value, 'delta': delta})
+
+    assert len(edges) == number_of_edges
+    assert edges[-1] == pytest.approx(delta * (number_of_edges - 1))
+    assert np.diff(edges) == pytest.approx(np.full(number_of_edges - 1, delta))
+
+
+@pytest.mark.parametrize('island_class', [Island, VectorizedIsland])
+def test_snapshot_counts_and_data(island_class):
+    """
+    Tests that the snapshot gives the number of animals, the data of every animal and the cell counts
+    """
+    population = [{'loc': (2, 2),
+                   'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 20} for _ in range(6)] +
+                          [{'species': 'Carnivore', 'age': 3, 'weight': 12} for _ in range(2)]},
+                  {'loc': (2, 3), 'pop': [{'species': 'Herbivore', 'age': 11, 'weight': 70}]}]
+    island = island_class(island_map="WWWW\nWLHW\nWWWW", initial_population=population)
+    stats = StatsSnapshot(island, 0)
+
+    assert stats.number_of_animals == {'Herbivore': 7, 'Carnivore': 2}
+    assert sorted(stats.data['Herbivore']['age']) == [5] * 6 + [11]
+    assert len(stats.data['Carnivore']['fitness']) == 2
+    assert stats.density['Herbivore'][1, 2] == 1
+    assert stats.density['Carnivore'].shape == (3, 4)
+
+
+def test_snapshot_histograms():
+    """
+    Tests that the histogram counts only count the animals inside the range of the histogram
+    """
+    population = [{'loc': (2, 2),
+                   'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 20} for _ in range(6)] +
+                          [{'species': 'Carnivore', 'age': 3, 'weight': 12} for _ in range(2)]},
+                  {'loc': (2, 3), 'pop': [{'species': 'Herbivore', 'age': 11, 'weight': 70}]}]
+    island = Island(island_map="WWWW\nWLHW\nWWWW", initial_population=population)
+    stats = StatsSnapshot(island, 0, {'weight': {'max': 60, 'delta': 2}})
+
+    assert stats.histograms['weight']['Herbivore'].sum() == 6
+    assert stats.histograms['weight']['Carnivore'][6] == 2
+    assert 'age' not in stats.histograms
+    assert np.all(stats.hist_data('weight')[0]['weight'] == stats.data['Herbivore']['weight'])
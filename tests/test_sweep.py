@@ -0,0 +1,84 @@
+# -*- encoding: utf-8 -*-
+"""
+This script contains several tests, which test the sweep scripts functions.
+
+To use this script the user must have installed the python package to the Python environment and
+import the sweep.py from the biosim package. The user must also import pytest and numpy
+"""
+
+__author__ = "Anish Thangalingam & Majorann Thevarajah"
+__email__ = "anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no"
+
+from biosim.sweep import Sweep, grid_points, latin_hypercube_points, split_point
+import numpy as np
+import pytest
+
+
+def test_grid_points():
+    """
+    Tests that the grid has every combination of the values
+    """
+    points = grid_points({"Herbivore.zeta": [1, 2, 3], "L.f_max": [100, 800]})
+    assert len(points) == 6
+    assert {"Herbivore.zeta": 3, "L.f_max": 100} in points
+
+
+def test_latin_hypercube_points():
+    """
+    Tests that every part of the range of a parameter is used by exactly one point
+    """
+    points = latin_hypercube_points({"Carnivore.F": (10, 50), "H.f_max": (0, 300)}, 8, seed=1)
+    parts = sorted(int((point["Carnivore.F"] - 10) / 40 * 8) for point in points)
+    assert parts == list(range(8))
+
+
+def test_split_point():
+    """
+    Tests that the parameters are split into animal and landscape parameters
+    """
+    assert split_point({"Herbivore.zeta": 1, "Herbivore.xi": 2, "L.f_max": 3}) == (
+        {"Herbivore": {"zeta": 1, "xi": 2}}, {"L": {"f_max": 3}})
+    with pytest.raises(ValueError):
+        split_point({"zeta": 1})
+
+
+@pytest.mark.parametrize('name', ["W.f_max", "D.f_max", "Wolf.zeta"])
+def test_split_point_wrong_owner(name):
+    """
+    Tests that a parameter of a landscape that can not be changed, or of an unknown species, gives an error
+    """
+    with pytest.raises(ValueError):
+        split_point({name: 1})
+
+
+def test_wrong_parameter_name(population):
+    """
+    Tests that a wrong parameter name is found when the sweep is made
+    """
+    with pytest.raises(KeyError):
+        Sweep("WWWW\nWLHW\nWWWW", population, [{"Herbivore.not_a_parameter": 1}], [1], 2)
+
+
+def test_sweep_resumes_from_cache(population, tmp_path, mocker):
+    """
+    Tests that a sweep stores every job in the cache, and that a new sweep with the same jobs does not run them
+    """
+    points = grid_points({"L.f_max": [0, 800]})
+    sweep = Sweep("WWWW\nWLHW\nWWWW", population, points, seeds=[1, 2], num_years=3,
+                  cache_dir=str(tmp_path / "cache"))
+    columns = sweep.run(workers=2)
+
+    assert len(list((tmp_path / "cache").iterdir())) == 4
+    assert list(columns["L.f_max"]) == [0, 0, 800, 800]
+    assert list(columns["seed"]) == [1, 2, 1, 2]
+
+    executor = mocker.patch("biosim.sweep.ProcessPoolExecutor")
+    resumed = Sweep("WWWW\nWLHW\nWWWW", population, points, seeds=[1, 2], num_years=3,
+                    cache_dir=str(tmp_path / "cache"))
+    resumed_columns = resumed.run()
+    assert executor.call_count == 0
+    assert np.array_equal(resumed_columns["Herbivore_final"], columns["Herbivore_final"])
+
+    resumed.save_summary(str(tmp_path / "summary.npz"))
+    with np.load(str(tmp_path / "summary.npz")) as summary:
+        assert np.array_equal(summary["Carnivore_mean_last"], columns["Carnivore_mean_last"])
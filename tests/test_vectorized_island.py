@@ -0,0 +1,135 @@
+# -*- encoding: utf-8 -*-
+"""
+This script contains several tests, which test the vectorized island scripts functions.
+
+To use this script the user must have installed the python package to the Python environment and
+import the vectorized_island.py from the biosim package. The user must also import pytest and numpy
+"""
+
+__author__ = "Anish Thangalingam & Majorann Thevarajah"
+__email__ = "anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no"
+
+from biosim.vectorized_island import VectorizedIsland
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def test_map():
+    """
+    Map used in the tests below
+    """
+    return """\
+               WWWWWW
+               WHHHHW
+               WLLDDW
+               WWWWWW"""
+
+
+def test_population_in_cell(test_map):
+    """
+    Tests that the population is placed in the arrays with the right cell index
+    """
+    population = [{'loc': (3, 3),
+                   'pop': [{'species': 'Carnivore', 'age': 5, 'weight': 20.0},
+                           {'species': 'Herbivore', 'age': 5, 'weight': 20.0},
+                           {'species': 'Herbivore', 'age': 3, 'weight': 10.0}]}]
+
+    island = VectorizedIsland(island_map=test_map, initial_population=population)
+
+    assert island.get_number_of_animals() == {'Herbivore': 2, 'Carnivore': 1}
+    assert np.all(island.animals['Herbivore'].cell == island.cell_index[(3, 3)])
+
+
+def test_neighbours(test_map):
+    """
+    Tests that the neighbours of a cell are the cells below, above, right and left
+    """
+    island = VectorizedIsland(island_map=test_map, initial_population=[])
+    neighbours = [island.locations[index] for index in island.neighbours[island.cell_index[(2, 3)]]]
+
+    assert neighbours == [(3, 3), (1, 3), (2, 4), (2, 2)]
+
+
+def test_amount_of_fodder(test_map):
+    """
+    Tests that every cell gets f_max of its landscape type
+    """
+    island = VectorizedIsland(island_map=test_map, initial_population=[])
+    fodder = island.amount_of_fodder()
+
+    assert fodder[island.cell_index[(2, 2)]] == island.map[(2, 2)].parameters["f_max"]
+    assert fodder[island.cell_index[(3, 5)]] == 0
+
+
+def test_migration_not_to_water(mocker, test_map):
+    """
+    Tests that all animals migrate, and that no animal moves into water
+    """
+    mocker.patch("numpy.random.random", side_effect=lambda size: np.zeros(size))
+    population = [{'loc': (2, 2),
+                   'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 20.0} for _ in range(100)]}]
+
+    island = VectorizedIsland(island_map=test_map, initial_population=population)
+    island.island_migration()
+    cells = island.animals['Herbivore'].cell
+
+    assert np.all(island.passable[cells])
+    assert np.any(cells != island.cell_index[(2, 2)])
+
+
+def test_cell_counts(test_map):
+    """
+    Tests that the animals are counted in the right cells
+    """
+    population = [{'loc': (2, 3),
+                   'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 20.0} for _ in range(4)]}]
+
+    island = VectorizedIsland(island_map=test_map, initial_population=population)
+    counts = {(row, col): (herbivores, carnivores) for row, col, herbivores, carnivores in island.get_cell_counts()}
+
+    assert counts[(2, 3)] == (4, 0)
+    assert sum(herbivores for herbivores, _ in counts.values()) == 4
+
+
+def test_island_season_cycle(test_map):
+    """
+    Tests that the annual cycle runs, and that all animals stay on passable cells
+    """
+    population = [{'loc': (2, 2),
+                   'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 20} for _ in range(50)] +
+                          [{'species': 'Carnivore', 'age': 5, 'weight': 20} for _ in range(5)]}]
+
+    island = VectorizedIsland(island_map=test_map, initial_population=population)
+    for _ in range(10):
+        island.island_season_cycle()
+
+    assert island.get_number_of_animals()['Herbivore'] > 0
+    for arrays in island.animals.values():
+        assert np.all(island.passable[arrays.cell])
+
+
+def test_seed_gives_same_result(test_map):
+    """
+    Tests that two islands with the same seed give the same result
+    """
+    population = [{'loc': (2, 2),
+                   'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 20} for _ in range(50)] +
+                          [{'species': 'Carnivore', 'age': 5, 'weight': 20} for _ in range(10)]}]
+    islands = [VectorizedIsland(island_map=test_map, initial_population=population, seed=11) for _ in range(2)]
+    for island in islands:
+        for _ in range(10):
+            island.island_season_cycle()
+
+    assert np.array_equal(islands[0].animal_counts, islands[1].animal_counts)
+    assert np.array_equal(islands[0].get_population_data('Herbivore', 'weight'),
+                          islands[1].get_population_data('Herbivore', 'weight'))
+
+
+def test_cells_have_no_generators(test_map):
+    """
+    Tests that the cells get no random generators, since all the animals use the generator of the island
+    """
+    island = VectorizedIsland(test_map, [], seed=1)
+    assert island.rng is not None
+    assert all(island.map[loc_pos].random_numbers is None for loc_pos in island.locations)
@@ -0,0 +1,122 @@
+# -*- encoding: utf-8 -*-
+"""
+This script contains several tests, which test the visualization scripts functions.
+
+To use this script the user must have installed the python package to the Python environment and
+import the visualization.py from the biosim package. The user must also import matplotlib, pytest and numpy
+"""
+
+__author__ = "Anish Thangalingam & Majorann Thevarajah"
+__email__ = "anish.thangalingam@nmbu.no & majorann.thevarajah@nmbu.no"
+
+import matplotlib
+matplotlib.use("Agg")
+
+from biosim.visualization import Visualization
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def visual():
+    """
+    Visualization with the window and the histogram subplots created
+    """
+    hist_spec = {"weight": {"max": 60, "delta": 2}, "age": {"max": 60, "delta": 2}}
+    visualization = Visualization({"Herbivore": 200, "Carnivore": 100}, hist_spec)
+    visualization.creat_a_window()
+    visualization.subplot_for_histogram()
+    yield visualization
+    plt.close(visualization._fig)
+
+
+def test_histogram_built_once(visual):
+    """
+    Tests that the step artists of a histogram are created once, and only get new counts after that
+    """
+    visual.weight_hist_update({"weight": np.array([1.0, 3.0, 3.5])}, {"weight": np.array([59.0])})
+    herbivore_step, carnivore_step = visual._histograms["weight"]
+    assert np.all(herbivore_step.get_data().values[:2] == [1, 2])
+
+    visual.weight_hist_update({"weight": np.array([5.0])}, {"weight": np.array([])})
+    assert visual._histograms["weight"][0] is herbivore_step
+    assert len(visual._weight_hist_fig.patches) == 2
+    assert herbivore_step.get_data().values.sum() == 1
+    assert carnivore_step.get_data().values.sum() == 0
+
+
+def test_histogram_y_limit_follows_counts(visual):
+    """
+    Tests that the y-limit grows with the counts, is kept for small changes, and shrinks when the counts fall
+    """
+    visual.weight_hist_update({"weight": np.full(100, 1.0)}, {"weight": np.array([])})
+    assert visual._weight_hist_fig.get_ylim()[1] == pytest.approx(110)
+
+    visual.weight_hist_update({"weight": np.full(80, 1.0)}, {"weight": np.array([])})
+    assert visual._weight_hist_fig.get_ylim()[1] == pytest.approx(110)
+
+    visual.weight_hist_update({"weight": np.full(10, 1.0)}, {"weight": np.array([])})
+    assert visual._weight_hist_fig.get_ylim()[1] == pytest.approx(11)
+
+
+def test_histogram_without_spec(visual):
+    """
+    Tests that a property without an entry in hist_spec gets no histogram
+    """
+    visual.fitness_hist_update({"fitness": np.array([0.5])}, {"fitness": np.array([0.2])})
+    assert "fitness" not in visual._histograms
+
+
+class DummyStats:
+    """
+    Statistics of one year, in the form the visualization uses
+    """
+
+    def __init__(self, year, herbivores):
+        self.year = year
+        self.number_of_animals = {"Herbivore": herbivores, "Carnivore": 1}
+        self.density = {"Herbivore": np.full((3, 4), herbivores), "Carnivore": np.eye(3, 4)}
+        self.histograms = {"weight": {"Herbivore": np.arange(30) % 5, "Carnivore": np.ones(30)}}
+
+
+@pytest.fixture
+def blit_visual():
+    """
+    Visualization with blitting and all the subplots created
+    """
+    visualization = Visualization({"Herbivore": 200, "Carnivore": 100}, {"weight": {"max": 60, "delta": 2}},
+                                  blit=True)
+    visualization.creat_a_window()
+    visualization.subplot_for_the_animal_count_curves(10, 100)
+    visualization.subplot_for_map()
+    visualization.map_graphics("WWWW\nWLHW\nWWWW")
+    visualization.subplot_for_year()
+    visualization.subplot_for_distribution_plot()
+    visualization.subplot_for_histogram()
+    yield visualization
+    plt.close(visualization._fig)
+
+
+def test_blit_draws_figure_once(blit_visual, mocker):
+    """
+    Tests that the whole figure is only drawn the first year with blitting
+    """
+    spy = mocker.spy(blit_visual._fig.canvas, "draw")
+    for year in range(5):
+        blit_visual.update_graphics_per_year(DummyStats(year, 10 + year))
+
+    assert spy.call_count == 1
+    assert blit_visual._background is not None
+
+
+def test_blit_gives_same_image(blit_visual):
+    """
+    Tests that the figure drawn with blitting is the same as the figure drawn from scratch
+    """
+    for year in range(3):
+        blit_visual.update_graphics_per_year(DummyStats(year, 20 * year))
+    blitted = np.array(blit_visual._fig.canvas.buffer_rgba())
+
+    blit_visual._fig.canvas.draw()
+    assert np.array_equal(blitted, np.array(blit_visual._fig.canvas.buffer_rgba()))